@@ -1,13 +1,20 @@
 from passlib.context import CryptContext
+from concurrent.futures import ThreadPoolExecutor
 from jose import JWTError, jwt
 from datetime import datetime, timedelta, timezone
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+from collections import OrderedDict
 import models
 import schemas
 import database
+import asyncio
 import os
+import threading
+import time
 
 # --- Konfiguracja Hashowania Haseł ---
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -18,6 +25,34 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+# --- Pula dla bcrypta ---
+# bcrypt to ~250 ms CPU - wołany wprost w async endpoincie blokuje cały event loop.
+# Liczymy go w osobnej, małej puli wątków (bcrypt puszcza GIL). Limit kolejki chroni przed
+# lawiną logowań: gdy wszystkie miejsca są zajęte, od razu oddajemy 429 zamiast czekać.
+AUTH_HASH_WORKERS = int(os.getenv("AUTH_HASH_WORKERS", 2))
+AUTH_HASH_QUEUE = int(os.getenv("AUTH_HASH_QUEUE", 16)) # Ile może czekać ponad liczbę workerów
+
+_hash_pool = ThreadPoolExecutor(max_workers=AUTH_HASH_WORKERS, thread_name_prefix="bcrypt")
+_hash_slots = threading.BoundedSemaphore(AUTH_HASH_WORKERS + AUTH_HASH_QUEUE)
+
+async def _run_in_hash_pool(func, *args):
+    if not _hash_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts in progress, try again shortly",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_pool, func, *args)
+    finally:
+        _hash_slots.release()
+
+async def verify_password_async(plain_password, hashed_password):
+    return await _run_in_hash_pool(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password):
+    return await _run_in_hash_pool(get_password_hash, password)
+
 # --- Konfiguracja JWT (Tokenów) ---
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/login")
 
@@ -35,16 +70,74 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_db)):
-    """
-    Pobiera token z nagłówka, dekoduje go i zwraca użytkownika z bazy.
-    To jest nasza "bramka" do chronionych endpointów.
-    """
-    credentials_exception = HTTPException(
+# --- Cache token -> użytkownik ---
+# Dashboard strzela kilkoma requestami na sekundę, a każdy robił SELECT po users.
+# Trzymamy krótko (TTL, nie dłużej niż ważność tokenu) odłączoną kopię kolumn użytkownika.
+# Po zmianie użytkownika (np. statystyki w gamification) wołamy invalidate_user().
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", 30))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", 1024))
+
+_user_cache = OrderedDict() # token -> (expires_at, email, snapshot)
+_user_cache_lock = threading.Lock()
+_user_cache_stats = {"hits": 0, "misses": 0}
+
+def _snapshot(user: models.User) -> models.User:
+    """Kopia samych kolumn (bez relacji), odłączona od sesji - można ją trzymać między requestami."""
+    columns = {attr.key: getattr(user, attr.key) for attr in inspect(models.User).column_attrs}
+    snapshot = models.User(**columns)
+    make_transient_to_detached(snapshot)
+    return snapshot
+
+def _cached_user(token: str):
+    with _user_cache_lock:
+        item = _user_cache.get(token)
+        if item is None:
+            _user_cache_stats["misses"] += 1
+            return None
+        expires_at, _, snapshot = item
+        if expires_at < time.time():
+            del _user_cache[token]
+            _user_cache_stats["misses"] += 1
+            return None
+        _user_cache.move_to_end(token)
+        _user_cache_stats["hits"] += 1
+        return snapshot
+
+def _cache_user(token: str, user: models.User, token_exp=None):
+    expires_at = time.time() + AUTH_CACHE_TTL
+    if token_exp:
+        expires_at = min(expires_at, float(token_exp))
+    with _user_cache_lock:
+        _user_cache[token] = (expires_at, user.email, _snapshot(user))
+        _user_cache.move_to_end(token)
+        while len(_user_cache) > AUTH_CACHE_MAX_ENTRIES:
+            _user_cache.popitem(last=False)
+
+def invalidate_user(email: str):
+    """Wyrzuca z cache wszystkie tokeny danego użytkownika (po zmianie jego danych)."""
+    with _user_cache_lock:
+        for token in [t for t, item in _user_cache.items() if item[1] == email]:
+            del _user_cache[token]
+
+def user_cache_stats() -> dict:
+    total = _user_cache_stats["hits"] + _user_cache_stats["misses"]
+    return {
+        **_user_cache_stats,
+        "hit_rate": round(_user_cache_stats["hits"] / total, 3) if total else 0.0,
+        "entries": len(_user_cache),
+        "ttl": AUTH_CACHE_TTL
+    }
+
+def _credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def _decode_token(token: str):
+    """(email, exp) z tokenu albo 401."""
+    credentials_exception = _credentials_exception()
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
@@ -53,14 +146,50 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         token_data = schemas.TokenData(email=email)
     except JWTError:
         raise credentials_exception
-    
-    user = db.query(models.User).filter(models.User.email == token_data.email).first()
+    return token_data.email, payload.get("exp")
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_db)):
+    """
+    Pobiera token z nagłówka, dekoduje go i zwraca użytkownika z bazy.
+    To jest nasza "bramka" do chronionych endpointów.
+
+    `db` to ta sama sesja co w endpointach na get_db (FastAPI woła database.get_db raz na request).
+    Endpointy na get_async_db używają get_current_user_async - inaczej dostałyby drugą, synchroniczną sesję.
+    Trafienie w cache = zero zapytań: kopia jest wpinana w sesję przez merge(load=False).
+    """
+    cached = _cached_user(token)
+    if cached is not None:
+        return db.merge(cached, load=False)
+
+    email, token_exp = _decode_token(token)
+    user = db.query(models.User).filter(models.User.email == email).first()
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    _cache_user(token, user, token_exp)
+    return user
+
+async def get_current_user_async(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(database.get_async_db)):
+    """
+    To samo co get_current_user, ale na sesji async (asyncpg) - ta sama sesja co w async endpoincie,
+    więc request nie zajmuje wątku z threadpoola ani drugiego połączenia z puli.
+    """
+    cached = _cached_user(token)
+    if cached is not None:
+        return await db.merge(cached, load=False)
+
+    email, token_exp = _decode_token(token)
+    result = await db.execute(select(models.User).where(models.User.email == email))
+    user = result.scalars().first()
+    if user is None:
+        raise _credentials_exception()
+    _cache_user(token, user, token_exp)
     return user
 
 async def get_current_active_user(current_user: models.User = Depends(get_current_user)):
     # Tutaj w przyszłości można sprawdzić np. czy user jest zbanowany
     # if current_user.disabled:
     #     raise HTTPException(status_code=400, detail="Inactive user")
-    return current_user
\ No newline at end of file
+    return current_user
+
+async def get_current_active_user_async(current_user: models.User = Depends(get_current_user_async)):
+    return current_user
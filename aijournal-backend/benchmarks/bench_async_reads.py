@@ -0,0 +1,135 @@
+# G:\MotivAItor\aijournal-backend\benchmarks\bench_async_reads.py
+# Requests/sec gorących odczytów: sync (def + get_db, threadpool Starletta) vs async (get_async_db, asyncpg).
+# Te same funkcje z crud.py i ta sama autoryzacja co w main.py, aplikacja w procesie (httpx.ASGITransport),
+# baza z DATABASE_URL. Każdy worker klienta woła po kolei: zadania na dzień, inbox, projekty.
+#
+#   python benchmarks/bench_async_reads.py
+#   python benchmarks/bench_async_reads.py --concurrency 200 --seconds 20 --tasks 2000
+#
+# Seeduje jednego usera bench_* i kasuje go na końcu. Schemat musi być aktualny (python migrate.py).
+import asyncio
+import os
+import sys
+import time
+from datetime import date
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from database import SessionLocal, async_engine, get_async_db, get_db
+import auth
+import crud
+import models
+import schemas
+from bench_utils import int_arg, summary
+
+TODAY = date.today()
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/sync/tasks/{task_date}", response_model=List[schemas.Task])
+    def sync_tasks(task_date: date, db: Session = Depends(get_db), user: models.User = Depends(auth.get_current_active_user)):
+        return crud.get_tasks_by_date(db, user.id, task_date)
+
+    @app.get("/sync/inbox", response_model=List[schemas.Task])
+    def sync_inbox(db: Session = Depends(get_db), user: models.User = Depends(auth.get_current_active_user)):
+        return crud.get_inbox_tasks(db, user.id)
+
+    @app.get("/sync/projects", response_model=List[schemas.Project])
+    def sync_projects(db: Session = Depends(get_db), user: models.User = Depends(auth.get_current_active_user)):
+        return crud.get_projects_with_stats(db, user.id)
+
+    @app.get("/async/tasks/{task_date}", response_model=List[schemas.Task])
+    async def async_tasks(task_date: date, db: AsyncSession = Depends(get_async_db),
+                          user: models.User = Depends(auth.get_current_active_user_async)):
+        return await crud.get_tasks_by_date_async(db, user.id, task_date)
+
+    @app.get("/async/inbox", response_model=List[schemas.Task])
+    async def async_inbox(db: AsyncSession = Depends(get_async_db),
+                          user: models.User = Depends(auth.get_current_active_user_async)):
+        return await crud.get_inbox_tasks_async(db, user.id)
+
+    @app.get("/async/projects", response_model=List[schemas.Project])
+    async def async_projects(db: AsyncSession = Depends(get_async_db),
+                             user: models.User = Depends(auth.get_current_active_user_async)):
+        return await crud.get_projects_with_stats_async(db, user.id)
+
+    return app
+
+def seed(tasks: int) -> int:
+    db = SessionLocal()
+    try:
+        user = models.User(email=f"bench_{time.time_ns()}@bench.local", hashed_password="x")
+        db.add(user)
+        db.flush()
+        projects = [models.Project(name=f"Projekt {i}", owner_id=user.id) for i in range(5)]
+        db.add_all(projects)
+        db.flush()
+        db.add_all(models.ProjectActivity(project_id=p.id, task_count=10, completed_count=5, pomodoro_count=3) for p in projects)
+        # Połowa na dziś, połowa w inboxie
+        db.add_all(
+            models.Task(content=f"Zadanie {i}", task_date=TODAY if i % 2 else None, order=i * crud.ORDER_GAP,
+                        owner_id=user.id, project_id=projects[i % 5].id)
+            for i in range(tasks)
+        )
+        db.commit()
+        return user.id
+    finally:
+        db.close()
+
+def cleanup(user_id: int):
+    with SessionLocal() as db:
+        db.execute(text("DELETE FROM tasks WHERE owner_id = :u"), {"u": user_id})
+        db.execute(text("DELETE FROM project_activity WHERE project_id IN (SELECT id FROM projects WHERE owner_id = :u)"), {"u": user_id})
+        db.execute(text("DELETE FROM projects WHERE owner_id = :u"), {"u": user_id})
+        db.execute(text("DELETE FROM users WHERE id = :u"), {"u": user_id})
+        db.commit()
+
+async def run_variant(client, prefix: str, headers: dict, concurrency: int, seconds: float) -> list[float]:
+    paths = [f"/{prefix}/tasks/{TODAY.isoformat()}", f"/{prefix}/inbox", f"/{prefix}/projects"]
+    latencies = []
+    deadline = time.perf_counter() + seconds
+
+    async def worker(offset: int):
+        i = offset
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            res = await client.get(paths[i % len(paths)], headers=headers)
+            res.raise_for_status()
+            latencies.append(time.perf_counter() - started)
+            i += 1
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return latencies
+
+async def bench(user_id: int, concurrency: int, seconds: float):
+    with SessionLocal() as db:
+        email = db.get(models.User, user_id).email
+    headers = {"Authorization": f"Bearer {auth.create_access_token({'sub': email})}"}
+    transport = httpx.ASGITransport(app=build_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        for prefix in ("sync", "async"):
+            await run_variant(client, prefix, headers, concurrency, 1.0) # Rozgrzewka (pule połączeń, cache auth)
+            latencies = await run_variant(client, prefix, headers, concurrency, seconds)
+            print(summary(f"{prefix:>5}", latencies, seconds))
+    await async_engine.dispose()
+
+def main():
+    tasks = int_arg("--tasks", 200)
+    concurrency = int_arg("--concurrency", 64)
+    seconds = int_arg("--seconds", 10)
+    user_id = seed(tasks)
+    print(f"🌱 {tasks} zadań, 5 projektów | {concurrency} równoległych klientów, {seconds} s na wariant")
+    try:
+        asyncio.run(bench(user_id, concurrency, seconds))
+    finally:
+        cleanup(user_id)
+        print("🧹 Dane benchmarku usunięte.")
+
+if __name__ == "__main__":
+    main()
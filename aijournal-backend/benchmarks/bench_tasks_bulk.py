@@ -0,0 +1,76 @@
+# G:\MotivAItor\aijournal-backend\benchmarks\bench_tasks_bulk.py
+# Zapis dużych Brain Dumpów: stara pętla crud.create_user_task (blokada + odczyt order + INSERT + rollup
+# + commit na każde zadanie) vs crud.create_tasks_bulk (jedna blokada, jeden INSERT ... RETURNING, jeden commit).
+# Mierzy tylko SQL (bez LLM i kolejki RAG). Baza z DATABASE_URL.
+#
+#   python benchmarks/bench_tasks_bulk.py                      -> dumpy po 10, 100, 1000 zadań, 5 powtórzeń
+#   python benchmarks/bench_tasks_bulk.py --sizes 50,500 --repeat 10
+#
+# Seeduje usera bench_* z projektem i kasuje go na końcu. Schemat musi być aktualny (python migrate.py).
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sqlalchemy import text
+from database import SessionLocal
+import crud
+import models
+import schemas
+from bench_utils import int_arg, percentile
+
+def seed() -> tuple[int, int]:
+    with SessionLocal() as db:
+        user = models.User(email=f"bench_{time.time_ns()}@bench.local", hashed_password="x")
+        db.add(user)
+        db.flush()
+        project = models.Project(name="Bench", owner_id=user.id)
+        db.add(project)
+        db.commit()
+        return user.id, project.id
+
+def cleanup(user_id: int):
+    with SessionLocal() as db:
+        db.execute(text("DELETE FROM tasks WHERE owner_id = :u"), {"u": user_id})
+        db.execute(text("DELETE FROM project_activity WHERE project_id IN (SELECT id FROM projects WHERE owner_id = :u)"), {"u": user_id})
+        db.execute(text("DELETE FROM projects WHERE owner_id = :u"), {"u": user_id})
+        db.execute(text("DELETE FROM users WHERE id = :u"), {"u": user_id})
+        db.commit()
+
+def dump(size: int, project_id: int, day: date) -> list[schemas.TaskCreate]:
+    return [schemas.TaskCreate(content=f"Zadanie {i}", task_date=day, project_id=project_id) for i in range(size)]
+
+def per_item(db, tasks, user_id):
+    return [crud.create_user_task(db, t, user_id) for t in tasks]
+
+def bulk(db, tasks, user_id):
+    return crud.create_tasks_bulk(db, tasks, user_id)
+
+def main():
+    sizes = [int(s) for s in sys.argv[sys.argv.index("--sizes") + 1].split(",")] if "--sizes" in sys.argv else [10, 100, 1000]
+    repeat = int_arg("--repeat", 5)
+    user_id, project_id = seed()
+    print(f"🌱 User {user_id} | dumpy: {sizes} | {repeat} powtórzeń")
+    try:
+        for size in sizes:
+            results = {}
+            for label, func in (("pętla create_user_task", per_item), ("create_tasks_bulk", bulk)):
+                timings = []
+                for r in range(repeat):
+                    # Każde powtórzenie na nowej liście (inny dzień), żeby rosnąca lista nie faworyzowała drugiego wariantu
+                    day = date(2000 + r, 1 + sizes.index(size), 1 if label == "create_tasks_bulk" else 2)
+                    tasks = dump(size, project_id, day)
+                    with SessionLocal() as db:
+                        started = time.perf_counter()
+                        func(db, tasks, user_id)
+                        timings.append(time.perf_counter() - started)
+                results[label] = percentile(timings, 50)
+                print(f"📊 {size:5d} zadań | {label:<24} p50 {results[label] * 1000:9.1f} ms | {size / results[label]:9.0f} zadań/s")
+            print(f"🚀 {size} zadań: bulk szybszy {results['pętla create_user_task'] / results['create_tasks_bulk']:.1f}x")
+    finally:
+        cleanup(user_id)
+        print("🧹 Dane benchmarku usunięte.")
+
+if __name__ == "__main__":
+    main()
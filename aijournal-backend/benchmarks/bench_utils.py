@@ -0,0 +1,84 @@
+# Wspólne drobiazgi benchmarków (argumenty w stylu plan_audit.py, percentyle).
+import sys
+
+def int_arg(name: str, default: int) -> int:
+    if name in sys.argv:
+        return int(sys.argv[sys.argv.index(name) + 1])
+    return default
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+def summary(label: str, latencies: list[float], seconds: float) -> str:
+    """Jedna linia wyniku: req/s + p50/p99 w ms."""
+    return (f"📊 {label}: {len(latencies) / seconds:8.1f} req/s | "
+            f"p50 {percentile(latencies, 50) * 1000:7.2f} ms | p99 {percentile(latencies, 99) * 1000:7.2f} ms")
+
+# --- RAG: syntetyczne dzienniki i embedder bez modelu ---
+import hashlib
+import random
+from datetime import date, timedelta
+
+WORDS = (
+    "trening bench press przysiad martwy ciąg bieganie sen waga kalorie nastrój projekt raport klient "
+    "spotkanie kod deploy refaktor błąd test zakupy obiad rodzina książka nauka angielski medytacja "
+    "lenistwo wymówki zmęczenie stres plan cel rekord kontuzja rozciąganie rower basen spacer"
+).split()
+DOC_TYPES = ("task", "health", "workout")
+
+def synthetic_docs(count: int, users: int = 1, days: int = 365, seed: int = 7) -> list[dict]:
+    """Wpisy w formacie rag.add_documents: losowe zdania z WORDS, rozłożone po userach i ostatnich `days` dniach."""
+    rng = random.Random(seed)
+    today = date.today()
+    docs = []
+    for i in range(count):
+        day = today - timedelta(days=rng.randrange(days))
+        doc_type = DOC_TYPES[i % len(DOC_TYPES)]
+        docs.append({
+            "doc_id": f"{doc_type}_{i}",
+            "text": " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 16))),
+            "metadata": {"type": doc_type, "date": day.isoformat()},
+            "user_id": 1 + i % users,
+        })
+    return docs
+
+def hash_vector(text: str, dims: int = 64) -> list[float]:
+    vector = [0.0] * dims
+    for word in (text or "").casefold().split():
+        vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % dims] += 1.0
+    norm = sum(v * v for v in vector) ** 0.5 or 1.0
+    return [v / norm for v in vector]
+
+def use_memory_rag(tmp_dir: str, real_model: bool = False):
+    """rag.py na Chroma w pamięci + indeks leksykalny w tmp_dir. Bez --model embeddingi to hash słów (zero kosztu modelu)."""
+    import chromadb
+    import rag
+    import rag_lexical
+
+    class HashEmbedding(chromadb.EmbeddingFunction):
+        def __call__(self, input):
+            return [hash_vector(text) for text in input]
+
+    rag._client = chromadb.EphemeralClient()
+    rag._embedder = rag._make_embedding_function() if real_model else HashEmbedding()
+    rag._collections.clear()
+    rag_lexical._index = rag_lexical.LexicalIndex(f"{tmp_dir}/lexical.sqlite3")
+
+def reset_memory_rag(tmp_dir: str):
+    """Czyści kolekcje i indeks leksykalny między wariantami benchmarku."""
+    import os
+    import rag
+    import rag_lexical
+
+    for name in rag.list_collections():
+        rag._client.delete_collection(name)
+    rag._collections.clear()
+    rag_lexical._index._conn.close()
+    for suffix in ("", "-wal", "-shm"):
+        path = f"{tmp_dir}/lexical.sqlite3{suffix}"
+        if os.path.exists(path):
+            os.remove(path)
+    rag_lexical._index = rag_lexical.LexicalIndex(f"{tmp_dir}/lexical.sqlite3")
@@ -1,9 +1,14 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import desc, func, select, insert, delete, update, values, column, literal_column, tuple_, Integer, Date
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from datetime import date, datetime, timedelta
+import re
 import models
 import schemas
 import auth
+import rag_queue
+import rag_documents
 
 # ==========================================
 # === UŻYTKOWNIK (AUTH) ===
@@ -24,77 +29,231 @@ def create_user(db: Session, user: schemas.UserCreate):
 # === PROJEKTY I MOMENTUM (Główna Logika) ===
 # ==========================================
 
+def _momentum_stats(total_tasks: int, completed_tasks: int, last_task_at, last_pomodoro_date, total_pomodoros: int, now: datetime):
+    """
+    Czysta logika Momentum (bez zapytań do bazy).
+    Dostaje gotowe agregaty projektu i zwraca słownik `stats` dla frontendu.
+    """
+    # PRÓG RDZEWIENIA: 3 DNI
+    # Jeśli przez 3 dni nie dotkniesz projektu (Zadanie lub Pomodoro), zaczyna rdzewieć.
+    rust_threshold = now - timedelta(days=3)
+
+    # 1. Postęp zadań (Progress Bar)
+    progress_pct = int((completed_tasks / total_tasks * 100)) if total_tasks > 0 else 0
+
+    # 2. Wybieramy nowszą datę (Co było później: zadanie czy timer?)
+    last_activity = last_task_at
+
+    if last_pomodoro_date:
+        # Pomodoro zapisuje tylko datę (Date), zamieniamy na datetime dla porównania
+        pomo_dt = datetime.combine(last_pomodoro_date, datetime.min.time())
+
+        # Jeśli pomodoro było nowsze niż zadanie (lub zadań brak), to ono wygrywa
+        if last_activity is None or pomo_dt > last_activity:
+            last_activity = pomo_dt
+
+    # 3. Decyzja: Czy projekt rdzewieje?
+    is_rusting = False
+    days_inactive = 0
+
+    if last_activity:
+        if last_activity < rust_threshold:
+            is_rusting = True
+            delta = now - last_activity
+            days_inactive = delta.days
+    elif total_tasks > 0:
+        # Są zadania, ale żadne nie zrobione i brak pomodoro -> rdzewieje od razu
+        is_rusting = True
+        days_inactive = 99 # Symbolicznie "długo"
+
+    return {
+        "progress": progress_pct,
+        "is_rusting": is_rusting,
+        "last_activity": last_activity.isoformat() if last_activity else None,
+        "days_inactive": days_inactive,
+        "total_pomodoros": total_pomodoros # Wiedza z całości!
+    }
+
 def get_projects_with_stats(db: Session, user_id: int):
     """
     Pobiera projekty i oblicza ich "stan zdrowia" (Momentum).
     Analizuje zarówno zakończone zadania, jak i sesje Pomodoro.
+
+    Agregaty siedzą w tabeli `project_activity` (aktualizowanej przy zapisie),
+    więc to jest jedno zapytanie po indeksie - niezależnie od długości historii.
     """
-    projects = db.query(models.Project).filter(models.Project.owner_id == user_id).all()
-    
-    # PRÓG RDZEWIENIA: 3 DNI
-    # Jeśli przez 3 dni nie dotkniesz projektu (Zadanie lub Pomodoro), zaczyna rdzewieć.
-    rust_threshold = datetime.now() - timedelta(days=3) 
-    
+    rows = db.query(models.Project, models.ProjectActivity).outerjoin(
+        models.ProjectActivity, models.ProjectActivity.project_id == models.Project.id
+    ).filter(models.Project.owner_id == user_id).all()
+
+    now = datetime.now()
     results = []
-    for p in projects:
-        # 1. Postęp zadań (Progress Bar)
-        total_tasks = len(p.tasks)
-        completed_tasks = len([t for t in p.tasks if t.is_completed])
-        progress_pct = int((completed_tasks / total_tasks * 100)) if total_tasks > 0 else 0
-        
-        # 2. Analiza Ostatniej Aktywności (Momentum)
-        
-        # A. Kiedy ostatnio ukończono zadanie?
-        last_task = db.query(models.Task.completed_at).filter(
-            models.Task.project_id == p.id,
-            models.Task.is_completed == True
-        ).order_by(models.Task.completed_at.desc()).first()
-        
-        # B. Kiedy ostatnio robiono Pomodoro w tym projekcie?
-        last_pomodoro = db.query(models.PomodoroSession.date).filter(
-            models.PomodoroSession.project_id == p.id
-        ).order_by(models.PomodoroSession.date.desc()).first()
-        
-        # Wybieramy nowszą datę (Co było później: zadanie czy timer?)
-        last_activity = None
-        
-        if last_task and last_task.completed_at:
-            last_activity = last_task.completed_at
-            
-        if last_pomodoro and last_pomodoro.date:
-            # Pomodoro zapisuje tylko datę (Date), zamieniamy na datetime dla porównania
-            pomo_dt = datetime.combine(last_pomodoro.date, datetime.min.time())
-            
-            # Jeśli pomodoro było nowsze niż zadanie (lub zadań brak), to ono wygrywa
-            if last_activity is None or pomo_dt > last_activity:
-                last_activity = pomo_dt
-        
-        # 3. Decyzja: Czy projekt rdzewieje?
-        is_rusting = False
-        days_inactive = 0
-        
-        if last_activity:
-            if last_activity < rust_threshold:
-                is_rusting = True
-                delta = datetime.now() - last_activity
-                days_inactive = delta.days
-        elif total_tasks > 0: 
-            # Są zadania, ale żadne nie zrobione i brak pomodoro -> rdzewieje od razu
-            is_rusting = True
-            days_inactive = 99 # Symbolicznie "długo"
-            
-        # Zapisujemy statystyki (Frontend to odbierze w polu `stats`)
-        p.stats = {
-            "progress": progress_pct,
-            "is_rusting": is_rusting,
-            "last_activity": last_activity.isoformat() if last_activity else None,
-            "days_inactive": days_inactive,
-            "total_pomodoros": len(p.pomodoros) # Wiedza z całości!
-        }
+    for p, activity in rows:
+        if activity is None:
+            # Brak wiersza rollupu (np. przed pierwszym rebuildem) - traktujemy jak pusty projekt
+            p.stats = _momentum_stats(0, 0, None, None, 0, now)
+        else:
+            # Zapisujemy statystyki (Frontend to odbierze w polu `stats`)
+            p.stats = _momentum_stats(
+                activity.task_count, activity.completed_count, activity.last_task_completed_at,
+                activity.last_pomodoro_date, activity.pomodoro_count, now
+            )
         results.append(p)
-        
+
+    return results
+
+async def get_projects_with_stats_async(db: AsyncSession, user_id: int):
+    """To samo co get_projects_with_stats, ale przez async sesję (endpoint GET /api/projects)."""
+    result = await db.execute(
+        select(models.Project, models.ProjectActivity).outerjoin(
+            models.ProjectActivity, models.ProjectActivity.project_id == models.Project.id
+        ).where(models.Project.owner_id == user_id)
+    )
+
+    now = datetime.now()
+    results = []
+    for p, activity in result.all():
+        if activity is None:
+            p.stats = _momentum_stats(0, 0, None, None, 0, now)
+        else:
+            p.stats = _momentum_stats(
+                activity.task_count, activity.completed_count, activity.last_task_completed_at,
+                activity.last_pomodoro_date, activity.pomodoro_count, now
+            )
+        results.append(p)
+
     return results
 
+# --- ROLLUP AKTYWNOŚCI PROJEKTU ---
+
+def _bump_project_activity(
+    db: Session, project_id: int | None,
+    tasks: int = 0, completed: int = 0, last_task_completed_at: datetime | None = None,
+    pomodoros: int = 0, pomodoro_minutes: int = 0, last_pomodoro_date: date | None = None,
+    recompute_last_task: bool = False
+):
+    """
+    Nakłada przyrosty na wiersz `project_activity` (UPSERT) w bieżącej transakcji.
+    Commit robi funkcja wywołująca - razem z właściwym zapisem.
+    """
+    if project_id is None:
+        return
+
+    table = models.ProjectActivity
+    stmt = pg_insert(table).values(
+        project_id=project_id,
+        task_count=tasks,
+        completed_count=completed,
+        last_task_completed_at=last_task_completed_at,
+        pomodoro_count=pomodoros,
+        pomodoro_minutes=pomodoro_minutes,
+        last_pomodoro_date=last_pomodoro_date
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.project_id],
+        set_={
+            "task_count": table.task_count + stmt.excluded.task_count,
+            "completed_count": table.completed_count + stmt.excluded.completed_count,
+            # GREATEST w Postgresie ignoruje NULL-e, więc brak nowej daty niczego nie psuje
+            "last_task_completed_at": func.greatest(table.last_task_completed_at, stmt.excluded.last_task_completed_at),
+            "pomodoro_count": table.pomodoro_count + stmt.excluded.pomodoro_count,
+            "pomodoro_minutes": table.pomodoro_minutes + stmt.excluded.pomodoro_minutes,
+            "last_pomodoro_date": func.greatest(table.last_pomodoro_date, stmt.excluded.last_pomodoro_date),
+            "updated_at": func.now()
+        }
+    )
+    db.execute(stmt)
+
+    if recompute_last_task:
+        # Cofnięcie/usunięcie ukończonego zadania - maksimum mogło się zmniejszyć,
+        # więc liczymy je od nowa (tylko dla tego jednego projektu).
+        last_completed = select(func.max(models.Task.completed_at)).where(
+            models.Task.project_id == project_id,
+            models.Task.is_completed == True
+        ).scalar_subquery()
+        db.query(table).filter(table.project_id == project_id).update(
+            {"last_task_completed_at": last_completed}, synchronize_session=False
+        )
+
+def _task_activity_state(db_task: models.Task):
+    """Wkład zadania w rollup: (project_id, is_completed, completed_at)."""
+    return (db_task.project_id, bool(db_task.is_completed), db_task.completed_at)
+
+def _sync_task_activity(db: Session, before, after):
+    """
+    Przenosi zmianę zadania (stan przed -> stan po) na `project_activity`.
+    `before`/`after` to wynik _task_activity_state albo None (zadanie nie istnieje).
+    """
+    if before == after:
+        return
+    # autoflush jest wyłączony - wypychamy zmianę zadania, żeby przeliczenia ją widziały
+    db.flush()
+
+    if before and after and before[0] == after[0]:
+        # Ten sam projekt: same przyrosty
+        _bump_project_activity(
+            db, after[0],
+            completed=int(after[1]) - int(before[1]),
+            last_task_completed_at=after[2] if after[1] else None,
+            recompute_last_task=before[1] and not after[1]
+        )
+        return
+
+    if before:
+        _bump_project_activity(
+            db, before[0],
+            tasks=-1, completed=-int(before[1]),
+            recompute_last_task=before[1]
+        )
+    if after:
+        _bump_project_activity(
+            db, after[0],
+            tasks=1, completed=int(after[1]),
+            last_task_completed_at=after[2] if after[1] else None
+        )
+
+def rebuild_project_activity(db: Session):
+    """
+    Przelicza cały `project_activity` od zera z surowych tabel (tasks + pomodoro_sessions).
+    Używane przez rebuild_project_activity.py - np. po imporcie danych albo gdy rollup się rozjedzie.
+    """
+    task_agg = select(
+        models.Task.project_id.label("project_id"),
+        func.count(models.Task.id).label("task_count"),
+        func.count(models.Task.id).filter(models.Task.is_completed == True).label("completed_count"),
+        func.max(models.Task.completed_at).filter(models.Task.is_completed == True).label("last_task_completed_at")
+    ).where(models.Task.project_id != None).group_by(models.Task.project_id).subquery()
+
+    pomodoro_agg = select(
+        models.PomodoroSession.project_id.label("project_id"),
+        func.count(models.PomodoroSession.id).label("pomodoro_count"),
+        func.sum(models.PomodoroSession.duration).label("pomodoro_minutes"),
+        func.max(models.PomodoroSession.date).label("last_pomodoro_date")
+    ).where(models.PomodoroSession.project_id != None).group_by(models.PomodoroSession.project_id).subquery()
+
+    rollup = select(
+        models.Project.id,
+        func.coalesce(task_agg.c.task_count, 0),
+        func.coalesce(task_agg.c.completed_count, 0),
+        task_agg.c.last_task_completed_at,
+        func.coalesce(pomodoro_agg.c.pomodoro_count, 0),
+        func.coalesce(pomodoro_agg.c.pomodoro_minutes, 0),
+        pomodoro_agg.c.last_pomodoro_date
+    ).outerjoin(
+        task_agg, task_agg.c.project_id == models.Project.id
+    ).outerjoin(
+        pomodoro_agg, pomodoro_agg.c.project_id == models.Project.id
+    )
+
+    db.execute(delete(models.ProjectActivity))
+    db.execute(insert(models.ProjectActivity).from_select(
+        ["project_id", "task_count", "completed_count", "last_task_completed_at",
+         "pomodoro_count", "pomodoro_minutes", "last_pomodoro_date"],
+        rollup
+    ))
+    db.commit()
+    return db.query(models.ProjectActivity).count()
+
 def create_project(db: Session, project: schemas.ProjectCreate, user_id: int):
     db_project = models.Project(
         name=project.name,
@@ -104,6 +263,9 @@ def create_project(db: Session, project: schemas.ProjectCreate, user_id: int):
         owner_id=user_id
     )
     db.add(db_project)
+    db.flush()
+    # Pusty wiersz rollupu od razu, żeby kolejne zapisy robiły już tylko przyrosty
+    db.add(models.ProjectActivity(project_id=db_project.id))
     db.commit()
     db.refresh(db_project)
     
@@ -134,33 +296,171 @@ def get_inbox_tasks(db: Session, user_id: int):
         models.Task.task_date == None
     ).order_by(models.Task.order.asc()).all()
 
+# Wersje async (gorące odczyty - endpointy bez threadpoola)
+async def get_tasks_by_date_async(db: AsyncSession, user_id: int, task_date: date):
+    result = await db.execute(
+        select(models.Task).where(
+            models.Task.owner_id == user_id, # Filtr bezpieczeństwa
+            models.Task.task_date == task_date
+        ).order_by(models.Task.order.asc())
+    )
+    return result.scalars().all()
+
+async def get_inbox_tasks_async(db: AsyncSession, user_id: int):
+    result = await db.execute(
+        select(models.Task).where(
+            models.Task.owner_id == user_id, # Filtr bezpieczeństwa
+            models.Task.task_date.is_(None)
+        ).order_by(models.Task.order.asc())
+    )
+    return result.scalars().all()
+
+# Kolejność zadań na liście trzymamy z dziurami (0, 1024, 2048, ...): wstawienie między dwa zadania
+# to środek przedziału, więc przesunięcie / dodanie zmienia dokładnie jeden wiersz.
+# Dopiero gdy dziura się skończy (sąsiedzi różnią się o 1), lista jest rozkładana od nowa.
+ORDER_GAP = 1024
+# Namespace dla pg_advisory_xact_lock(ns, user_id) - nie może kolidować z MIGRATION_LOCK_ID
+TASK_ORDER_LOCK_NS = 2201
+
+def _lock_task_order(db: Session, user_id: int):
+    """
+    Blokada kolejności zadań usera do końca transakcji (commit/rollback ją zwalnia).
+    Dwa równoległe dodania na koniec listy nie dostaną tego samego `order`.
+    """
+    db.execute(select(func.pg_advisory_xact_lock(TASK_ORDER_LOCK_NS, user_id)))
+
+def _task_list_filter(query, user_id: int, task_date):
+    query = query.filter(models.Task.owner_id == user_id)
+    if task_date:
+        return query.filter(models.Task.task_date == task_date)
+    return query.filter(models.Task.task_date == None)
+
+def _last_order(db: Session, user_id: int, task_date):
+    """
+    Najwyższy `order` na liście dnia (albo w inboxie) usera, None gdy lista pusta.
+    Czytamy tylko kolumnę order - index-only scan po ix_tasks_owner_date_order / ix_tasks_owner_inbox_order.
+    """
+    query = _task_list_filter(db.query(models.Task.order), user_id, task_date)
+    return query.order_by(models.Task.order.desc()).limit(1).scalar()
+
+def _next_order(db: Session, user_id: int, task_date) -> int:
+    """Pozycja na końcu listy. Wołać pod _lock_task_order, inaczej dwa inserty mogą dostać to samo."""
+    last_order = _last_order(db, user_id, task_date)
+    return (last_order + ORDER_GAP) if last_order is not None else 0
+
+def _order_between(lower, upper):
+    """Order między sąsiadami (None = brak sąsiada z tej strony). None, gdy między nimi nie ma już miejsca."""
+    if lower is None and upper is None:
+        return None
+    if lower is None:
+        return upper - ORDER_GAP
+    if upper is None:
+        return lower + ORDER_GAP
+    if upper - lower < 2:
+        return None
+    return (lower + upper) // 2
+
+def _adjacent_order(db: Session, user_id: int, task_date, anchor_id: int, anchor_order: int, below: bool, exclude_id: int):
+    """
+    Order zadania tuż pod (below=True) albo tuż nad kotwicą na liście, None gdy kotwica jest na brzegu.
+    Kolejność jak w rebalance_task_orders: (order, id) - zadania z równym order też mają swoje miejsce.
+    """
+    query = _task_list_filter(db.query(models.Task.order), user_id, task_date).filter(models.Task.id != exclude_id)
+    position, anchor = tuple_(models.Task.order, models.Task.id), tuple_(anchor_order, anchor_id)
+    if below:
+        query = query.filter(position > anchor).order_by(models.Task.order.asc(), models.Task.id.asc())
+    else:
+        query = query.filter(position < anchor).order_by(models.Task.order.desc(), models.Task.id.desc())
+    return query.limit(1).scalar()
+
+def rebalance_task_orders(db: Session, user_id: int, task_date):
+    """
+    Rozkłada kolejność listy od nowa co ORDER_GAP (0, 1024, 2048, ...) jednym UPDATE z row_number().
+    Wołane tylko wtedy, gdy skończy się miejsce między sąsiadami. Bez commita - robi go wołający.
+    """
+    date_filter = models.Task.task_date == task_date if task_date else models.Task.task_date == None
+    ranked = (
+        select(
+            models.Task.id,
+            ((func.row_number().over(order_by=(models.Task.order, models.Task.id)) - 1) * ORDER_GAP).label("order")
+        )
+        .where(models.Task.owner_id == user_id, date_filter)
+        .subquery()
+    )
+    db.execute(
+        update(models.Task)
+        .where(models.Task.id == ranked.c.id)
+        .values(order=ranked.c.order)
+        .execution_options(synchronize_session=False)
+    )
+
 def create_user_task(db: Session, task: schemas.TaskCreate, user_id: int):
     target_date = task.task_date 
     
-    # Obliczanie kolejności (order) TYLKO w ramach zadań tego użytkownika
-    query = db.query(models.Task).filter(models.Task.owner_id == user_id)
-    if target_date:
-        query = query.filter(models.Task.task_date == target_date)
-    else:
-        query = query.filter(models.Task.task_date == None)
-        
-    last_task = query.order_by(models.Task.order.desc()).first()
-    new_order = (last_task.order + 1) if last_task else 0
+    # Obliczanie kolejności (order) TYLKO w ramach zadań tego użytkownika - na koniec listy, pod blokadą
+    _lock_task_order(db, user_id)
+    new_order = _next_order(db, user_id, target_date)
 
     db_task = models.Task(
         content=task.content,
         task_date=target_date,
         is_completed=task.is_completed,
         points=task.points,
+        priority=task.priority,
         order=new_order,
         owner_id=user_id, # Przypisanie właściciela
         project_id=task.project_id
     )
     db.add(db_task)
+    _sync_task_activity(db, None, _task_activity_state(db_task))
     db.commit()
     db.refresh(db_task)
     return db_task
 
+def create_tasks_bulk(db: Session, tasks: list[schemas.TaskCreate], user_id: int):
+    """
+    Wiele zadań naraz (Brain Dump): jedna blokada, jeden odczyt ostatniego `order` na listę,
+    jeden wielowierszowy INSERT ... RETURNING i jeden commit - zamiast ~3 zapytań na zadanie.
+    Zwraca wiersze (Row z atrybutami jak models.Task) w kolejności wejścia.
+    """
+    if not tasks:
+        return []
+
+    _lock_task_order(db, user_id)
+    next_orders = {}
+    rows = []
+    for task in tasks:
+        if task.task_date not in next_orders:
+            next_orders[task.task_date] = _next_order(db, user_id, task.task_date)
+        rows.append({
+            "content": task.content,
+            "task_date": task.task_date,
+            "is_completed": task.is_completed,
+            "points": task.points,
+            "priority": task.priority,
+            "order": next_orders[task.task_date],
+            "owner_id": user_id,
+            "project_id": task.project_id
+        })
+        next_orders[task.task_date] += ORDER_GAP
+
+    table = models.Task.__table__
+    created = db.execute(insert(table).values(rows).returning(table)).all()
+
+    # Rollup projektów: jeden UPSERT na projekt, a nie na zadanie
+    per_project = {}
+    for row in created:
+        counts = per_project.setdefault(row.project_id, [0, 0])
+        counts[0] += 1
+        counts[1] += int(bool(row.is_completed))
+    for project_id, (count, completed) in per_project.items():
+        _bump_project_activity(db, project_id, tasks=count, completed=completed)
+
+    db.commit()
+    # RETURNING nie gwarantuje kolejności - odtwarzamy ją po (lista, order)
+    position = {(row["task_date"], row["order"]): i for i, row in enumerate(rows)}
+    return sorted(created, key=lambda row: position[(row.task_date, row.order)])
+
 def get_task_by_id(db: Session, task_id: int, user_id: int):
     """Pobiera zadanie tylko jeśli należy do usera"""
     return db.query(models.Task).filter(
@@ -170,6 +470,7 @@ def get_task_by_id(db: Session, task_id: int, user_id: int):
 
 def toggle_task(db: Session, db_task: models.Task):
     """Przełącza status i aktualizuje datę ukończenia (ważne dla Rdzy)"""
+    before = _task_activity_state(db_task)
     db_task.is_completed = not db_task.is_completed
     
     if db_task.is_completed:
@@ -177,6 +478,7 @@ def toggle_task(db: Session, db_task: models.Task):
     else:
         db_task.completed_at = None
         
+    _sync_task_activity(db, before, _task_activity_state(db_task))
     db.commit()
     db.refresh(db_task)
     return db_task
@@ -187,41 +489,133 @@ def update_task(db: Session, task_id: int, task_update: schemas.TaskUpdate, user
     if not db_task:
         return None
     
+    before = _task_activity_state(db_task)
     update_data = task_update.dict(exclude_unset=True)
+    if update_data.get('priority', '') is None:
+        del update_data['priority'] # Kolumna NOT NULL - jawny null z frontu nic nie zmienia
     
     # Jeśli zmieniamy datę, trzeba przeliczyć 'order', żeby zadanie spadło na koniec nowej listy
     if 'task_date' in update_data:
-        new_date = update_data['task_date']
-        query = db.query(models.Task).filter(models.Task.owner_id == user_id)
-        if new_date:
-            query = query.filter(models.Task.task_date == new_date)
-        else:
-            query = query.filter(models.Task.task_date == None)
-        last_task = query.order_by(models.Task.order.desc()).first()
-        update_data['order'] = (last_task.order + 1) if last_task else 0
+        _lock_task_order(db, user_id)
+        update_data['order'] = _next_order(db, user_id, update_data['task_date'])
 
     for key, value in update_data.items():
         setattr(db_task, key, value)
 
     db.add(db_task)
+    _sync_task_activity(db, before, _task_activity_state(db_task))
+    db.commit()
+    db.refresh(db_task)
+
+    # Treść/data/projekt trafiają do dokumentu RAG - po zmianie odświeżamy wektor (w tle)
+    if update_data.keys() & {"content", "task_date", "project_id"}:
+        rag_queue.enqueue_many([rag_documents.task_document(db_task)])
+    return db_task
+
+def move_task(db: Session, task_id: int, move: schemas.TaskMove, user_id: int):
+    """
+    Przeciąganie pojedynczego zadania (także na inny dzień / do inboxa): wstawiamy je między
+    `after_id` (nad nim) i `before_id` (pod nim) na liście `task_date`. Wystarczy jeden z nich - drugą granicę
+    bierzemy z listy. Bez sąsiadów - na koniec listy.
+    Zmienia się jeden wiersz; przebudowa całej listy tylko gdy skończy się miejsce między sąsiadami.
+    Zwraca None, gdy zadanie albo któryś z sąsiadów nie istnieje / nie należy do usera / leży na innej liście.
+    """
+    db_task = get_task_by_id(db, task_id, user_id)
+    if not db_task:
+        return None
+
+    neighbour_ids = {i for i in (move.after_id, move.before_id) if i is not None}
+    if task_id in neighbour_ids:
+        return None
+
+    _lock_task_order(db, user_id)
+    date_changed = db_task.task_date != move.task_date
+
+    def neighbour_orders():
+        if not neighbour_ids:
+            return {}
+        rows = _task_list_filter(
+            db.query(models.Task.id, models.Task.order), user_id, move.task_date
+        ).filter(models.Task.id.in_(neighbour_ids)).all()
+        return dict(rows)
+
+    def bounds():
+        orders = neighbour_orders()
+        lower, upper = orders.get(move.after_id), orders.get(move.before_id)
+        # Podany tylko jeden sąsiad: drugą granicą jest zadanie, które faktycznie leży z drugiej strony
+        # (upuszczenie w środku listy z samym after_id nie może nadpisać ani przeskoczyć następnego zadania)
+        if move.after_id is not None and move.before_id is None:
+            upper = _adjacent_order(db, user_id, move.task_date, move.after_id, lower, below=True, exclude_id=task_id)
+        elif move.before_id is not None and move.after_id is None:
+            lower = _adjacent_order(db, user_id, move.task_date, move.before_id, upper, below=False, exclude_id=task_id)
+        return lower, upper
+
+    if len(neighbour_orders()) != len(neighbour_ids):
+        db.rollback()
+        return None
+
+    if not neighbour_ids:
+        new_order = _next_order(db, user_id, move.task_date)
+    else:
+        new_order = _order_between(*bounds())
+        if new_order is None:
+            # Brak miejsca między sąsiadami - rozkładamy listę od nowa i liczymy jeszcze raz
+            rebalance_task_orders(db, user_id, move.task_date)
+            db.expire(db_task, ["order"]) # UPDATE poszedł z pominięciem sesji - stara wartość w pamięci
+            new_order = _order_between(*bounds())
+            if new_order is None: # after_id leży pod before_id - sprzeczne dane od klienta
+                db.rollback()
+                return None
+
+    db_task.task_date = move.task_date
+    db_task.order = new_order
     db.commit()
     db.refresh(db_task)
+
+    if date_changed:
+        rag_queue.enqueue_many([rag_documents.task_document(db_task)])
     return db_task
 
 def delete_task(db: Session, db_task: models.Task):
+    before = _task_activity_state(db_task)
+    doc_id, owner_id = f"task_{db_task.id}", db_task.owner_id
     db.delete(db_task)
+    _sync_task_activity(db, before, None)
     db.commit()
+    # Wektor skasowanego zadania też musi zniknąć z indeksu (w tle)
+    rag_queue.enqueue_delete([doc_id], user_id=owner_id)
     return {"status": "success"}
 
 def reorder_tasks(db: Session, reorder_data: list[schemas.TaskReorder], user_id: int):
-    """Aktualizuje kolejność zadań (Drag & Drop)"""
-    for item in reorder_data:
-        db.query(models.Task).filter(
-            models.Task.id == item.id,
+    """
+    Aktualizuje kolejność zadań (Drag & Drop) - cała nowa kolejność jednym
+    UPDATE tasks ... FROM (VALUES (id, order), ...) w jednej transakcji.
+    Własność sprawdzana zbiorczo: jeśli choć jedno ID nie istnieje albo nie należy do usera,
+    nic nie jest zmieniane i zwracamy None.
+    """
+    # Powtórzone ID - wygrywa ostatnia pozycja z listy
+    new_orders = {item.id: item.order for item in reorder_data}
+    if not new_orders:
+        return {"status": "success", "updated": 0}
+
+    rows = values(
+        column("id", Integer), column("order", Integer), name="new_orders"
+    ).data(list(new_orders.items()))
+
+    result = db.execute(
+        update(models.Task)
+        .where(
+            models.Task.id == rows.c.id,
             models.Task.owner_id == user_id # Zabezpieczenie przed edycją cudzych
-        ).update({"order": item.order})
+        )
+        .values(order=rows.c.order)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != len(new_orders):
+        db.rollback()
+        return None
     db.commit()
-    return {"status": "success"}
+    return {"status": "success", "updated": result.rowcount}
 
 # ==========================================
 # === HEALTH & POMODORO ===
@@ -238,6 +632,204 @@ def create_pomodoro(db: Session, pomodoro: schemas.PomodoroCreate, user_id: int)
     # Pomodoro też liczy się do aktywności projektu!
     db_pomodoro = models.PomodoroSession(**pomodoro.dict(), user_id=user_id)
     db.add(db_pomodoro)
+    _bump_project_activity(
+        db, db_pomodoro.project_id,
+        pomodoros=1,
+        pomodoro_minutes=db_pomodoro.duration or 0,
+        last_pomodoro_date=db_pomodoro.date
+    )
     db.commit()
     db.refresh(db_pomodoro)
-    return db_pomodoro
\ No newline at end of file
+    return db_pomodoro
+
+# ==========================================
+# === SIŁOWNIA (GYM) ===
+# ==========================================
+
+MAX_SETS_PER_EXERCISE = 50 # Bezpiecznik na "1000x10" albo sets=10**9 z frontu
+
+_REPS_JOIN = re.compile(r"\s*([xX×*+\-–])\s*")
+_REPS_SPLIT = re.compile(r"[,/;\s]+")
+_REPS_NUMBER = re.compile(r"^\d+$")
+_REPS_RANGE = re.compile(r"^(\d+)[\-–](\d+)$")
+_REPS_SUM = re.compile(r"^\d+(\+\d+)+$")
+
+def _single_reps(spec: str):
+    """Powtórzenia jednej serii: "10", "8-10" (dolna granica), "10+3" (rest-pause). None = nieczytelne."""
+    if _REPS_NUMBER.match(spec):
+        return int(spec)
+    if match := _REPS_RANGE.match(spec):
+        return min(int(match.group(1)), int(match.group(2)))
+    if _REPS_SUM.match(spec):
+        return sum(int(part) for part in spec.split("+"))
+    return None
+
+def _token_reps(token: str):
+    """
+    (powtórzenia per seria, czy token sam podaje liczbę serii) albo ([], False) dla nieczytelnego.
+    "4x8-10" -> 4 serie po 8, "5x5x5" / "12-10-8" -> kolejne serie wprost.
+    """
+    parts = re.split(r"[xX×*]", token)
+    if len(parts) == 2 and _REPS_NUMBER.match(parts[0]):
+        reps = _single_reps(parts[1])
+        if reps is None:
+            return [], False
+        return [reps] * min(int(parts[0]), MAX_SETS_PER_EXERCISE), True
+    if len(parts) == 1:
+        dashed = re.split(r"[\-–]", token)
+        if len(dashed) >= 3 and all(_REPS_NUMBER.match(p) for p in dashed):
+            return [int(p) for p in dashed], True
+        reps = _single_reps(token)
+        return ([reps], False) if reps is not None else ([], False)
+    if all(_REPS_NUMBER.match(p) for p in parts):
+        return [int(p) for p in parts], True
+    return [], False
+
+def parse_set_reps(reps: str | None, sets: int | None) -> list[int]:
+    """
+    Powtórzenia w każdej serii z tego, co wpisał user:
+      "12,10,8" / "12/10/8" / "12-10-8" / "5x5x5" -> kolejne serie wprost
+      "3x10" -> [10, 10, 10]      "4x8-10" -> [8, 8, 8, 8] (zakres = dolna granica)
+      "10" przy 3 seriach -> [10, 10, 10]      "6-8" przy 2 seriach -> [6, 6]      "10+3" -> [13]
+    `sets` jest używane tylko wtedy, gdy `reps` to pojedyncza wartość "na serię" - jeśli napis sam
+    wylicza serie (lista, NxM), liczy się to, co wpisano. Nieczytelne kawałki ("AMRAP") pomijamy.
+    """
+    per_set = []
+    spelled_out = False
+    tokens = [t for t in _REPS_SPLIT.split(_REPS_JOIN.sub(r"\1", str(reps or "")).strip()) if t]
+    for token in tokens:
+        token_sets, explicit = _token_reps(token)
+        per_set.extend(token_sets)
+        spelled_out = spelled_out or explicit
+    spelled_out = spelled_out or len(tokens) > 1
+
+    target_sets = min(sets or 0, MAX_SETS_PER_EXERCISE)
+    if per_set and not spelled_out and len(per_set) < target_sets:
+        per_set.extend([per_set[-1]] * (target_sets - len(per_set)))
+    return per_set[:MAX_SETS_PER_EXERCISE]
+
+def exercise_volume(set_reps: list[int], weight: float | None) -> float:
+    """Volume Load = suma powtórzeń ze wszystkich serii * ciężar."""
+    return float(sum(set_reps) * (weight or 0.0))
+
+# --- ROLLUP OBJĘTOŚCI TRENINGOWEJ ---
+
+VOLUME_BUCKETS = ("day", "week", "month")
+
+def _bump_workout_volume(db: Session, user_id: int, day: date, volume: float, sessions: int):
+    """Przyrost dziennego rollupu (UPSERT) w bieżącej transakcji - commit robi wołający."""
+    table = models.WorkoutVolumeDaily
+    stmt = pg_insert(table).values(user_id=user_id, date=day, volume=volume, sessions=sessions)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.user_id, table.date],
+        set_={
+            "volume": table.volume + stmt.excluded.volume,
+            "sessions": table.sessions + stmt.excluded.sessions
+        }
+    )
+    db.execute(stmt)
+
+def rebuild_workout_volume(db: Session):
+    """
+    Przelicza cały `workout_volume_daily` od zera jednym GROUP BY po treningach i logach.
+    Używane przez rebuild_workout_volume.py i migrację 0008.
+    """
+    session_volume = select(
+        models.ExerciseLog.session_id,
+        func.sum(models.ExerciseLog.volume_load).label("volume")
+    ).group_by(models.ExerciseLog.session_id).subquery()
+
+    rollup = select(
+        models.WorkoutSession.user_id,
+        models.WorkoutSession.date,
+        func.coalesce(func.sum(session_volume.c.volume), 0.0),
+        func.count(models.WorkoutSession.id)
+    ).outerjoin(
+        session_volume, session_volume.c.session_id == models.WorkoutSession.id
+    ).where(
+        models.WorkoutSession.user_id != None # user_id jest częścią PK rollupu (jak w migracji 0008)
+    ).group_by(models.WorkoutSession.user_id, models.WorkoutSession.date)
+
+    db.execute(delete(models.WorkoutVolumeDaily))
+    db.execute(insert(models.WorkoutVolumeDaily).from_select(["user_id", "date", "volume", "sessions"], rollup))
+    db.commit()
+    return db.query(models.WorkoutVolumeDaily).count()
+
+def get_volume_series(db: Session, user_id: int, date_from: date, date_to: date, bucket: str = "day"):
+    """
+    Szereg czasowy objętości z rollupu: [(początek okresu, volume, treningi), ...].
+    Czyta co najwyżej jeden wiersz na dzień (zakres po PK user_id, date) - niezależnie od liczby ćwiczeń.
+    """
+    if bucket not in VOLUME_BUCKETS:
+        raise ValueError(f"Nieznany bucket: {bucket}")
+    table = models.WorkoutVolumeDaily
+    # Stała w SQL (nie parametr) - ten sam wyraz w SELECT i GROUP BY, z listy VOLUME_BUCKETS więc bezpieczny
+    period = table.date if bucket == "day" else func.date_trunc(literal_column(f"'{bucket}'"), table.date).cast(Date)
+    return db.execute(
+        select(period.label("period"), func.sum(table.volume), func.sum(table.sessions))
+        .where(table.user_id == user_id, table.date >= date_from, table.date <= date_to)
+        .group_by(period)
+        .having(func.sum(table.sessions) > 0) # Dni, z których usunięto wszystkie treningi
+        .order_by(period)
+    ).all()
+
+def get_volume_totals(db: Session, user_id: int, date_from: date):
+    """(volume, treningi) od `date_from` - jedno zapytanie zamiast ładowania treningów z ćwiczeniami."""
+    table = models.WorkoutVolumeDaily
+    volume, sessions = db.execute(
+        select(func.coalesce(func.sum(table.volume), 0.0), func.coalesce(func.sum(table.sessions), 0))
+        .where(table.user_id == user_id, table.date >= date_from)
+    ).one()
+    return float(volume), int(sessions)
+
+def create_workout(db: Session, workout: schemas.WorkoutSessionCreate, user_id: int):
+    """
+    Nagłówek treningu + wszystkie ćwiczenia w jednej transakcji: jeden flush to INSERT sesji
+    i jeden wielowierszowy INSERT exercise_logs. Zwraca (odpowiedź API, dokument RAG) zbudowane
+    jeszcze przed commitem - po commicie obiekty są wygaszone i każdy odczyt byłby kolejnym SELECT-em.
+    """
+    logs = []
+    for ex in workout.exercises:
+        set_reps = parse_set_reps(ex.reps, ex.sets)
+        logs.append(models.ExerciseLog(
+            exercise_name=ex.exercise_name,
+            sets=ex.sets,
+            reps=ex.reps,
+            set_reps=set_reps,
+            weight=ex.weight,
+            volume_load=exercise_volume(set_reps, ex.weight)
+        ))
+
+    db_session = models.WorkoutSession(
+        user_id=user_id,
+        date=workout.date,
+        name=workout.name,
+        duration_minutes=workout.duration_minutes,
+        note=workout.note,
+        exercises=logs
+    )
+    db.add(db_session)
+    db.flush()
+    _bump_workout_volume(db, user_id, workout.date, sum(log.volume_load for log in logs), 1)
+
+    response = schemas.WorkoutSession.model_validate(db_session)
+    document = rag_documents.workout_document(db_session)
+    db.commit()
+    return response, document
+
+def delete_workout(db: Session, workout_id: int, user_id: int) -> bool:
+    """Usuwa trening (logi idą kaskadą) i odejmuje go z dziennego rollupu. False = brak / nie twój."""
+    workout = db.query(models.WorkoutSession).filter(
+        models.WorkoutSession.id == workout_id,
+        models.WorkoutSession.user_id == user_id
+    ).first()
+    if not workout:
+        return False
+
+    volume = db.query(func.coalesce(func.sum(models.ExerciseLog.volume_load), 0.0)).filter(
+        models.ExerciseLog.session_id == workout_id
+    ).scalar()
+    _bump_workout_volume(db, user_id, workout.date, -float(volume), -1)
+    db.delete(workout)
+    db.commit()
+    return True
@@ -1,6 +1,7 @@
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 import os
 from dotenv import load_dotenv
 
@@ -28,6 +29,28 @@ engine = create_engine(
 # Fabryka sesji
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# --- ŚCIEŻKA ASYNC (asyncpg) ---
+# Gorące endpointy do odczytu (zadania na dzień, inbox, projekty) idą przez async sesję,
+# więc nie zajmują wątków z threadpoola Starletta. Reszta dalej używa get_db.
+# ASYNC_DATABASE_URL można podać wprost; domyślnie to DATABASE_URL z driverem asyncpg.
+def _async_url(url: str) -> str:
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    return url
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _async_url(SQLALCHEMY_DATABASE_URL)
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_size=int(os.getenv("ASYNC_DB_POOL_SIZE", 20)),
+    max_overflow=int(os.getenv("ASYNC_DB_MAX_OVERFLOW", 20)),
+    pool_timeout=60
+)
+
+# expire_on_commit=False - po commicie obiekty zostają czytelne bez dociągania (w async to by był błąd)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
+
 # Baza modeli
 Base = declarative_base()
 
@@ -37,4 +60,8 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,32 @@
+# G:\MotivAItor\aijournal-backend\embedder_server.py
+# Jeden wspólny proces z modelem embeddingów dla wszystkich workerów API.
+# Zamiast ładować all-MiniLM-L6-v2 osobno w każdym workerze uvicorna:
+#   uvicorn embedder_server:app --port 8090
+# a w .env backendu: RAG_EMBEDDER_URL=http://localhost:8090
+import os
+import threading
+from fastapi import FastAPI
+from pydantic import BaseModel
+from sentence_transformers import SentenceTransformer
+
+RAG_MODEL_NAME = os.getenv("RAG_MODEL_NAME", "all-MiniLM-L6-v2")
+
+print(f"[EMBEDDER] Ładuję model {RAG_MODEL_NAME}...")
+model = SentenceTransformer(RAG_MODEL_NAME)
+# Jeden forward pass naraz - model i tak wykorzystuje wszystkie rdzenie
+model_lock = threading.Lock()
+
+app = FastAPI()
+
+class EmbedRequest(BaseModel):
+    texts: list[str]
+
+@app.post("/embed")
+def embed(req: EmbedRequest):
+    with model_lock:
+        vectors = model.encode(req.texts, convert_to_numpy=True)
+    return {"embeddings": vectors.tolist()}
+
+@app.get("/health")
+def health():
+    return {"status": "ready", "model": RAG_MODEL_NAME}
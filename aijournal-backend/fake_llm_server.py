@@ -0,0 +1,63 @@
+# G:\MotivAItor\aijournal-backend\fake_llm_server.py
+# Atrapa LM Studio (OpenAI API) do pracy lokalnej bez modelu i do sprawdzania streamingu.
+# Odpala się tak:
+#   uvicorn fake_llm_server:app --port 1234
+# a w .env: AI_BASE_URL=http://localhost:1234/v1
+#
+# Odpowiedź to ponumerowane słowa ("chunk-0 chunk-1 ..."), więc od razu widać,
+# czy kawałki dochodzą w dobrej kolejności. Rozłączenie klienta jest logowane.
+import asyncio
+import json
+import os
+import time
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+FAKE_CHUNKS = int(os.getenv("FAKE_LLM_CHUNKS", 20))
+FAKE_DELAY = float(os.getenv("FAKE_LLM_DELAY", 0.05)) # Sekundy między kawałkami
+
+app = FastAPI()
+
+def _chunks():
+    return [f"chunk-{i} " for i in range(FAKE_CHUNKS)]
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    payload = await request.json()
+    model = payload.get("model", "fake-model")
+
+    if not payload.get("stream"):
+        await asyncio.sleep(FAKE_DELAY * FAKE_CHUNKS)
+        return {
+            "id": "fake-completion",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(_chunks())},
+                "finish_reason": "stop"
+            }]
+        }
+
+    async def event_stream():
+        sent = 0
+        try:
+            for text in _chunks():
+                chunk = {
+                    "id": "fake-completion",
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"content": text}, "finish_reason": None}]
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+                sent += 1
+                await asyncio.sleep(FAKE_DELAY)
+            yield "data: [DONE]\n\n"
+            print(f"[FAKE LLM] Wysłano komplet {sent} kawałków.")
+        except asyncio.CancelledError:
+            print(f"[FAKE LLM] Klient rozłączył się po {sent}/{FAKE_CHUNKS} kawałkach.")
+            raise
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
@@ -1,6 +1,8 @@
 from sqlalchemy.orm import Session
 from datetime import date, timedelta
 import models
+import auth
+import crud
 
 # KONFIGURACJA DECAY (Rozpad statystyk przy braku aktywności)
 DECAY_RATE = 1.0 
@@ -61,19 +63,11 @@ def calculate_stats(user: models.User, db: Session):
     # --- 3. STRENGTH (S) - SIŁA (Naprawione) ---
     # Bierzemy pod uwagę ostatnie 14 dni
     two_weeks_ago = date.today() - timedelta(days=14)
-    recent_workouts = db.query(models.WorkoutSession).filter(
-        models.WorkoutSession.user_id == user.id,
-        models.WorkoutSession.date >= two_weeks_ago
-    ).all()
-    
-    workout_consistency_pts = len(recent_workouts) * 8 # 8 pkt za samo przyjście (max ~40-50)
-    
-    # Sumujemy Volume Load (Ciężar * Serie * Powtórzenia)
-    total_volume_kg = 0
-    for w in recent_workouts:
-        for ex in w.exercises:
-            total_volume_kg += ex.volume_load
-            
+    # Liczba treningów i suma Volume Load (Ciężar * Powtórzenia ze wszystkich serii) z dziennego rollupu
+    total_volume_kg, workouts_count = crud.get_volume_totals(db, user.id, two_weeks_ago)
+
+    workout_consistency_pts = workouts_count * 8 # 8 pkt za samo przyjście (max ~40-50)
+
     # Algorytm Siły: 
     # 1000 kg przerzucone w 2 tygodnie = 1 pkt siły
     # Np. Robisz 4 treningi po 10,000kg volume = 40 pkt za volume + 32 za obecność = 72 Siły.
@@ -88,6 +82,9 @@ def calculate_stats(user: models.User, db: Session):
     user.stat_health = calculated_health
     user.stat_strength = final_strength
     
+    # Statystyki siedzą w wierszu users - kopia w cache auth jest już nieaktualna
+    # (przed commitem, bo po nim user jest expired i odczyt emaila to kolejny SELECT)
+    auth.invalidate_user(user.email)
     db.commit()
     
     return {
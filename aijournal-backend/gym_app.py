@@ -3,15 +3,19 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List, Optional, Any
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel # <--- TO BYŁO BRAKUJĄCE OGNIWO!
-import requests
+from starlette.concurrency import run_in_threadpool
 import json
 import os
+from datetime import date, timedelta
 import models
 import schemas
+import crud
 import database
 import auth
-import rag
+import rag_queue
+import llm_client
 # Konfiguracja routera
 router = APIRouter(
     prefix="/api/gym",
@@ -23,49 +27,13 @@ class PlanRequest(BaseModel):
     description: str
 
 # --- POMOCNICZE FUNKCJE AI ---
-def quick_ai_call(system_prompt: str, user_prompt: str):
+async def quick_ai_call(system_prompt: str, user_prompt: str):
     """
-    Szybki strzał do AI korzystający z konfiguracji w .env (DeepSeek/LM Studio)
+    Szybki strzał do AI korzystający z konfiguracji w .env (DeepSeek/LM Studio).
+    Idzie przez wspólny klient z llm_client.py (pula połączeń, keep-alive, limit równoległości).
+    Przy błędzie rzuca llm_client.LLMError (timeout / połączenie / status HTTP / zła odpowiedź).
     """
-    # 1. Pobieramy konfigurację z .env (tak jak w main.py)
-    base_url = os.getenv("AI_BASE_URL", "http://localhost:1234/v1")
-    api_key = os.getenv("AI_API_KEY", "lm-studio")
-    model_name = os.getenv("AI_MODEL_NAME", "local-model") # <--- WAŻNE: Czyta z env, nie na sztywno!
-
-    # 2. Budujemy poprawny URL
-    if "chat/completions" not in base_url:
-        url = f"{base_url}/chat/completions"
-    else:
-        url = base_url
-    
-    # 3. Nagłówki z autoryzacją (Kluczowe dla DeepSeek)
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {api_key}" if api_key else ""
-    }
-    
-    payload = {
-        "model": model_name, # <--- Tu DeepSeek dostanie swoją nazwę "deepseek-chat"
-        "messages": [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ],
-        "temperature": 0.7,
-        "stream": False
-    }
-
-    try:
-        # Pamiętaj o dodaniu headers=headers!
-        res = requests.post(url, json=payload, headers=headers, timeout=60)
-        
-        if res.status_code == 200:
-            return res.json()['choices'][0]['message']['content']
-        else:
-            print(f"Gym AI Error Status: {res.status_code} Body: {res.text}")
-            return None
-    except Exception as e:
-        print(f"Gym AI Connection Error: {e}")
-        return None
+    return await llm_client.chat_completion(system_prompt, user_prompt, temperature=0.7, route="gym")
 
 # --- ENDPOINTY ---
 
@@ -118,7 +86,7 @@ def delete_plan(
 
 # 5. GENERATOR AI (AI ARCHITECT)
 @router.post("/ai-generate", response_model=List[dict])
-def generate_ai_plan(
+async def generate_ai_plan(
     req: PlanRequest,
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
@@ -139,8 +107,13 @@ def generate_ai_plan(
     [{"name": "Squat", "sets": 4, "reps": "6-8"}, {"name": "Leg Press", "sets": 3, "reps": "12"}]
     """
 
-    raw_response = quick_ai_call(system_prompt, req.description)
-    
+    try:
+        raw_response = await quick_ai_call(system_prompt, req.description)
+    except llm_client.LLMTimeout:
+        raise HTTPException(status_code=504, detail="AI nie odpowiedziało na czas.")
+    except llm_client.LLMError:
+        raise HTTPException(status_code=502, detail="Błąd połączenia z AI.")
+
     if not raw_response:
         raise HTTPException(status_code=500, detail="Błąd połączenia z AI.")
 
@@ -168,67 +141,18 @@ def log_workout(
     db: Session = Depends(database.get_db),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
-    db_session = models.WorkoutSession(
-        user_id=current_user.id,
-        date=workout.date,
-        name=workout.name,
-        duration_minutes=workout.duration_minutes,
-        note=workout.note
-    )
-    db.add(db_session)
-    db.commit()
-    db.refresh(db_session)
-    
-    total_vol = 0
-    exercise_summaries = []
-
-    for ex in workout.exercises:
-        calc_reps = 0
-        try:
-            first_rep_str = ex.reps.replace('/', ',').split(',')[0].strip()
-            calc_reps = int(first_rep_str)
-        except:
-            calc_reps = 0
-            
-        calculated_volume = ex.sets * calc_reps * ex.weight
-        total_vol += calculated_volume
-
-        # Zbieramy info do RAG
-        exercise_summaries.append(f"{ex.exercise_name}: {ex.sets}x{ex.reps} @ {ex.weight}kg")
-
-        db_log = models.ExerciseLog(
-            session_id=db_session.id,
-            exercise_name=ex.exercise_name,
-            sets=ex.sets,
-            reps=ex.reps,
-            weight=ex.weight,
-            volume_load=calculated_volume
-        )
-        db.add(db_log)
-    
-    db.commit()
-    db.refresh(db_session)
+    # Nagłówek i wszystkie ćwiczenia w jednej transakcji, volume z każdej serii (crud.parse_set_reps)
+    response, document = crud.create_workout(db, workout, current_user.id)
 
-    # --- RAG SYNC (NOWOŚĆ) ---
-    # Tworzymy notatkę tekstową dla AI
-    rag_content = f"Trening '{workout.name}' (Czas: {workout.duration_minutes}min, Objętość: {total_vol}kg). Ćwiczenia: {', '.join(exercise_summaries)}. Notatka: {workout.note or ''}"
-    
+    # --- RAG SYNC (w tle, przez kolejkę) ---
     try:
-        rag.add_document(
-            doc_id=f"workout_{db_session.id}", 
-            text=rag_content, 
-            metadata={
-                "type": "workout", 
-                "date": str(workout.date)
-            },
-            user_id=current_user.id  # <--- DODANO TO: Bezpieczeństwo
-        )
-        print(f"[GYM] Trening zindeksowany w RAG dla User {current_user.id}")
+        rag_queue.enqueue_many([document])
+        print(f"[GYM] Trening w kolejce RAG dla User {current_user.id}")
     except Exception as e:
         print(f"[GYM] Błąd indeksowania RAG: {e}")
     # -------------------------
 
-    return db_session
+    return response
 
 # 7. Pobieranie historii
 @router.get("/workouts", response_model=List[schemas.WorkoutSession])
@@ -249,13 +173,10 @@ def delete_workout(
     db: Session = Depends(database.get_db),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
-    workout = db.query(models.WorkoutSession).filter(
-        models.WorkoutSession.id == workout_id,
-        models.WorkoutSession.user_id == current_user.id
-    ).first()
-    if workout:
-        db.delete(workout)
-        db.commit()
+    # Trening + odjęcie go z dziennego rollupu objętości w jednej transakcji
+    if crud.delete_workout(db, workout_id, current_user.id):
+        # Sprzątamy też wektor treningu w RAG (w tle)
+        rag_queue.enqueue_delete([f"workout_{workout_id}"], user_id=current_user.id)
     return {"status": "deleted"}
 
 
@@ -266,45 +187,42 @@ def delete_workout(
 # NOWY MODEL DLA CHATU
 class GymChatRequest(BaseModel):
     message: str
+    stream: bool = False # True = odpowiedź jako Server-Sent Events
 
 # 9. ENDPOINT ANALITYCZNY (DANE DO WYKRESU)
 @router.get("/analytics/volume", response_model=List[dict])
 def get_volume_analytics(
     days: int = 30,
+    bucket: str = "day",
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
     db: Session = Depends(database.get_db),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
-    """Zwraca sumę Volume Load dla każdego treningu z ostatnich X dni."""
-    import datetime
-    cutoff_date = datetime.date.today() - datetime.timedelta(days=days)
-    
-    sessions = db.query(models.WorkoutSession)\
-        .filter(models.WorkoutSession.user_id == current_user.id)\
-        .filter(models.WorkoutSession.date >= cutoff_date)\
-        .order_by(models.WorkoutSession.date.asc())\
-        .all()
-    
-    data = []
-    for s in sessions:
-        # Oblicz volume dla sesji
-        total_vol = sum([l.volume_load for l in s.exercises])
-        data.append({
-            "date": s.date.strftime("%Y-%m-%d"),
-            "name": s.name,
-            "volume": total_vol
-        })
-    return data
+    """
+    Suma Volume Load w okresach: bucket = day / week / month.
+    Zakres: date_from..date_to, domyślnie ostatnie `days` dni (wieloletnie zakresy najlepiej z week/month).
+    Czyta dzienny rollup (workout_volume_daily), więc czas nie zależy od liczby zapisanych ćwiczeń.
+    """
+    if bucket not in crud.VOLUME_BUCKETS:
+        raise HTTPException(status_code=422, detail=f"bucket musi być jednym z: {', '.join(crud.VOLUME_BUCKETS)}")
+    date_to = date_to or date.today()
+    date_from = date_from or (date_to - timedelta(days=days))
+
+    return [
+        {
+            "date": period.strftime("%Y-%m-%d"), # Początek okresu (poniedziałek tygodnia / 1. dzień miesiąca)
+            "volume": volume,
+            "sessions": sessions
+        }
+        for period, volume, sessions in crud.get_volume_series(db, current_user.id, date_from, date_to, bucket)
+    ]
 
 # 10. AI COACH CHAT (Z KONTEKSTEM HISTORII)
-@router.post("/coach/chat")
-def chat_with_gym_coach(
-    req: GymChatRequest,
-    db: Session = Depends(database.get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
-):
+def _build_coach_prompt(db: Session, user_id: int, message: str) -> str:
     # 1. Pobierz ostatnie 5 treningów jako kontekst
     recent_workouts = db.query(models.WorkoutSession)\
-        .filter(models.WorkoutSession.user_id == current_user.id)\
+        .filter(models.WorkoutSession.user_id == user_id)\
         .order_by(models.WorkoutSession.date.desc())\
         .limit(5).all()
     
@@ -314,17 +232,36 @@ def chat_with_gym_coach(
         exercises_str = ", ".join([f"{e.exercise_name} ({e.weight}kg)" for e in w.exercises[:5]])
         history_context += exercises_str + "...\n"
 
-    system_prompt = f"""
+    return f"""
     Jesteś doświadczonym trenerem personalnym (Iron Mentor).
     Masz wgląd w historię treningową użytkownika.
     
     {history_context}
     
-    Użytkownik pyta: "{req.message}"
+    Użytkownik pyta: "{message}"
     
     Odpowiadaj krótko, merytorycznie i motywująco. 
     Odnoś się do jego ostatnich wyników (np. "Wczoraj zrobiłeś ładny wynik na klatę, więc dziś odpocznij").
     """
+
+@router.post("/coach/chat")
+async def chat_with_gym_coach(
+    req: GymChatRequest,
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    # Zapytania SQL są blokujące -> threadpool, a na LLM czekamy asynchronicznie
+    system_prompt = await run_in_threadpool(_build_coach_prompt, db, current_user.id, req.message)
     
-    response = quick_ai_call(system_prompt, req.message)
-    return {"reply": response or "Trener poszedł na białko (Błąd AI)."}
\ No newline at end of file
+    if req.stream:
+        deltas = llm_client.stream_chat_completion(system_prompt, req.message, temperature=0.7, route="gym")
+        return StreamingResponse(
+            llm_client.sse_events(deltas, fallback="Trener poszedł na białko (Błąd AI)."),
+            media_type="text/event-stream", headers=llm_client.SSE_HEADERS
+        )
+
+    try:
+        response = await quick_ai_call(system_prompt, req.message)
+    except llm_client.LLMError:
+        response = None
+    return {"reply": response or "Trener poszedł na białko (Błąd AI)."}
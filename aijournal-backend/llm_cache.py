@@ -0,0 +1,172 @@
+# G:\MotivAItor\aijournal-backend\llm_cache.py
+# Cache odpowiedzi LLM dla deterministycznych wywołań (kalorie, dzienny roast).
+# Klucz = znormalizowany (model, system prompt, user prompt, temperatura).
+# Backendy: pamięć procesu (LRU) albo plik SQLite (współdzielony przez workery). Oba z TTL.
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+def _normalize(text: str) -> str:
+    # Zbijamy białe znaki - prompty w kodzie mają wcięcia i puste linie
+    return " ".join((text or "").split())
+
+def make_key(model: str, system_prompt: str, user_prompt: str, temperature: float) -> str:
+    raw = json.dumps([
+        model,
+        _normalize(system_prompt),
+        _normalize(user_prompt).casefold(), # "2 Eggs and toast" == "2 eggs and toast"
+        round(float(temperature), 2)
+    ], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+class MemoryCache:
+    """LRU w pamięci procesu (OrderedDict). Każdy worker ma swój."""
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._data = OrderedDict() # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: float):
+        with self._lock:
+            self._data[key] = (time.time() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False) # Najdawniej używany wylatuje
+
+    def size(self) -> int:
+        return len(self._data)
+
+class SQLiteCache:
+    """Cache na dysku (SQLite). Przeżywa restart i jest wspólny dla wszystkich workerów."""
+
+    def __init__(self, path: str, max_entries: int = 10000):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_completions_last_used ON completions (last_used)")
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at < now:
+                self._conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE completions SET last_used = ? WHERE key = ?", (now, key))
+            return value
+
+    def set(self, key: str, value: str, ttl: float):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions (key, value, expires_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, value, now + ttl, now)
+            )
+            # Sprzątanie: przeterminowane + nadmiar ponad limit (LRU po last_used)
+            self._conn.execute("DELETE FROM completions WHERE expires_at < ?", (now,))
+            self._conn.execute("""
+                DELETE FROM completions WHERE key IN (
+                    SELECT key FROM completions ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+
+    def size(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+
+# --- KONFIGURACJA (z .env) ---
+# AI_CACHE_BACKEND: memory | sqlite | none
+AI_CACHE_BACKEND = os.getenv("AI_CACHE_BACKEND", "memory")
+AI_CACHE_PATH = os.getenv("AI_CACHE_PATH", "./llm_cache.sqlite3")
+AI_CACHE_MAX_ENTRIES = int(os.getenv("AI_CACHE_MAX_ENTRIES", 1000))
+
+# Opt-in per endpoint: "route:ttl_w_sekundach,..." - tylko te route'y są cache'owane
+AI_CACHE_ROUTES = os.getenv("AI_CACHE_ROUTES", "calories:86400,roast:600")
+
+def _parse_routes(spec: str) -> dict:
+    routes = {}
+    for part in spec.split(","):
+        if ":" not in part:
+            continue
+        route, ttl = part.split(":", 1)
+        routes[route.strip()] = float(ttl)
+    return routes
+
+ROUTE_TTLS = _parse_routes(AI_CACHE_ROUTES)
+
+_backend = None
+_backend_lock = threading.Lock()
+_stats = {} # route -> {"hits": int, "misses": int}
+
+def get_backend():
+    global _backend
+    if _backend is None and AI_CACHE_BACKEND != "none":
+        with _backend_lock:
+            if _backend is None:
+                if AI_CACHE_BACKEND == "sqlite":
+                    _backend = SQLiteCache(AI_CACHE_PATH, max_entries=AI_CACHE_MAX_ENTRIES)
+                else:
+                    _backend = MemoryCache(max_entries=AI_CACHE_MAX_ENTRIES)
+    return _backend
+
+def route_ttl(route: str):
+    """TTL dla route'a albo None, jeśli route nie jest cache'owany."""
+    if AI_CACHE_BACKEND == "none":
+        return None
+    return ROUTE_TTLS.get(route)
+
+def _count(route: str, field: str):
+    _stats.setdefault(route, {"hits": 0, "misses": 0})[field] += 1
+
+def lookup(route: str, key: str):
+    value = get_backend().get(key)
+    _count(route, "hits" if value is not None else "misses")
+    return value
+
+def store(route: str, key: str, value: str):
+    get_backend().set(key, value, ROUTE_TTLS[route])
+
+def stats() -> dict:
+    backend = get_backend()
+    routes = {}
+    for route, counters in _stats.items():
+        total = counters["hits"] + counters["misses"]
+        routes[route] = {**counters, "hit_rate": round(counters["hits"] / total, 3) if total else 0.0}
+    return {
+        "backend": AI_CACHE_BACKEND,
+        "entries": backend.size() if backend else 0,
+        "routes_ttl": ROUTE_TTLS,
+        "routes": routes
+    }
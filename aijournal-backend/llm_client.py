@@ -0,0 +1,235 @@
+# G:\MotivAItor\aijournal-backend\llm_client.py
+# Wspólny, asynchroniczny klient LLM (LM Studio / DeepSeek / OpenAI - wszystko w stylu OpenAI API).
+# Jeden AsyncClient z pulą połączeń i keep-alive zamiast requests.post przy każdym wywołaniu.
+import asyncio
+import json
+import os
+import httpx
+from dotenv import load_dotenv
+import llm_cache
+
+load_dotenv()
+
+# --- KONFIGURACJA (z .env) ---
+AI_BASE_URL = os.getenv("AI_BASE_URL", "http://localhost:1234/v1") # Domyślnie lokalnie
+AI_API_KEY = os.getenv("AI_API_KEY") # Dla LM Studio może być pusty
+AI_MODEL_NAME = os.getenv("AI_MODEL_NAME", "local-model")
+
+# Ile zapytań naraz może polecieć do modelu (reszta czeka w kolejce)
+AI_MAX_CONCURRENCY = int(os.getenv("AI_MAX_CONCURRENCY", 8))
+# Pula połączeń HTTP (keep-alive)
+AI_MAX_CONNECTIONS = int(os.getenv("AI_MAX_CONNECTIONS", 20))
+AI_MAX_KEEPALIVE = int(os.getenv("AI_MAX_KEEPALIVE", 10))
+
+# Timeouty per endpoint (sekundy). Nadpisanie: AI_TIMEOUT_<ROUTE>, np. AI_TIMEOUT_CALORIES=5
+DEFAULT_TIMEOUTS = {
+    "default": 60,
+    "braindump": 60,
+    "chat": 60,
+    "roast": 60,
+    "roast_chat": 60,
+    "calories": 10,
+    "gym": 60,
+}
+
+def route_timeout(route: str) -> float:
+    fallback = DEFAULT_TIMEOUTS.get(route, DEFAULT_TIMEOUTS["default"])
+    return float(os.getenv(f"AI_TIMEOUT_{route.upper()}", fallback))
+
+def completions_url() -> str:
+    # Jeśli w .env masz "https://api.deepseek.com/v1", to dodajemy końcówkę
+    if "chat/completions" not in AI_BASE_URL:
+        return f"{AI_BASE_URL.rstrip('/')}/chat/completions"
+    return AI_BASE_URL
+
+def _headers() -> dict:
+    headers = {"Content-Type": "application/json"}
+    if AI_API_KEY:
+        # Jeśli jest klucz (DeepSeek), dodajemy go. LM Studio to zignoruje.
+        headers["Authorization"] = f"Bearer {AI_API_KEY}"
+    return headers
+
+# --- BŁĘDY ---
+# chat_completion rzuca je zamiast zwracać None - wywołujący odróżnia timeout od złej odpowiedzi
+class LLMError(Exception):
+    """Bazowy błąd wywołania modelu."""
+    def __init__(self, message: str, route: str = "default"):
+        super().__init__(message)
+        self.route = route
+
+class LLMTimeout(LLMError):
+    """Model nie odpowiedział w route_timeout(route)."""
+
+class LLMConnectionError(LLMError):
+    """Nie udało się połączyć / połączenie zerwane."""
+
+class LLMHTTPError(LLMError):
+    """Serwer modelu odpowiedział statusem innym niż 200."""
+    def __init__(self, message: str, route: str = "default", status_code: int = 0):
+        super().__init__(message, route)
+        self.status_code = status_code
+
+class LLMBadResponse(LLMError):
+    """Odpowiedź 200, ale nie da się z niej wyciągnąć treści (zły JSON / brak choices)."""
+
+# --- STAN WSPÓŁDZIELONY ---
+_client: httpx.AsyncClient | None = None
+_semaphore: asyncio.Semaphore | None = None
+
+def get_client() -> httpx.AsyncClient:
+    """Leniwie tworzy jeden AsyncClient na proces (pula połączeń + keep-alive)."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            headers=_headers(),
+            timeout=httpx.Timeout(DEFAULT_TIMEOUTS["default"], connect=5.0),
+            limits=httpx.Limits(
+                max_connections=AI_MAX_CONNECTIONS,
+                max_keepalive_connections=AI_MAX_KEEPALIVE
+            )
+        )
+    return _client
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(AI_MAX_CONCURRENCY)
+    return _semaphore
+
+async def close():
+    """Zamykane w lifespan aplikacji (shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+def build_payload(system_prompt: str, user_prompt: str, temperature: float) -> dict:
+    return {
+        "model": AI_MODEL_NAME,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ],
+        "temperature": temperature,
+        "stream": False
+    }
+
+async def chat_completion(
+    system_prompt: str,
+    user_prompt: str,
+    temperature: float = 0.3,
+    route: str = "default"
+) -> str:
+    """
+    Jedno zapytanie chat/completions. Zwraca treść odpowiedzi, a przy błędzie rzuca
+    LLMTimeout / LLMConnectionError / LLMHTTPError / LLMBadResponse (wszystkie to LLMError) -
+    każdy endpoint sam decyduje, jaki fallback pokazać użytkownikowi.
+
+    Route'y włączone w llm_cache (AI_CACHE_ROUTES) najpierw sprawdzają cache -
+    ten sam prompt nie idzie drugi raz do modelu, dopóki nie minie TTL.
+    """
+    cache_key = None
+    if llm_cache.route_ttl(route) is not None:
+        cache_key = llm_cache.make_key(AI_MODEL_NAME, system_prompt, user_prompt, temperature)
+        cached = llm_cache.lookup(route, cache_key)
+        if cached is not None:
+            return cached
+
+    payload = build_payload(system_prompt, user_prompt, temperature)
+
+    try:
+        async with _get_semaphore():
+            res = await get_client().post(completions_url(), json=payload, timeout=route_timeout(route))
+    except httpx.TimeoutException as e:
+        print(f"AI Timeout ({route}): {e!r}")
+        raise LLMTimeout(f"Timeout after {route_timeout(route)}s", route) from e
+    except httpx.HTTPError as e:
+        print(f"AI Connection Error ({route}): {e!r}")
+        raise LLMConnectionError(repr(e), route) from e
+
+    if res.status_code != 200:
+        print(f"AI Error {res.status_code} ({route}): {res.text}")
+        raise LLMHTTPError(f"HTTP {res.status_code}: {res.text[:200]}", route, status_code=res.status_code)
+
+    try:
+        content = res.json()['choices'][0]['message']['content']
+    except (ValueError, KeyError, IndexError, TypeError) as e:
+        print(f"AI Parse Error ({route}): {e}")
+        raise LLMBadResponse(repr(e), route) from e
+    if not isinstance(content, str):
+        print(f"AI Parse Error ({route}): content = {content!r}")
+        raise LLMBadResponse(f"content = {content!r}", route)
+
+    if cache_key is not None and content:
+        llm_cache.store(route, cache_key, content)
+    return content
+
+async def stream_chat_completion(
+    system_prompt: str,
+    user_prompt: str,
+    temperature: float = 0.3,
+    route: str = "default"
+):
+    """
+    Wersja strumieniowa (`stream: true`). Async generator zwracający kolejne kawałki
+    tekstu (delta.content) w kolejności, w jakiej przychodzą z modelu - nic nie jest buforowane.
+    Przerwanie generatora (np. klient się rozłączył) zamyka połączenie do modelu.
+    """
+    payload = build_payload(system_prompt, user_prompt, temperature)
+    payload["stream"] = True
+
+    try:
+        async with _get_semaphore():
+            async with get_client().stream("POST", completions_url(), json=payload, timeout=route_timeout(route)) as res:
+                if res.status_code != 200:
+                    body = await res.aread()
+                    print(f"AI Stream Error {res.status_code} ({route}): {body[:500]!r}")
+                    return
+
+                async for line in res.aiter_lines():
+                    # Format OpenAI: "data: {...}" oddzielone pustymi liniami, koniec to "data: [DONE]"
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    try:
+                        chunk = json.loads(data)
+                    except ValueError:
+                        continue
+                    choices = chunk.get("choices") or []
+                    if not choices:
+                        continue
+                    delta = (choices[0].get("delta") or {}).get("content")
+                    if delta:
+                        yield delta
+    except httpx.HTTPError as e:
+        print(f"AI Stream Connection Error ({route}): {e!r}")
+
+def sse_event(data) -> str:
+    """Jedna ramka Server-Sent Events."""
+    if not isinstance(data, str):
+        data = json.dumps(data, ensure_ascii=False)
+    return f"data: {data}\n\n"
+
+async def sse_events(deltas, fallback: str):
+    """
+    Zamienia strumień kawałków tekstu na ramki SSE dla frontendu:
+    `data: {"delta": "..."}` dla każdego kawałka i `data: [DONE]` na końcu.
+    Jeśli model nic nie zwrócił (błąd), wysyłamy `fallback` jako jedyną deltę.
+    """
+    sent_any = False
+    try:
+        async for delta in deltas:
+            sent_any = True
+            yield sse_event({"delta": delta})
+        if not sent_any:
+            yield sse_event({"delta": fallback})
+        yield sse_event("[DONE]")
+    finally:
+        # Klient się rozłączył (aclose na tym generatorze) - zamykamy też strumień z modelu od razu,
+        # a nie dopiero przy sprzątaniu przez GC (połączenie i miejsce w semaforze wracają natychmiast)
+        await deltas.aclose()
+
+# Nagłówki, żeby proxy (nginx) niczego nie buforowało
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
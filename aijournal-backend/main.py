@@ -1,45 +1,88 @@
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from contextlib import asynccontextmanager
 from datetime import timedelta, date, datetime
 import uuid
-import requests
+import threading
 import json
+import re
 from typing import List
 from pydantic import BaseModel
-import time
 import random
-from sqlalchemy.exc import OperationalError
+import asyncio
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
 import os
 import gym_app # <--- Nowa nazwa
 # Importujemy nasze moduły
-from database import get_db, engine
+from database import get_db, get_async_db, async_engine
 import models
 import schemas
 import crud
 import auth
 import rag # <--- TWÓJ MODUŁ RAG (musi być plik rag.py obok)
+import rag_queue
+import rag_documents
+import rag_reindex
+import llm_client
+import llm_cache
 from dotenv import load_dotenv
 
 load_dotenv()
-# Pętla oczekiwania na bazę danych (Retry Pattern)
-MAX_RETRIES = 10
-WAIT_SECONDS = 3
 
-for i in range(MAX_RETRIES):
+# Schemat bazy tworzy/aktualizuje `python migrate.py` (raz na wdrożenie), nie import main.py.
+# Tu tylko czekamy na bazę - asynchronicznie, z rosnącym odstępem, bez blokowania innych workerów.
+DB_STARTUP_TIMEOUT = float(os.getenv("DB_STARTUP_TIMEOUT", 30))
+
+async def ping_db() -> bool:
     try:
-        print(f"Próba połączenia z bazą ({i+1}/{MAX_RETRIES})...")
-        models.Base.metadata.create_all(bind=engine)
-        print("Sukces! Baza danych podłączona.")
-        break
-    except OperationalError:
-        print(f"Baza jeszcze nie gotowa. Czekam {WAIT_SECONDS}s...")
-        time.sleep(WAIT_SECONDS)
-else:
-    print("Nie udało się połączyć z bazą po wielu próbach.")
-
-app = FastAPI()
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        return True
+    except (DBAPIError, OSError, asyncio.TimeoutError) as e:
+        print(f"[DB] Brak połączenia: {e!r}")
+        return False
+
+async def wait_for_db(timeout: float = DB_STARTUP_TIMEOUT) -> bool:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    delay = 0.1
+    while not await ping_db():
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            return False
+        await asyncio.sleep(min(delay, remaining))
+        delay = min(delay * 2, 2.0)
+    return True
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Baza nieosiągalna = startujemy mimo to; /readyz zwraca 503, dopóki nie wstanie
+    if await wait_for_db():
+        print("[DB] Baza danych podłączona.")
+    else:
+        print(f"[DB] Baza nie odpowiada po {DB_STARTUP_TIMEOUT}s - startuję, /readyz pokaże 503.")
+    # RAG ładuje się leniwie przy pierwszym użyciu. RAG_WARMUP=1 ładuje model od razu
+    # w tle (serwer startuje natychmiast, gotowość widać w /api/ready/rag).
+    if os.getenv("RAG_WARMUP", "0") == "1":
+        threading.Thread(target=rag.warm_up, name="rag-warmup", daemon=True).start()
+    # Wątek indeksujący RAG w tle (kolejka przetrwała restart - dokończy zaległości)
+    rag_queue.start_worker()
+    # Reindeksy przerwane restartem/awarią ruszają od ostatniego checkpointu
+    threading.Thread(target=rag_reindex.resume_unfinished, name="rag-reindex-resume", daemon=True).start()
+    yield
+    rag_queue.stop_worker()
+    # Zamykamy pulę połączeń do LLM
+    await llm_client.close()
+    # ...i pulę async połączeń do bazy
+    await async_engine.dispose()
+
+app = FastAPI(lifespan=lifespan)
 
 # Konfiguracja CORS
 origins = [
@@ -53,6 +96,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# === HEALTH / READINESS ===
+@app.get("/healthz")
+def healthz():
+    """Liveness: proces żyje i obsługuje requesty. Nie dotyka bazy (restart nie naprawi Postgresa)."""
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: można kierować ruch - baza odpowiada."""
+    if not await ping_db():
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail={"database": "unavailable"})
+    return {"status": "ready", "database": "ok"}
+
+@app.get("/api/ready/rag")
+def rag_readiness():
+    """
+    Stan modelu embeddingów: cold (jeszcze nie ładowany), loading, ready, error.
+    Przy RAG_WARMUP=1 gotowość = załadowany model, inaczej "cold" też jest OK (załaduje się na żądanie).
+    """
+    state = rag.status()
+    warmup = os.getenv("RAG_WARMUP", "0") == "1"
+    ready = state["status"] == "ready" or (state["status"] == "cold" and not warmup)
+    if not ready:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=state)
+    return state
+
 # === ENDPOINTY AUTENTYKACJI ===
 
 @app.post("/api/login", response_model=schemas.Token)
@@ -60,8 +129,9 @@ async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(), 
     db: Session = Depends(get_db)
 ):
-    user = crud.get_user_by_email(db, email=form_data.username)
-    if not user or not auth.verify_password(form_data.password, user.hashed_password):
+    # SELECT w threadpoolu, bcrypt w ograniczonej puli auth (429, gdy pełna) - event loop zostaje wolny
+    user = await run_in_threadpool(crud.get_user_by_email, db, form_data.username)
+    if not user or not await auth.verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -87,39 +157,44 @@ def create_task(
 ):
     new_task = crud.create_user_task(db=db, task=task, user_id=current_user.id)
     
-    # --- RAG: KARMIENIE BAZY ---
+    # --- RAG: KARMIENIE BAZY (w tle, nie czekamy na embedding) ---
     try:
-        rag.add_document(
-            doc_id=f"task_{new_task.id}",
-            text=new_task.content,
-            metadata={
-                "type": "task", 
-                "date": str(new_task.task_date) if new_task.task_date else "inbox",
-                "project_id": str(new_task.project_id or "none")
-            },
-            
-            user_id=current_user.id
-        )
+        rag_queue.enqueue_many([rag_documents.task_document(new_task)])
     except Exception as e:
         print(f"RAG Error (Task): {e}")
     # ---------------------------
 
     return new_task
 
+# Gorące odczyty idą przez async sesję (asyncpg) - razem z autoryzacją (get_current_active_user_async),
+# więc nie zajmują wątków threadpoola i mają jedną sesję na request
 @app.get("/api/tasks/inbox", response_model=list[schemas.Task])
-def read_inbox_tasks(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+async def read_inbox_tasks(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(auth.get_current_active_user_async)
 ):
-    return crud.get_inbox_tasks(db=db, user_id=current_user.id)
+    return await crud.get_inbox_tasks_async(db=db, user_id=current_user.id)
 
 @app.get("/api/tasks/{task_date}", response_model=list[schemas.Task])
-def read_tasks_for_date(
+async def read_tasks_for_date(
     task_date: date,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(auth.get_current_active_user_async)
+):
+    return await crud.get_tasks_by_date_async(db=db, user_id=current_user.id, task_date=task_date)
+
+# UWAGA: musi być przed PUT /api/tasks/{task_id}, inaczej "reorder" trafi tam jako task_id (422)
+@app.put("/api/tasks/reorder")
+def reorder_tasks(
+    reorder_data: list[schemas.TaskReorder],
     db: Session = Depends(get_db),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
-    return crud.get_tasks_by_date(db=db, user_id=current_user.id, task_date=task_date)
+    """Nowa kolejność całej listy (Drag & Drop) jednym zapytaniem: [{"id": 1, "order": 0}, ...]."""
+    result = crud.reorder_tasks(db, reorder_data, current_user.id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Task not found or not yours")
+    return result
 
 @app.put("/api/tasks/{task_id}", response_model=schemas.Task)
 def update_task(
@@ -133,6 +208,19 @@ def update_task(
         raise HTTPException(status_code=404, detail="Task not found")
     return updated_task
 
+@app.put("/api/tasks/{task_id}/move", response_model=schemas.Task)
+def move_task(
+    task_id: int,
+    move: schemas.TaskMove,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    """Drag & Drop jednego zadania: {"task_date": "2025-01-31" | null, "after_id": 12, "before_id": 7}."""
+    moved_task = crud.move_task(db, task_id, move, current_user.id)
+    if moved_task is None:
+        raise HTTPException(status_code=404, detail="Task or neighbour not found or not yours")
+    return moved_task
+
 @app.put("/api/tasks/{task_id}/toggle", response_model=schemas.Task)
 def toggle_task_status(
     task_id: int,
@@ -159,11 +247,11 @@ def delete_task(
 # === ENDPOINTY PROJEKTÓW ===
 
 @app.get("/api/projects", response_model=List[schemas.Project])
-def read_projects(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+async def read_projects(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(auth.get_current_active_user_async)
 ):
-    return crud.get_projects_with_stats(db=db, user_id=current_user.id)
+    return await crud.get_projects_with_stats_async(db=db, user_id=current_user.id)
 
 @app.post("/api/projects", response_model=schemas.Project)
 def create_new_project(
@@ -175,55 +263,31 @@ def create_new_project(
 
 # === AI BRAIN DUMP & TOOLS ===
 
-def call_lm_studio(text: str, system_prompt: str = None) -> str:
-    # Pobieramy konfigurację z .env
-    api_key = os.getenv("AI_API_KEY") # Jeśli brak, to None
-    base_url = os.getenv("AI_BASE_URL", "http://localhost:1234/v1") # Fallback na local
-    model_name = os.getenv("AI_MODEL_NAME", "local-model")
-    
-    # URL do endpointu chat completions
-    # Jeśli w .env masz "https://api.deepseek.com", to dodajemy końcówkę
-    # Jeśli używasz LM Studio, upewnij się że URL w .env ma "/v1" lub dodaj tu logikę
-    if "chat/completions" not in base_url:
-        url = f"{base_url}/chat/completions"
-    else:
-        url = base_url
-
+async def call_lm_studio(text: str, system_prompt: str = None, route: str = "default") -> str:
     if not system_prompt:
         system_prompt = "Jesteś asystentem produktywności."
-    
-    headers = {
-        "Content-Type": "application/json",
-        # Jeśli jest klucz (DeepSeek), dodajemy go. LM Studio to zignoruje.
-        "Authorization": f"Bearer {api_key}" if api_key else ""
-    }
-
-    payload = {
-        "model": model_name,
-        "messages": [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": text}
-        ],
-        "temperature": 0.3,
-        "stream": False
-    }
 
+    # Wspólny klient (pula połączeń, keep-alive, limit równoległości) - patrz llm_client.py
     try:
-        # print(f"AI Request: Wysyłam do {url}...")
-        response = requests.post(url, json=payload, headers=headers, timeout=60)
-        
-        if response.status_code != 200:
-            print(f"AI Error {response.status_code}: {response.text}")
-            return "[]"
-            
-        data = response.json()
-        return data['choices'][0]['message']['content']
-    except Exception as e:
-        print(f"AI Critical Error: {e}")
+        return await llm_client.chat_completion(system_prompt, text, temperature=0.3, route=route)
+    except llm_client.LLMError:
         return "[]"
 
+def _create_braindump_tasks(db: Session, task_list: list, task_date: date | None, user_id: int):
+    tasks_data = [
+        schemas.TaskCreate(content=str(content), task_date=task_date, is_completed=False, points=10)
+        for content in task_list
+    ]
+    # Jeden INSERT ... RETURNING i jeden commit na cały dump
+    created_tasks = crud.create_tasks_bulk(db=db, tasks=tasks_data, user_id=user_id)
+
+    # --- RAG INDEXING (jedną paczką, w tle) ---
+    rag_queue.enqueue_many([rag_documents.task_document(t) for t in created_tasks])
+    # --------------------
+    return created_tasks
+
 @app.post("/api/ai/process-braindump", response_model=list[schemas.Task])
-def process_braindump_with_ai(
+async def process_braindump_with_ai(
     request: schemas.BrainDumpRequest,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(auth.get_current_active_user)
@@ -233,7 +297,7 @@ def process_braindump_with_ai(
     NP: ["Zadanie 1", "Zadanie 2"]. Tylko JSON.
     """
     try:
-        response_text = call_lm_studio(request.text, system_prompt)
+        response_text = await call_lm_studio(request.text, system_prompt, route="braindump")
         clean_text = response_text.replace("```json", "").replace("```", "").strip()
         task_list = json.loads(clean_text)
         if not isinstance(task_list, list):
@@ -241,84 +305,41 @@ def process_braindump_with_ai(
     except Exception:
         task_list = [request.text]
 
-    created_tasks = []
-    for content in task_list:
-        task_data = schemas.TaskCreate(
-            content=str(content),
-            task_date=request.task_date,
-            is_completed=False,
-            points=10
-        )
-        new_task = crud.create_user_task(db=db, task=task_data, user_id=current_user.id)
-        
-        # --- RAG INDEXING ---
-        rag.add_document(f"task_{new_task.id}", new_task.content, {"type": "task", "date": str(request.task_date or "inbox")},user_id=current_user.id)
-        # --------------------
-        
-        created_tasks.append(new_task)
-    return created_tasks
+    # Zapis do bazy i RAG są synchroniczne - puszczamy je w threadpoolu, nie na event loopie
+    return await run_in_threadpool(_create_braindump_tasks, db, task_list, request.task_date, current_user.id)
 
 @app.post("/api/ai/estimate-calories")
-def estimate_calories(request: schemas.CalorieRequest):
-    api_key = os.getenv("AI_API_KEY")
-    base_url = os.getenv("AI_BASE_URL", "http://localhost:1234/v1")
-    model_name = os.getenv("AI_MODEL_NAME", "local-model")
-    
-    if "chat/completions" not in base_url:
-        url = f"{base_url}/chat/completions"
-    else:
-        url = base_url
-
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {api_key}" if api_key else ""
-    }
-    
-    payload = {
-        "model": model_name,
-        "messages": [
-            {"role": "system", "content": "Jesteś dietetykiem. Podaj TYLKO liczbę kalorii (int). Nie pisz nic więcej."},
-            {"role": "user", "content": f"Oszacuj kalorie: {request.text}"}
-        ],
-        "temperature": 0.1
-    }
-    
+async def estimate_calories(request: schemas.CalorieRequest):
     try:
-        res = requests.post(url, json=payload, headers=headers, timeout=10)
-        if res.status_code == 200:
-            content = res.json()['choices'][0]['message']['content']
-            import re
-            nums = re.findall(r'\d+', content)
-            return {"calories": int(nums[0]) if nums else 0}
-        return {"calories": 0}
-    except Exception as e:
-        print(f"AI Calorie Error: {e}")
+        content = await llm_client.chat_completion(
+            "Jesteś dietetykiem. Podaj TYLKO liczbę kalorii (int). Nie pisz nic więcej.",
+            f"Oszacuj kalorie: {request.text}",
+            temperature=0.1,
+            route="calories"
+        )
+    except llm_client.LLMError:
         return {"calories": 0}
-    
-    
+
+    nums = re.findall(r'\d+', content)
+    return {"calories": int(nums[0]) if nums else 0}
 
 
 # === RAG ENHANCED CHAT ===
 
-@app.post("/api/ai/chat")
-def chat_with_context(
-    request: schemas.AIChatRequest,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
-):
+def _build_chat_prompt(db: Session, request: schemas.AIChatRequest, user_id: int) -> str:
     # 1. RAG SEARCH (Szukamy wiedzy w bazie)
-    context_from_db = rag.search_documents(request.message,user_id=current_user.id, n_results=3)
+    context_from_db = rag.search_documents(request.message,user_id=user_id, n_results=3)
     
     # 2. Budujemy Prompt z kontekstem RAG i Projektem
     project_context = ""
     if request.context_task_id:
-        task = crud.get_task_by_id(db, task_id=request.context_task_id, user_id=current_user.id)
+        task = crud.get_task_by_id(db, task_id=request.context_task_id, user_id=user_id)
         if task and task.project_id:
             project = db.query(models.Project).filter(models.Project.id == task.project_id).first()
             if project and project.context:
                 project_context = f"\nMASTER PROMPT PROJEKTU: {project.context.master_prompt}"
 
-    system_prompt = f"""
+    return f"""
     Jesteś asystentem produktywności.
     KORZYSTAJ Z TEJ WIEDZY Z BAZY DANYCH (Jeśli pasuje do pytania):
     {context_from_db}
@@ -327,8 +348,24 @@ def chat_with_context(
     
     Odpowiadaj krótko i konkretnie.
     """
+
+@app.post("/api/ai/chat")
+async def chat_with_context(
+    request: schemas.AIChatRequest,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    # RAG (embedding) i zapytania SQL są blokujące -> threadpool
+    system_prompt = await run_in_threadpool(_build_chat_prompt, db, request, current_user.id)
     
-    reply = call_lm_studio(request.message, system_prompt)
+    if request.stream:
+        deltas = llm_client.stream_chat_completion(system_prompt, request.message, temperature=0.3, route="chat")
+        return StreamingResponse(
+            llm_client.sse_events(deltas, fallback="[]"),
+            media_type="text/event-stream", headers=llm_client.SSE_HEADERS
+        )
+
+    reply = await call_lm_studio(request.message, system_prompt, route="chat")
     return {"reply": reply}
 
 # === ENDPOINTY HEALTH & POMODORO ===
@@ -341,10 +378,8 @@ def create_health_entry(
 ):
     new_entry = crud.create_daily_health(db=db, health=health, user_id=current_user.id)
     
-    # --- RAG INDEXING ---
-    # AI musi pamiętać, że byłeś gruby/smutny danego dnia
-    note_content = f"Dnia {new_entry.date}: Waga {new_entry.weight}kg, Sen {new_entry.sleep_hours}h. Notatka: {new_entry.note}"
-    rag.add_document(f"health_{new_entry.id}", note_content, {"type": "health", "date": str(new_entry.date)},user_id=current_user.id)
+    # --- RAG INDEXING (w tle) ---
+    rag_queue.enqueue_many([rag_documents.health_document(new_entry)])
     # --------------------
     
     return new_entry
@@ -377,15 +412,11 @@ def calculate_performance_score(db: Session, user_id: int):
     score -= (rusting_count * 20)
     return max(0, min(100, score)), completed_today, rusting_count
 
-@app.get("/api/ai/roast")
-def get_daily_roast(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
-):
-    score, completed_today, rusting_count = calculate_performance_score(db, current_user.id)
+def _build_roast_prompt(db: Session, user_id: int):
+    score, completed_today, rusting_count = calculate_performance_score(db, user_id)
     
     # Get rusting projects names
-    projects = crud.get_projects_with_stats(db, user_id=current_user.id)
+    projects = crud.get_projects_with_stats(db, user_id=user_id)
     rusting_projects = [p for p in projects if p.stats.get('is_rusting', False)]
     rusting_projects_names = ", ".join([p.name for p in rusting_projects]) if rusting_projects else "Brak"
     
@@ -393,7 +424,8 @@ def get_daily_roast(
     recent_activity_summary = f"Ukończone zadania dziś: {completed_today}, rdzewiejące projekty: {rusting_count}"
     
     # RAG for roast
-    recent_context = rag.search_documents("wymówki lenistwo problemy", user_id=current_user.id, n_results=2)
+    recent_from = date.today() - timedelta(days=rag.RAG_RECENT_DAYS)
+    recent_context = rag.search_documents(rag.CANNED_QUERIES["roast"], user_id=user_id, n_results=2, date_from=recent_from)
 
     system_prompt = f"""
     SYSTEM:
@@ -404,6 +436,9 @@ def get_daily_roast(
     - Status: {rusting_projects_names} (Projekty, które rdzewieją).
     - Ostatnia aktywność: {recent_activity_summary} (Co zrobił lub czego NIE zrobił).
 
+    FAKTY Z BAZY (ostatnie {rag.RAG_RECENT_DAYS} dni - cytuj je, zamiast zgadywać):
+    {recent_context or "Brak powiązanych informacji w bazie."}
+
     ZASADY GENEROWANIA:
     1. WYNIK < 30 (Tryb Destrukcji): Nie miej litości. Wykorzystaj nazwy jego własnych projektów, by pokazać mu, jak bardzo je zawodzi. Używaj sarkazmu.
     2. WYNIK 30-70 (Tryb Dyscypliny): Zimna analiza. Wskaż marnotrawstwo czasu.
@@ -417,35 +452,71 @@ def get_daily_roast(
     PRZYKŁAD DLA SŁABEGO WYNIKU:
     "Twój projekt '{rusting_projects_names or 'projekt'}' nie rdzewieje – on gnije. Patrzenie na te {score} punktów to marnowanie moich procesorów."
     """
-    
-    roast_text = call_lm_studio("Roast me", system_prompt)
-    if not roast_text: roast_text = "Nawet AI nie chce z tobą gadać."
-    return {"roast": roast_text, "score": score}
+    return score, system_prompt
 
-@app.post("/api/ai/roast-chat")
-def chat_with_roast_master(
-    request: schemas.AIChatRequest,
+@app.get("/api/ai/roast")
+async def get_daily_roast(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
-    score, _, _ = calculate_performance_score(db, current_user.id)
+    score, system_prompt = await run_in_threadpool(_build_roast_prompt, db, current_user.id)
+    
+    roast_text = await call_lm_studio("Roast me", system_prompt, route="roast")
+    if not roast_text: roast_text = "Nawet AI nie chce z tobą gadać."
+    return {"roast": roast_text, "score": score}
+
+def _build_roast_chat_prompt(db: Session, message: str, user_id: int) -> str:
+    score, _, _ = calculate_performance_score(db, user_id)
     
     # RAG w dyskusji z Danem
-    context = rag.search_documents(request.message,user_id=current_user.id, n_results=2)
+    context = rag.search_documents(message,user_id=user_id, n_results=2,
+                                   date_from=date.today() - timedelta(days=rag.RAG_RECENT_DAYS))
 
-    system_prompt = f"""
+    return f"""
     Jesteś Bosem ostatecznym. Wynik: {score}/100.
-    Użytkownik się tłumaczy: "{request.message}"
+    Użytkownik się tłumaczy: "{message}"
     
     FAKTY Z BAZY (Użyj, by wykazać mu kłamstwo):
     {context}
     
     Zmiażdż wymówkę faktami.
     """
+
+@app.post("/api/ai/roast-chat")
+async def chat_with_roast_master(
+    request: schemas.AIChatRequest,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    system_prompt = await run_in_threadpool(_build_roast_chat_prompt, db, request.message, current_user.id)
     
-    reply = call_lm_studio(request.message, system_prompt)
+    if request.stream:
+        deltas = llm_client.stream_chat_completion(system_prompt, request.message, temperature=0.3, route="roast_chat")
+        return StreamingResponse(
+            llm_client.sse_events(deltas, fallback="[]"),
+            media_type="text/event-stream", headers=llm_client.SSE_HEADERS
+        )
+
+    reply = await call_lm_studio(request.message, system_prompt, route="roast_chat")
     return {"reply": reply}
 
+# === ADMIN TOOLS (AI CACHE) ===
+@app.get("/api/admin/ai-cache")
+def get_ai_cache_stats(current_user: models.User = Depends(auth.get_current_active_user)):
+    """Trafienia/pudła cache'u odpowiedzi LLM per endpoint."""
+    return llm_cache.stats()
+
+@app.get("/api/admin/auth-cache")
+def get_auth_cache_stats(current_user: models.User = Depends(auth.get_current_active_user)):
+    """Trafienia/pudła cache'u token -> użytkownik (każde pudło = jeden SELECT po users)."""
+    return auth.user_cache_stats()
+
+# === ADMIN TOOLS (RAG QUEUE) ===
+@app.get("/api/admin/rag-queue")
+def get_rag_queue_stats(current_user: models.User = Depends(auth.get_current_active_user)):
+    """Głębokość kolejki indeksowania, opóźnienie (lag) i liczniki workera."""
+    return rag_queue.stats()
+
 # === ADMIN TOOLS (RAG REINDEX) ===
 @app.post("/api/admin/reindex-rag")
 def reindex_existing_data(
@@ -453,24 +524,25 @@ def reindex_existing_data(
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
     """
-    Uruchom to RAZ, żeby wczytać stare dane do ChromaDB.
+    Startuje (albo wznawia) reindeksację zadań, zdrowia i treningów w tle.
+    Zwraca od razu - postęp pod GET /api/admin/reindex-rag/{job_id}.
     """
-    # 1. Zadania
-    tasks = db.query(models.Task).filter(models.Task.owner_id == current_user.id).all()
-    t_count = 0
-    for t in tasks:
-        rag.add_document(f"task_{t.id}", t.content, {"type": "task", "date": str(t.task_date or "inbox")},user_id=current_user.id)
-        t_count += 1
-        
-    # 2. Zdrowie
-    healths = db.query(models.DailyHealth).filter(models.DailyHealth.user_id == current_user.id).all()
-    h_count = 0
-    for h in healths:
-        note = f"Dnia {h.date}: Waga {h.weight}, Sen {h.sleep_hours}. {h.note or ''}"
-        rag.add_document(f"health_{h.id}", note, {"type": "health", "date": str(h.date)},user_id=current_user.id)
-        h_count += 1
-        
-    return {"status": "success", "indexed_tasks": t_count, "indexed_health": h_count}
+    job = rag_reindex.start_job(db, user_id=current_user.id)
+    return rag_reindex.job_status(job)
+
+@app.get("/api/admin/reindex-rag/{job_id}")
+def get_reindex_status(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    job = db.query(models.RagReindexJob).filter(
+        models.RagReindexJob.id == job_id,
+        models.RagReindexJob.user_id == current_user.id
+    ).first()
+    if job is None:
+        raise HTTPException(status_code=404, detail="Reindex job not found")
+    return rag_reindex.job_status(job)
 
 @app.get("/api/gamification/stats")
 def get_rpg_stats(
@@ -484,35 +556,11 @@ def get_rpg_stats(
 app.include_router(gym_app.router) # <--- Nowa nazwa
 
 # === NOWY SERWIS AI (GENERIC OPENAI STYLE) ===
-# To obsłuży LM Studio, OpenAI, Kimi, DeepSeek - zależy co wpiszesz w .env
-
-AI_BASE_URL = os.getenv("AI_BASE_URL", "http://localhost:1234/v1") # Domyślnie lokalnie
-AI_API_KEY = os.getenv("AI_API_KEY", "lm-studio") # Dla locala dowolny, dla Kimi prawdziwy
+# To obsłuży LM Studio, OpenAI, Kimi, DeepSeek - zależy co wpiszesz w .env (konfiguracja w llm_client.py)
 
-def call_ai_api(user_message: str, system_message: str = "You are a helpful assistant.", temperature: float = 0.7) -> str:
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {AI_API_KEY}"
-    }
-    
-    payload = {
-        "model": os.getenv("AI_MODEL_NAME", "local-model"), # Np. "moonshot-v1-8k"
-        "messages": [
-            {"role": "system", "content": system_message},
-            {"role": "user", "content": user_message}
-        ],
-        "temperature": temperature,
-        "stream": False
-    }
-
-    try:
-        response = requests.post(f"{AI_BASE_URL}/chat/completions", json=payload, headers=headers, timeout=60)
-        if response.status_code != 200:
-            print(f"AI Error {response.status_code}: {response.text}")
-            return "AI Error: Service unavailable."
-        
-        data = response.json()
-        return data['choices'][0]['message']['content']
-    except Exception as e:
-        print(f"AI Connection Error: {e}")
-        return "AI Error: Connection failed."
\ No newline at end of file
+async def call_ai_api(user_message: str, system_message: str = "You are a helpful assistant.", temperature: float = 0.7) -> str:
+    """
+    Zwraca treść odpowiedzi. Błędy nie są sklejane w jeden tekst - leci llm_client.LLMTimeout /
+    LLMConnectionError / LLMHTTPError (.status_code) / LLMBadResponse, wszystkie dziedziczą po LLMError.
+    """
+    return await llm_client.chat_completion(system_message, user_message, temperature=temperature)
@@ -0,0 +1,140 @@
+# G:\MotivAItor\aijournal-backend\migrate.py
+# Zarządzanie schematem bazy - odpalane RAZ przy wdrożeniu, a nie przy imporcie main.py
+# w każdym workerze uvicorna. Migracje siedzą w katalogu migrations/ (NNNN_nazwa.py),
+# a zastosowane wersje w tabeli schema_migrations.
+#
+#   python migrate.py                -> stosuje brakujące migracje (upgrade)
+#   python migrate.py status         -> które wersje są zastosowane, które czekają
+#   python migrate.py reset --yes    -> KASUJE CAŁĄ BAZĘ i buduje od zera (dawniej reset_db.py)
+#
+# W docker-compose robi to osobny serwis "migrate", backend startuje dopiero po nim.
+import importlib
+import os
+import re
+import sys
+import time
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from database import engine
+
+DB_WAIT_TIMEOUT = float(os.getenv("DB_WAIT_TIMEOUT", 60)) # Ile sekund czekamy, aż Postgres wstanie
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+# Dwa równoległe `migrate.py` (np. kilka replik przy deployu) - drugi czeka na pierwszego
+MIGRATION_LOCK_ID = 7_201_901
+
+_FILE_RE = re.compile(r"^(\d{4})_(\w+)\.py$")
+
+def wait_for_db(timeout: float = DB_WAIT_TIMEOUT) -> bool:
+    """Czeka na bazę z rosnącym odstępem (0.5s, 1s, 2s ... max 5s)."""
+    deadline = time.time() + timeout
+    delay = 0.5
+    attempt = 1
+    while True:
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            return True
+        except OperationalError:
+            if time.time() >= deadline:
+                return False
+            print(f"⏳ Baza jeszcze nie gotowa (próba {attempt}). Czekam {delay}s...")
+            time.sleep(delay)
+            delay = min(delay * 2, 5.0)
+            attempt += 1
+
+def load_migrations() -> list[tuple[str, str, object]]:
+    """[(wersja, nazwa, moduł), ...] posortowane po wersji."""
+    migrations = []
+    for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+        match = _FILE_RE.match(filename)
+        if not match:
+            continue
+        module = importlib.import_module(f"migrations.{filename[:-3]}")
+        migrations.append((match.group(1), match.group(2), module))
+    return migrations
+
+def _ensure_table(conn):
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version VARCHAR PRIMARY KEY,
+            name VARCHAR NOT NULL,
+            applied_at TIMESTAMP NOT NULL DEFAULT now()
+        )
+    """))
+
+def applied_versions(conn) -> set[str]:
+    return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+def _record(conn, version: str, name: str):
+    conn.execute(text("INSERT INTO schema_migrations (version, name) VALUES (:version, :name)"),
+                 {"version": version, "name": name})
+
+def upgrade():
+    migrations = load_migrations()
+    with engine.connect() as lock_conn:
+        lock_conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+        try:
+            with engine.begin() as conn:
+                _ensure_table(conn)
+                done = applied_versions(conn)
+
+            pending = [m for m in migrations if m[0] not in done]
+            if not pending:
+                print("✅ Schemat aktualny - brak migracji do zastosowania.")
+                return
+
+            for version, name, module in pending:
+                print(f"🏗️ Migracja {version}_{name}...")
+                started = time.time()
+                if getattr(module, "TRANSACTIONAL", True):
+                    # Zmiana + wpis w schema_migrations w jednej transakcji - albo oba, albo nic
+                    with engine.begin() as conn:
+                        module.upgrade(conn)
+                        _record(conn, version, name)
+                else:
+                    # CONCURRENTLY / backfill paczkami nie mogą chodzić w transakcji.
+                    # Migracja musi być idempotentna - po przerwaniu powtarzamy ją w całości.
+                    with engine.connect() as conn:
+                        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+                        module.upgrade(conn)
+                        _record(conn, version, name)
+                print(f"✅ {version}_{name} ({time.time() - started:.1f}s)")
+        finally:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+
+def status():
+    with engine.begin() as conn:
+        _ensure_table(conn)
+        done = applied_versions(conn)
+    for version, name, _ in load_migrations():
+        mark = "✅" if version in done else "⏳"
+        print(f"{mark} {version}_{name}")
+
+def reset():
+    print("🗑️  Usuwanie starych tabel...")
+    with engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA public CASCADE;"))
+        conn.execute(text("CREATE SCHEMA public;"))
+    print("✅ Baza wyczyszczona.")
+    upgrade()
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "upgrade"
+
+    print("🔌 Łączę się z bazą...")
+    if not wait_for_db():
+        print(f"❌ Baza nie odpowiada po {DB_WAIT_TIMEOUT}s.")
+        sys.exit(1)
+
+    if command == "upgrade":
+        upgrade()
+    elif command == "status":
+        status()
+    elif command == "reset":
+        if "--yes" not in sys.argv:
+            print("⚠️ reset kasuje WSZYSTKIE dane. Potwierdź: python migrate.py reset --yes")
+            sys.exit(1)
+        reset()
+    else:
+        print(f"❌ Nieznana komenda '{command}'. Dostępne: upgrade, status, reset --yes")
+        sys.exit(1)
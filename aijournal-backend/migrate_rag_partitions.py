@@ -0,0 +1,86 @@
+# G:\MotivAItor\aijournal-backend\migrate_rag_partitions.py
+# Przenosi istniejące wektory do układu z RAG_PARTITIONING (user / hash) i RAG_TIME_BUCKETS (month).
+# Embeddingi są kopiowane 1:1 - nic nie jest liczone od nowa.
+#
+#   RAG_PARTITIONING=user python migrate_rag_partitions.py                 -> kopiuje
+#   RAG_PARTITIONING=user python migrate_rag_partitions.py --delete-source -> kopiuje i czyści źródło
+#   RAG_TIME_BUCKETS=month python migrate_rag_partitions.py --delete-source
+#
+# Przechodzi po wszystkich kolekcjach bazy wiedzy; dokument, który leży nie tam, gdzie wskazuje
+# aktualna konfiguracja, jest przenoszony. Przy okazji:
+#   - dopisuje metadane date_ord (filtr dat w Chroma) starym wpisom,
+#   - uzupełnia katalog rag_lexical (BM25 + routing kubełków).
+# Skrypt można puścić ponownie (upsert).
+import sys
+import rag
+import rag_lexical
+
+PAGE_SIZE = 500
+
+def _empty_target():
+    return {"ids": [], "documents": [], "metadatas": [], "embeddings": []}
+
+def migrate(delete_source: bool):
+    print(f"🚚 Układ docelowy: partycje '{rag.RAG_PARTITIONING}', kubełki '{rag.RAG_TIME_BUCKETS}'...")
+    moved = 0
+    updated = 0
+    for source_name in rag.list_collections():
+        source = rag.get_collection(source_name)
+        to_delete = [] # Kasujemy dopiero po przejściu kolekcji - usuwanie w trakcie przesuwałoby offsety
+        offset = 0
+        while True:
+            page = source.get(limit=PAGE_SIZE, offset=offset, include=["documents", "metadatas", "embeddings"])
+            if not page["ids"]:
+                break
+
+            by_collection = {}
+            in_place = {"ids": [], "metadatas": []}
+            catalog = []
+            for i, doc_id in enumerate(page["ids"]):
+                meta = dict(page["metadatas"][i] or {})
+                if "user_id" not in meta:
+                    print(f"⚠️ Pomijam {doc_id} - brak user_id w metadanych")
+                    continue
+
+                ordinal = rag.date_ord(meta.get("date"))
+                needs_ordinal = ordinal is not None and meta.get("date_ord") != ordinal
+                if needs_ordinal:
+                    meta["date_ord"] = ordinal
+                catalog.append({"doc_id": doc_id, "text": page["documents"][i], "metadata": meta, "user_id": meta["user_id"]})
+
+                target_name = rag.collection_name(meta["user_id"], meta.get("date"))
+                if target_name == source_name:
+                    if needs_ordinal:
+                        in_place["ids"].append(doc_id)
+                        in_place["metadatas"].append(meta)
+                    continue
+
+                target = by_collection.setdefault(target_name, _empty_target())
+                target["ids"].append(doc_id)
+                target["documents"].append(page["documents"][i])
+                target["metadatas"].append(meta)
+                target["embeddings"].append(page["embeddings"][i])
+
+            for name, target in by_collection.items():
+                rag.get_collection(name).upsert(**target)
+                moved += len(target["ids"])
+                to_delete.extend(target["ids"])
+            if in_place["ids"]:
+                source.update(**in_place)
+                updated += len(in_place["ids"])
+            rag_lexical.upsert_documents(catalog)
+
+            offset += len(page["ids"])
+            print(f"[{source_name}] przeniesiono {moved}, uzupełniono metadane {updated}...")
+
+        if delete_source and to_delete:
+            for i in range(0, len(to_delete), PAGE_SIZE):
+                source.delete(ids=to_delete[i:i + PAGE_SIZE])
+            if source.count() == 0:
+                rag.drop_collection(source_name)
+                print(f"🗑️ Usunięto pustą kolekcję '{source_name}'.")
+
+    print(f"✅ Gotowe! Przeniesiono {moved} wektorów, uzupełniono metadane {updated}.")
+
+if __name__ == "__main__":
+    migrate(delete_source="--delete-source" in sys.argv)
@@ -0,0 +1,233 @@
+# Schemat startowy - stan models.py z chwili wprowadzenia migracji (zamrożony DDL, nie create_all
+# z aktualnych modeli - inaczej "baseline" zmieniałby się z każdą edycją models.py).
+# IF NOT EXISTS, bo starsze bazy mają już tabele z dawnego create_all przy starcie main.py.
+# Kolejne zmiany schematu = kolejne migracje, NIE edycja tego pliku.
+from sqlalchemy import text
+
+TRANSACTIONAL = True
+
+STATEMENTS = """
+CREATE TABLE IF NOT EXISTS exercise_library (
+    id SERIAL NOT NULL,
+    title VARCHAR,
+    "desc" TEXT,
+    type VARCHAR,
+    body_part VARCHAR,
+    equipment VARCHAR,
+    level VARCHAR,
+    PRIMARY KEY (id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_exercise_library_id ON exercise_library (id);
+
+CREATE INDEX IF NOT EXISTS ix_exercise_library_title ON exercise_library (title);
+
+CREATE TABLE IF NOT EXISTS users (
+    id SERIAL NOT NULL,
+    email VARCHAR NOT NULL,
+    hashed_password VARCHAR NOT NULL,
+    stat_strength FLOAT,
+    stat_willpower FLOAT,
+    stat_health FLOAT,
+    PRIMARY KEY (id)
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS ix_users_email ON users (email);
+
+CREATE INDEX IF NOT EXISTS ix_users_id ON users (id);
+
+CREATE TABLE IF NOT EXISTS daily_health (
+    id SERIAL NOT NULL,
+    user_id INTEGER,
+    date DATE NOT NULL,
+    sleep_hours FLOAT,
+    weight FLOAT,
+    calories INTEGER,
+    mood_score INTEGER,
+    note TEXT,
+    PRIMARY KEY (id),
+    FOREIGN KEY(user_id) REFERENCES users (id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_daily_health_date ON daily_health (date);
+
+CREATE INDEX IF NOT EXISTS ix_daily_health_id ON daily_health (id);
+
+CREATE INDEX IF NOT EXISTS ix_daily_health_user_date ON daily_health (user_id, date);
+
+CREATE TABLE IF NOT EXISTS daily_summaries (
+    id SERIAL NOT NULL,
+    user_id INTEGER,
+    date DATE NOT NULL,
+    ai_reflection TEXT,
+    metrics JSONB,
+    PRIMARY KEY (id),
+    FOREIGN KEY(user_id) REFERENCES users (id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_daily_summaries_date ON daily_summaries (date);
+
+CREATE INDEX IF NOT EXISTS ix_daily_summaries_id ON daily_summaries (id);
+
+CREATE TABLE IF NOT EXISTS projects (
+    id SERIAL NOT NULL,
+    name VARCHAR NOT NULL,
+    description VARCHAR,
+    color VARCHAR,
+    default_duration INTEGER,
+    owner_id INTEGER,
+    PRIMARY KEY (id),
+    FOREIGN KEY(owner_id) REFERENCES users (id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_projects_id ON projects (id);
+
+CREATE TABLE IF NOT EXISTS rag_reindex_jobs (
+    id SERIAL NOT NULL,
+    user_id INTEGER,
+    status VARCHAR NOT NULL,
+    source VARCHAR NOT NULL,
+    last_id INTEGER NOT NULL,
+    scanned INTEGER NOT NULL,
+    indexed INTEGER NOT NULL,
+    skipped INTEGER NOT NULL,
+    error TEXT,
+    created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now(),
+    heartbeat_at TIMESTAMP WITHOUT TIME ZONE,
+    finished_at TIMESTAMP WITHOUT TIME ZONE,
+    PRIMARY KEY (id),
+    FOREIGN KEY(user_id) REFERENCES users (id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_rag_reindex_jobs_id ON rag_reindex_jobs (id);
+
+CREATE INDEX IF NOT EXISTS ix_rag_reindex_jobs_user_id ON rag_reindex_jobs (user_id);
+
+CREATE TABLE IF NOT EXISTS weekly_reports (
+    id SERIAL NOT NULL,
+    user_id INTEGER,
+    start_date DATE NOT NULL,
+    end_date DATE NOT NULL,
+    ai_summary TEXT,
+    ai_strategy TEXT,
+    metrics_avg JSONB,
+    PRIMARY KEY (id),
+    FOREIGN KEY(user_id) REFERENCES users (id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_weekly_reports_id ON weekly_reports (id);
+
+CREATE TABLE IF NOT EXISTS workout_plans (
+    id SERIAL NOT NULL,
+    owner_id INTEGER,
+    name VARCHAR NOT NULL,
+    description VARCHAR,
+    color VARCHAR,
+    exercises_structure JSONB,
+    PRIMARY KEY (id),
+    FOREIGN KEY(owner_id) REFERENCES users (id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_workout_plans_id ON workout_plans (id);
+
+CREATE TABLE IF NOT EXISTS workout_sessions (
+    id SERIAL NOT NULL,
+    user_id INTEGER,
+    date DATE NOT NULL,
+    name VARCHAR NOT NULL,
+    duration_minutes INTEGER,
+    note TEXT,
+    PRIMARY KEY (id),
+    FOREIGN KEY(user_id) REFERENCES users (id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_workout_sessions_date ON workout_sessions (date);
+
+CREATE INDEX IF NOT EXISTS ix_workout_sessions_id ON workout_sessions (id);
+
+CREATE INDEX IF NOT EXISTS ix_workout_sessions_user_date ON workout_sessions (user_id, date);
+
+CREATE TABLE IF NOT EXISTS exercise_logs (
+    id SERIAL NOT NULL,
+    session_id INTEGER,
+    exercise_name VARCHAR NOT NULL,
+    sets INTEGER,
+    reps VARCHAR,
+    weight FLOAT,
+    volume_load FLOAT,
+    PRIMARY KEY (id),
+    FOREIGN KEY(session_id) REFERENCES workout_sessions (id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_exercise_logs_id ON exercise_logs (id);
+
+CREATE TABLE IF NOT EXISTS pomodoro_sessions (
+    id SERIAL NOT NULL,
+    user_id INTEGER,
+    date DATE NOT NULL,
+    duration INTEGER,
+    tag VARCHAR,
+    project_id INTEGER,
+    PRIMARY KEY (id),
+    FOREIGN KEY(user_id) REFERENCES users (id),
+    FOREIGN KEY(project_id) REFERENCES projects (id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_pomodoro_sessions_date ON pomodoro_sessions (date);
+
+CREATE INDEX IF NOT EXISTS ix_pomodoro_sessions_id ON pomodoro_sessions (id);
+
+CREATE INDEX IF NOT EXISTS ix_pomodoro_sessions_user_date ON pomodoro_sessions (user_id, date);
+
+CREATE TABLE IF NOT EXISTS project_activity (
+    project_id INTEGER NOT NULL,
+    task_count INTEGER NOT NULL,
+    completed_count INTEGER NOT NULL,
+    last_task_completed_at TIMESTAMP WITHOUT TIME ZONE,
+    pomodoro_count INTEGER NOT NULL,
+    pomodoro_minutes INTEGER NOT NULL,
+    last_pomodoro_date DATE,
+    updated_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now(),
+    PRIMARY KEY (project_id),
+    FOREIGN KEY(project_id) REFERENCES projects (id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS project_contexts (
+    id SERIAL NOT NULL,
+    project_id INTEGER,
+    master_prompt TEXT,
+    PRIMARY KEY (id),
+    FOREIGN KEY(project_id) REFERENCES projects (id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_project_contexts_id ON project_contexts (id);
+
+CREATE TABLE IF NOT EXISTS tasks (
+    id SERIAL NOT NULL,
+    content VARCHAR NOT NULL,
+    is_completed BOOLEAN,
+    task_date DATE,
+    points INTEGER,
+    priority VARCHAR DEFAULT 'medium',
+    "order" INTEGER,
+    completed_at TIMESTAMP WITHOUT TIME ZONE,
+    owner_id INTEGER,
+    project_id INTEGER,
+    PRIMARY KEY (id),
+    FOREIGN KEY(owner_id) REFERENCES users (id),
+    FOREIGN KEY(project_id) REFERENCES projects (id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_tasks_id ON tasks (id);
+
+CREATE INDEX IF NOT EXISTS ix_tasks_owner_date_order ON tasks (owner_id, task_date, "order");
+
+CREATE INDEX IF NOT EXISTS ix_tasks_project_completed ON tasks (project_id, is_completed, completed_at);
+
+CREATE INDEX IF NOT EXISTS ix_tasks_task_date ON tasks (task_date);
+"""
+
+def upgrade(conn):
+    for statement in STATEMENTS.split(";"):
+        if statement.strip():
+            conn.execute(text(statement))
@@ -0,0 +1,8 @@
+# Statystyki S.W.H. w tabeli users (dawniej fix_db.py) - dla baz sprzed gamifikacji.
+from sqlalchemy import text
+
+TRANSACTIONAL = True
+
+def upgrade(conn):
+    for column in ("stat_strength", "stat_willpower", "stat_health"):
+        conn.execute(text(f"ALTER TABLE users ADD COLUMN IF NOT EXISTS {column} FLOAT DEFAULT 0.0"))
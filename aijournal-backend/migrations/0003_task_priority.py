@@ -0,0 +1,11 @@
+# Kolumna tasks.priority - API (schemas.TaskBase) ją przyjmowało, ale baza jej nie zapisywała.
+# Kolumna bez NOT NULL + default (bez przepisywania tabeli), stare wiersze uzupełniane paczkami.
+from sqlalchemy import text
+from migrations import backfill_in_batches
+
+TRANSACTIONAL = False
+
+def upgrade(conn):
+    conn.execute(text("ALTER TABLE tasks ADD COLUMN IF NOT EXISTS priority VARCHAR"))
+    conn.execute(text("ALTER TABLE tasks ALTER COLUMN priority SET DEFAULT 'medium'"))
+    backfill_in_batches(conn, "tasks", "priority = 'medium'", "priority IS NULL")
@@ -0,0 +1,14 @@
+# Indeksy złożone pod gorące zapytania (budowane CONCURRENTLY - bez blokady zapisów):
+# - zadania usera na dzień / inbox posortowane po "order" + "ostatni order" przy dodawaniu,
+# - momentum projektu (ukończone zadania, ostatnia aktywność),
+# - historia zdrowia / pomodoro / treningów usera po dacie.
+from migrations import create_index_concurrently
+
+TRANSACTIONAL = False
+
+def upgrade(conn):
+    create_index_concurrently(conn, "ix_tasks_owner_date_order", "tasks", 'owner_id, task_date, "order"')
+    create_index_concurrently(conn, "ix_tasks_project_completed", "tasks", "project_id, is_completed, completed_at")
+    create_index_concurrently(conn, "ix_daily_health_user_date", "daily_health", "user_id, date")
+    create_index_concurrently(conn, "ix_pomodoro_sessions_user_date", "pomodoro_sessions", "user_id, date")
+    create_index_concurrently(conn, "ix_workout_sessions_user_date", "workout_sessions", "user_id, date")
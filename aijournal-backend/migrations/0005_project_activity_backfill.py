@@ -0,0 +1,35 @@
+# Wypełnia rollup project_activity dla istniejących danych (tabela powstała w baseline pusta).
+# SQL wpisany na stałe (bez importu crud) - migracja ma robić to samo niezależnie od późniejszych zmian w kodzie.
+from sqlalchemy import text
+
+TRANSACTIONAL = True
+
+def upgrade(conn):
+    # Już wypełniony (np. rebuild_project_activity.py) - nie liczymy drugi raz
+    if conn.execute(text("SELECT 1 FROM project_activity LIMIT 1")).first():
+        return
+    result = conn.execute(text("""
+        INSERT INTO project_activity (
+            project_id, task_count, completed_count, last_task_completed_at,
+            pomodoro_count, pomodoro_minutes, last_pomodoro_date
+        )
+        SELECT p.id,
+               COALESCE(t.task_count, 0), COALESCE(t.completed_count, 0), t.last_task_completed_at,
+               COALESCE(pm.pomodoro_count, 0), COALESCE(pm.pomodoro_minutes, 0), pm.last_pomodoro_date
+        FROM projects p
+        LEFT JOIN (
+            SELECT project_id,
+                   COUNT(id) AS task_count,
+                   COUNT(id) FILTER (WHERE is_completed) AS completed_count,
+                   MAX(completed_at) FILTER (WHERE is_completed) AS last_task_completed_at
+            FROM tasks WHERE project_id IS NOT NULL GROUP BY project_id
+        ) t ON t.project_id = p.id
+        LEFT JOIN (
+            SELECT project_id,
+                   COUNT(id) AS pomodoro_count,
+                   SUM(duration) AS pomodoro_minutes,
+                   MAX(date) AS last_pomodoro_date
+            FROM pomodoro_sessions WHERE project_id IS NOT NULL GROUP BY project_id
+        ) pm ON pm.project_id = p.id
+    """))
+    print(f"   project_activity: przeliczono {result.rowcount} projektów")
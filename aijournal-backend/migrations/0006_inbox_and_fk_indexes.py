@@ -0,0 +1,17 @@
+# Indeksy z audytu planów (plan_audit.py):
+# - inbox: częściowy indeks WHERE task_date IS NULL (mały, tylko zadania bez daty),
+# - klucze obce bez indeksu - JOIN-y, ładowanie relacji i ON DELETE skanowały całe tabele.
+# tasks.owner_id / tasks.project_id i user_id w zdrowiu/pomodoro/treningach pokrywają indeksy złożone z 0004.
+from migrations import create_index_concurrently
+
+TRANSACTIONAL = False
+
+def upgrade(conn):
+    create_index_concurrently(conn, "ix_tasks_owner_inbox_order", "tasks", 'owner_id, "order"', where="task_date IS NULL")
+    create_index_concurrently(conn, "ix_projects_owner_id", "projects", "owner_id")
+    create_index_concurrently(conn, "ix_project_contexts_project_id", "project_contexts", "project_id")
+    create_index_concurrently(conn, "ix_pomodoro_sessions_project_id", "pomodoro_sessions", "project_id")
+    create_index_concurrently(conn, "ix_daily_summaries_user_date", "daily_summaries", "user_id, date")
+    create_index_concurrently(conn, "ix_weekly_reports_user_id", "weekly_reports", "user_id")
+    create_index_concurrently(conn, "ix_exercise_logs_session_id", "exercise_logs", "session_id")
+    create_index_concurrently(conn, "ix_workout_plans_owner_id", "workout_plans", "owner_id")
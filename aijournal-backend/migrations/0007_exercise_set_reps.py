@@ -0,0 +1,100 @@
+# Kolumna exercise_logs.set_reps (powtórzenia per seria) + przeliczenie volume_load starych logów.
+# Wcześniej volume liczono tylko z pierwszej serii ("12,10,8" -> 3 * 12 * ciężar).
+# Paczkami w autocommit; wiersz z uzupełnionym set_reps (także []) jest pomijany przy powtórce.
+# Parser to ZAMROŻONA kopia crud.parse_set_reps z chwili tej migracji - zmiany w crud jej nie dotyczą.
+import re
+from sqlalchemy import text
+
+TRANSACTIONAL = False
+BATCH_SIZE = 2000
+
+# --- KOPIA PARSERA (crud.parse_set_reps) ---
+
+MAX_SETS_PER_EXERCISE = 50 # Bezpiecznik na "1000x10" albo sets=10**9 z frontu
+
+_REPS_JOIN = re.compile(r"\s*([xX×*+\-–])\s*")
+_REPS_SPLIT = re.compile(r"[,/;\s]+")
+_REPS_NUMBER = re.compile(r"^\d+$")
+_REPS_RANGE = re.compile(r"^(\d+)[\-–](\d+)$")
+_REPS_SUM = re.compile(r"^\d+(\+\d+)+$")
+
+def _single_reps(spec: str):
+    """Powtórzenia jednej serii: "10", "8-10" (dolna granica), "10+3" (rest-pause). None = nieczytelne."""
+    if _REPS_NUMBER.match(spec):
+        return int(spec)
+    if match := _REPS_RANGE.match(spec):
+        return min(int(match.group(1)), int(match.group(2)))
+    if _REPS_SUM.match(spec):
+        return sum(int(part) for part in spec.split("+"))
+    return None
+
+def _token_reps(token: str):
+    """
+    (powtórzenia per seria, czy token sam podaje liczbę serii) albo ([], False) dla nieczytelnego.
+    "4x8-10" -> 4 serie po 8, "5x5x5" / "12-10-8" -> kolejne serie wprost.
+    """
+    parts = re.split(r"[xX×*]", token)
+    if len(parts) == 2 and _REPS_NUMBER.match(parts[0]):
+        reps = _single_reps(parts[1])
+        if reps is None:
+            return [], False
+        return [reps] * min(int(parts[0]), MAX_SETS_PER_EXERCISE), True
+    if len(parts) == 1:
+        dashed = re.split(r"[\-–]", token)
+        if len(dashed) >= 3 and all(_REPS_NUMBER.match(p) for p in dashed):
+            return [int(p) for p in dashed], True
+        reps = _single_reps(token)
+        return ([reps], False) if reps is not None else ([], False)
+    if all(_REPS_NUMBER.match(p) for p in parts):
+        return [int(p) for p in parts], True
+    return [], False
+
+def _parse_set_reps(reps: str | None, sets: int | None) -> list[int]:
+    """
+    Powtórzenia w każdej serii z tego, co wpisał user:
+      "12,10,8" / "12/10/8" / "12-10-8" / "5x5x5" -> kolejne serie wprost
+      "3x10" -> [10, 10, 10]      "4x8-10" -> [8, 8, 8, 8] (zakres = dolna granica)
+      "10" przy 3 seriach -> [10, 10, 10]      "6-8" przy 2 seriach -> [6, 6]      "10+3" -> [13]
+    `sets` jest używane tylko wtedy, gdy `reps` to pojedyncza wartość "na serię" - jeśli napis sam
+    wylicza serie (lista, NxM), liczy się to, co wpisano. Nieczytelne kawałki ("AMRAP") pomijamy.
+    """
+    per_set = []
+    spelled_out = False
+    tokens = [t for t in _REPS_SPLIT.split(_REPS_JOIN.sub(r"\1", str(reps or "")).strip()) if t]
+    for token in tokens:
+        token_sets, explicit = _token_reps(token)
+        per_set.extend(token_sets)
+        spelled_out = spelled_out or explicit
+    spelled_out = spelled_out or len(tokens) > 1
+
+    target_sets = min(sets or 0, MAX_SETS_PER_EXERCISE)
+    if per_set and not spelled_out and len(per_set) < target_sets:
+        per_set.extend([per_set[-1]] * (target_sets - len(per_set)))
+    return per_set[:MAX_SETS_PER_EXERCISE]
+
+def _exercise_volume(set_reps: list[int], weight: float | None) -> float:
+    """Volume Load = suma powtórzeń ze wszystkich serii * ciężar."""
+    return float(sum(set_reps) * (weight or 0.0))
+
+# --- MIGRACJA ---
+
+def upgrade(conn):
+    conn.execute(text("ALTER TABLE exercise_logs ADD COLUMN IF NOT EXISTS set_reps INTEGER[]"))
+    total = 0
+    while True:
+        rows = conn.execute(text("""
+            SELECT id, sets, reps, weight FROM exercise_logs
+            WHERE set_reps IS NULL ORDER BY id LIMIT :batch
+        """), {"batch": BATCH_SIZE}).all()
+        if not rows:
+            break
+        params = []
+        for row in rows:
+            set_reps = _parse_set_reps(row.reps, row.sets)
+            params.append({"id": row.id, "set_reps": set_reps, "volume": _exercise_volume(set_reps, row.weight)})
+        conn.execute(text("""
+            UPDATE exercise_logs SET set_reps = CAST(:set_reps AS INTEGER[]), volume_load = :volume
+            WHERE id = :id
+        """), params)
+        total += len(rows)
+        print(f"   exercise_logs: przeliczono {total} wierszy...")
@@ -0,0 +1,30 @@
+# Dzienny rollup objętości treningowej (workout_volume_daily) + wypełnienie z istniejących treningów.
+# Po 0007, bo korzysta z przeliczonego volume_load. DDL i GROUP BY wpisane na stałe (bez models/crud).
+from sqlalchemy import text
+
+TRANSACTIONAL = True
+
+def upgrade(conn):
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS workout_volume_daily (
+            user_id INTEGER NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+            date DATE NOT NULL,
+            volume FLOAT NOT NULL,
+            sessions INTEGER NOT NULL,
+            PRIMARY KEY (user_id, date)
+        )
+    """))
+    # Już wypełniony (np. rebuild_workout_volume.py) - nie liczymy drugi raz
+    if conn.execute(text("SELECT 1 FROM workout_volume_daily LIMIT 1")).first():
+        return
+    result = conn.execute(text("""
+        INSERT INTO workout_volume_daily (user_id, date, volume, sessions)
+        SELECT w.user_id, w.date, COALESCE(SUM(v.volume), 0), COUNT(w.id)
+        FROM workout_sessions w
+        LEFT JOIN (
+            SELECT session_id, SUM(volume_load) AS volume FROM exercise_logs GROUP BY session_id
+        ) v ON v.session_id = w.id
+        WHERE w.user_id IS NOT NULL
+        GROUP BY w.user_id, w.date
+    """))
+    print(f"   workout_volume_daily: przeliczono {result.rowcount} dni")
@@ -0,0 +1,19 @@
+# tasks.priority NOT NULL - domknięcie 0003 (tam kolumna była nullable, żeby ALTER nie przepisywał tabeli).
+# CHECK ... NOT VALID + VALIDATE sprawdza tabelę bez blokady zapisów; SET NOT NULL korzysta potem
+# z ważnego CHECK-a (Postgres 12+) i nie skanuje tabeli drugi raz pod ACCESS EXCLUSIVE.
+from sqlalchemy import text
+from migrations import backfill_in_batches
+
+TRANSACTIONAL = False
+CONSTRAINT = "tasks_priority_not_null"
+
+def upgrade(conn):
+    # Wiersze dopisane przez stary kod w trakcie wdrożenia 0003
+    backfill_in_batches(conn, "tasks", "priority = 'medium'", "priority IS NULL")
+
+    exists = conn.execute(text("SELECT 1 FROM pg_constraint WHERE conname = :name"), {"name": CONSTRAINT}).first()
+    if not exists:
+        conn.execute(text(f"ALTER TABLE tasks ADD CONSTRAINT {CONSTRAINT} CHECK (priority IS NOT NULL) NOT VALID"))
+    conn.execute(text(f"ALTER TABLE tasks VALIDATE CONSTRAINT {CONSTRAINT}"))
+    conn.execute(text("ALTER TABLE tasks ALTER COLUMN priority SET NOT NULL"))
+    conn.execute(text(f"ALTER TABLE tasks DROP CONSTRAINT IF EXISTS {CONSTRAINT}"))
@@ -0,0 +1,48 @@
+# G:\MotivAItor\aijournal-backend\migrations\__init__.py
+# Wersjonowane migracje schematu. Każdy plik NNNN_nazwa.py to jedna migracja:
+#
+#   TRANSACTIONAL = True     # False = chodzi w autocommit (CREATE INDEX CONCURRENTLY, backfill paczkami)
+#   def upgrade(conn): ...   # conn = sqlalchemy Connection
+#
+# Odpala je migrate.py w kolejności numerów, każdą raz (tabela schema_migrations).
+# Migracje muszą być idempotentne (IF NOT EXISTS) - baseline tworzy schemat z aktualnych modeli,
+# więc na świeżej bazie część późniejszych zmian już istnieje.
+#
+# Poniżej pomocnicze operacje "online" - nie blokują tabel na czas całej operacji.
+from sqlalchemy import text
+
+def create_index_concurrently(conn, name: str, table: str, columns: str, where: str = None):
+    """
+    CREATE INDEX CONCURRENTLY (bez blokady zapisów). Wymaga migracji z TRANSACTIONAL = False.
+    Przerwany CONCURRENTLY zostawia indeks INVALID - taki usuwamy i budujemy od nowa.
+    """
+    invalid = conn.execute(text("""
+        SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE c.relname = :name AND NOT i.indisvalid
+    """), {"name": name}).first()
+    if invalid:
+        print(f"⚠️ Indeks {name} jest INVALID (przerwany build) - buduję od nowa")
+        conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"'))
+
+    sql = f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" ON {table} ({columns})'
+    if where:
+        sql += f" WHERE {where}"
+    conn.execute(text(sql))
+    print(f"✅ Indeks {name}")
+
+def backfill_in_batches(conn, table: str, set_sql: str, where_sql: str, batch_size: int = 5000) -> int:
+    """
+    UPDATE paczkami po `batch_size` wierszy (każda paczka to osobna, krótka transakcja w autocommit),
+    zamiast jednego UPDATE-a, który blokuje całą tabelę. Zwraca liczbę zmienionych wierszy.
+    """
+    total = 0
+    while True:
+        result = conn.execute(text(f"""
+            UPDATE {table} SET {set_sql}
+            WHERE id IN (SELECT id FROM {table} WHERE {where_sql} LIMIT :batch)
+        """), {"batch": batch_size})
+        if result.rowcount == 0:
+            break
+        total += result.rowcount
+        print(f"   {table}: uzupełniono {total} wierszy...")
+    return total
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, Boolean, Date, ForeignKey, Float, Text, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, Date, ForeignKey, Float, Text, DateTime, Index
 from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import JSONB 
+from sqlalchemy.dialects.postgresql import JSONB, ARRAY
 from sqlalchemy.sql import func
 from database import Base
 
@@ -38,7 +38,7 @@ class Project(Base):
     # NOWE: Domyślny czas Pomodoro dla tego projektu (np. 30 min)
     default_duration = Column(Integer, default=25) 
     
-    owner_id = Column(Integer, ForeignKey("users.id"))
+    owner_id = Column(Integer, ForeignKey("users.id"), index=True)
     
     owner = relationship("User", back_populates="projects")
     tasks = relationship("Task", back_populates="project")
@@ -46,10 +46,23 @@ class Project(Base):
     # NOWE: Relacja do sesji pomodoro
     pomodoros = relationship("PomodoroSession", back_populates="project")
 
+# Zagregowana aktywność projektu (Momentum) - utrzymywana przy zapisie w crud.py,
+# żeby /api/projects nie musiało mielić całej historii zadań i pomodoro przy każdym odczycie.
+class ProjectActivity(Base):
+    __tablename__ = "project_activity"
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    task_count = Column(Integer, nullable=False, default=0)
+    completed_count = Column(Integer, nullable=False, default=0)
+    last_task_completed_at = Column(DateTime, nullable=True)
+    pomodoro_count = Column(Integer, nullable=False, default=0)
+    pomodoro_minutes = Column(Integer, nullable=False, default=0)
+    last_pomodoro_date = Column(Date, nullable=True)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
 class ProjectContext(Base):
     __tablename__ = "project_contexts"
     id = Column(Integer, primary_key=True, index=True)
-    project_id = Column(Integer, ForeignKey("projects.id"))
+    project_id = Column(Integer, ForeignKey("projects.id"), index=True)
     master_prompt = Column(Text, nullable=True)
     project = relationship("Project", back_populates="context")
 
@@ -61,6 +74,7 @@ class Task(Base):
     is_completed = Column(Boolean, default=False)
     task_date = Column(Date, nullable=True, index=True)
     points = Column(Integer, default=10)
+    priority = Column(String, nullable=False, default="medium", server_default="medium") # NOT NULL od migracji 0009
     order = Column(Integer, default=0)
     # Dodajemy timestamp ukończenia, żeby liczyć "Momentum" (kiedy ostatnio coś zrobiłeś)
     completed_at = Column(DateTime, nullable=True) 
@@ -71,6 +85,14 @@ class Task(Base):
     owner = relationship("User", back_populates="tasks")
     project = relationship("Project", back_populates="tasks")
 
+    # Indeksy pod gorące zapytania (na istniejących bazach zakłada je migracja 0004)
+    __table_args__ = (
+        Index("ix_tasks_owner_date_order", "owner_id", "task_date", "order"),
+        Index("ix_tasks_project_completed", "project_id", "is_completed", "completed_at"),
+        # Inbox (task_date IS NULL) - osobny, mały indeks częściowy
+        Index("ix_tasks_owner_inbox_order", "owner_id", "order", postgresql_where=task_date.is_(None)),
+    )
+
 # --- ZDROWIE ---
 class DailyHealth(Base):
     __tablename__ = "daily_health"
@@ -84,6 +106,8 @@ class DailyHealth(Base):
     note = Column(Text, nullable=True)
     owner = relationship("User", back_populates="daily_health")
 
+    __table_args__ = (Index("ix_daily_health_user_date", "user_id", "date"),)
+
 # --- POMODORO ---
 class PomodoroSession(Base):
     __tablename__ = "pomodoro_sessions"
@@ -94,11 +118,13 @@ class PomodoroSession(Base):
     tag = Column(String, default="work")
     
     # NOWE: Przypisanie sesji do projektu
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=True, index=True)
     
     owner = relationship("User", back_populates="pomodoros")
     project = relationship("Project", back_populates="pomodoros")
 
+    __table_args__ = (Index("ix_pomodoro_sessions_user_date", "user_id", "date"),)
+
 # --- PODSUMOWANIA ---
 class DailySummary(Base):
     __tablename__ = "daily_summaries"
@@ -109,10 +135,12 @@ class DailySummary(Base):
     metrics = Column(JSONB)
     owner = relationship("User", back_populates="daily_summaries")
 
+    __table_args__ = (Index("ix_daily_summaries_user_date", "user_id", "date"),)
+
 class WeeklyReport(Base):
     __tablename__ = "weekly_reports"
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     start_date = Column(Date, nullable=False)
     end_date = Column(Date, nullable=False)
     ai_summary = Column(Text) 
@@ -138,17 +166,29 @@ class WorkoutSession(Base):
     exercises = relationship("ExerciseLog", back_populates="session", cascade="all, delete-orphan")
     owner = relationship("User", back_populates="workouts")
 
+    __table_args__ = (Index("ix_workout_sessions_user_date", "user_id", "date"),)
+
+# Dzienny rollup objętości treningowej usera - utrzymywany przy zapisie/usunięciu treningu w crud.py,
+# żeby wykres /api/gym/analytics/volume nie sumował wszystkich logów ćwiczeń przy każdym odczycie.
+class WorkoutVolumeDaily(Base):
+    __tablename__ = "workout_volume_daily"
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    date = Column(Date, primary_key=True)
+    volume = Column(Float, nullable=False, default=0.0)     # Suma volume_load ze wszystkich treningów dnia
+    sessions = Column(Integer, nullable=False, default=0)   # Liczba treningów dnia
+
 # Tabela Logów Ćwiczeń (Konkretne serie)
 class ExerciseLog(Base):
     __tablename__ = "exercise_logs"
     id = Column(Integer, primary_key=True, index=True)
-    session_id = Column(Integer, ForeignKey("workout_sessions.id"))
+    session_id = Column(Integer, ForeignKey("workout_sessions.id"), index=True)
     
     exercise_name = Column(String, nullable=False) # Np. "Bench Press"
     sets = Column(Integer, default=3)
     reps = Column(String, default="10") # String, bo czasem wpisujesz "12,10,8"
+    set_reps = Column(ARRAY(Integer), nullable=True) # Powtórzenia per seria z `reps`, np. [12, 10, 8] (crud.parse_set_reps)
     weight = Column(Float, default=0.0) # Największy ciężar w serii roboczej
-    volume_load = Column(Float, default=0.0) # sets * reps * weight (liczone przez backend/front)
+    volume_load = Column(Float, default=0.0) # sum(set_reps) * weight (liczone przez backend)
     
     session = relationship("WorkoutSession", back_populates="exercises")
 
@@ -176,7 +216,7 @@ class ExerciseLibrary(Base):
 class WorkoutPlan(Base):
     __tablename__ = "workout_plans"
     id = Column(Integer, primary_key=True, index=True)
-    owner_id = Column(Integer, ForeignKey("users.id"))
+    owner_id = Column(Integer, ForeignKey("users.id"), index=True)
     name = Column(String, nullable=False) # Np. "Push A"
     description = Column(String, nullable=True)
     color = Column(String, default="#12d3b9")
@@ -188,4 +228,19 @@ class WorkoutPlan(Base):
     owner = relationship("User", back_populates="workout_plans")
 
 # Pamiętaj dodać relację w klasie User na górze pliku:
-# workout_plans = relationship("WorkoutPlan", back_populates="owner")
\ No newline at end of file
+# workout_plans = relationship("WorkoutPlan", back_populates="owner")
+# 3. ZADANIE REINDEKSACJI RAG (checkpoint, żeby dało się wznowić po awarii)
+class RagReindexJob(Base):
+    __tablename__ = "rag_reindex_jobs"
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    status = Column(String, nullable=False, default="pending") # pending / running / done / failed
+    source = Column(String, nullable=False, default="tasks")   # Aktualnie przetwarzane źródło: tasks / health / workouts
+    last_id = Column(Integer, nullable=False, default=0)       # Checkpoint: ostatnie przetworzone ID w źródle (keyset)
+    scanned = Column(Integer, nullable=False, default=0)
+    indexed = Column(Integer, nullable=False, default=0)
+    skipped = Column(Integer, nullable=False, default=0)       # Treść bez zmian (ten sam content_hash)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, server_default=func.now())
+    heartbeat_at = Column(DateTime, nullable=True)             # Odświeżane przy każdym checkpoincie
+    finished_at = Column(DateTime, nullable=True)
@@ -0,0 +1,230 @@
+# G:\MotivAItor\aijournal-backend\plan_audit.py
+# Audyt planów zapytań CRUD na dużym zbiorze danych.
+# Seeduje userów, projekty, zadania, zdrowie, pomodoro i treningi, odpala PRAWDZIWE funkcje z crud.py,
+# łapie każdy SELECT, który wygenerowały, i puszcza go przez EXPLAIN (ANALYZE, BUFFERS).
+#
+#   python plan_audit.py                            -> 1 000 000 zadań / 1000 userów, wszystko wycofane na końcu
+#   python plan_audit.py --tasks 200000 --users 200
+#   python plan_audit.py --keep                     -> dane zostają + VACUUM ANALYZE (realne index-only scany).
+#                                                      TYLKO na osobnej bazie do testów!
+#
+# Seq Scan albo Sort na dużej tabeli = brakujący indeks -> kod wyjścia 1 (nadaje się do CI).
+# Schemat musi być aktualny (python migrate.py).
+import json
+import sys
+import time
+from datetime import date, timedelta
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from database import engine
+import crud
+import schemas
+
+BIG_TABLES = {
+    "tasks", "projects", "project_activity", "daily_health",
+    "pomodoro_sessions", "workout_sessions", "exercise_logs", "workout_volume_daily"
+}
+PROJECTS_PER_USER = 5
+
+def _int_arg(name: str, default: int) -> int:
+    if name in sys.argv:
+        return int(sys.argv[sys.argv.index(name) + 1])
+    return default
+
+# --- SEED ---
+
+def seed(conn, users: int, tasks: int) -> list[int]:
+    """Wrzuca dane hurtowo (INSERT ... SELECT generate_series). Zwraca ID userów (pierwszy = audytowany)."""
+    started = time.time()
+    run = int(started)
+    user_ids = [row[0] for row in conn.execute(text("""
+        INSERT INTO users (email, hashed_password)
+        SELECT 'audit_' || :run || '_' || g || '@plan-audit.local', 'x' FROM generate_series(1, :users) g
+        RETURNING id
+    """), {"run": run, "users": users})]
+    user_ids.sort()
+
+    project_ids = [row[0] for row in conn.execute(text("""
+        INSERT INTO projects (name, color, default_duration, owner_id)
+        SELECT 'Projekt ' || p, '#12d3b9', 25, u
+        FROM unnest(CAST(:user_ids AS integer[])) u, generate_series(1, :per_user) p
+        ORDER BY u, p
+        RETURNING id, owner_id
+    """), {"user_ids": user_ids, "per_user": PROJECTS_PER_USER}).fetchall()]
+    project_ids.sort()
+    print(f"🌱 {users} userów, {len(project_ids)} projektów")
+
+    # Zadania: rozłożone po userach i ostatnim roku, co 10. w inboxie, co 2. ukończone, co 3. bez projektu
+    conn.execute(text("""
+        INSERT INTO tasks (content, is_completed, task_date, points, priority, "order", completed_at, owner_id, project_id)
+        SELECT 'Zadanie ' || g,
+               g % 2 = 0,
+               CASE WHEN g % 10 = 0 THEN NULL ELSE CURRENT_DATE - (g % 365) END,
+               10, 'medium', g / :users,
+               CASE WHEN g % 2 = 0 THEN now() - (g % 365) * interval '1 day' END,
+               (CAST(:user_ids AS integer[]))[1 + g % :users],
+               CASE WHEN g % 3 = 0 THEN NULL
+                    ELSE (CAST(:project_ids AS integer[]))[1 + (g % :users) * :per_user + (g / :users) % :per_user] END
+        FROM generate_series(1, :tasks) g
+    """), {"users": users, "tasks": tasks, "user_ids": user_ids, "project_ids": project_ids, "per_user": PROJECTS_PER_USER})
+    print(f"🌱 {tasks} zadań")
+
+    params = {"user_ids": user_ids}
+    conn.execute(text("""
+        INSERT INTO daily_health (user_id, date, sleep_hours, weight, calories, mood_score)
+        SELECT u, CURRENT_DATE - d, 7.0, 80.0, 2000, 6
+        FROM unnest(CAST(:user_ids AS integer[])) u, generate_series(0, 364) d
+    """), params)
+    conn.execute(text("""
+        INSERT INTO pomodoro_sessions (user_id, date, duration, tag, project_id)
+        SELECT p.owner_id, CURRENT_DATE - d, 25, 'work', p.id
+        FROM projects p, generate_series(0, 59) d
+        WHERE p.owner_id = ANY(CAST(:user_ids AS integer[]))
+    """), params)
+    conn.execute(text("""
+        INSERT INTO workout_sessions (user_id, date, name, duration_minutes)
+        SELECT u, CURRENT_DATE - d * 3, 'Push A', 60
+        FROM unnest(CAST(:user_ids AS integer[])) u, generate_series(0, 99) d
+    """), params)
+    conn.execute(text("""
+        INSERT INTO exercise_logs (session_id, exercise_name, sets, reps, weight, volume_load)
+        SELECT w.id, e, 3, '10', 60.0, 1800.0
+        FROM workout_sessions w, unnest(ARRAY['Bench Press', 'Squat', 'Deadlift']) e
+        WHERE w.user_id = ANY(CAST(:user_ids AS integer[]))
+    """), params)
+    print("🌱 zdrowie, pomodoro, treningi")
+
+    db = Session(bind=conn, autoflush=False, join_transaction_mode="create_savepoint")
+    crud.rebuild_project_activity(db)
+    crud.rebuild_workout_volume(db)
+    db.close()
+
+    print(f"✅ Seed gotowy w {time.time() - started:.1f}s")
+    return user_ids
+
+# --- AUDYT ---
+
+def _cases(user_id: int, task_id: int):
+    day = date.today() - timedelta(days=1)
+    return [
+        ("get_tasks_by_date", lambda db: crud.get_tasks_by_date(db, user_id, day)),
+        ("get_inbox_tasks", lambda db: crud.get_inbox_tasks(db, user_id)),
+        ("get_projects_with_stats", lambda db: crud.get_projects_with_stats(db, user_id)),
+        ("get_task_by_id", lambda db: crud.get_task_by_id(db, task_id, user_id)),
+        ("_last_order (dzień)", lambda db: crud._last_order(db, user_id, day)),
+        ("_last_order (inbox)", lambda db: crud._last_order(db, user_id, None)),
+        ("get_volume_series (dzień, 30 dni)", lambda db: crud.get_volume_series(db, user_id, day - timedelta(days=30), day)),
+        ("get_volume_totals", lambda db: crud.get_volume_totals(db, user_id, day - timedelta(days=14))),
+        ("create_user_task", lambda db: crud.create_user_task(db, schemas.TaskCreate(content="audit", task_date=day), user_id)),
+        ("create_tasks_bulk", lambda db: crud.create_tasks_bulk(
+            db, [schemas.TaskCreate(content=f"audit {i}", task_date=day) for i in range(30)], user_id)),
+    ]
+
+def _walk(node, found):
+    found.append(node)
+    for child in node.get("Plans", []):
+        _walk(child, found)
+    return found
+
+def _describe(node) -> str:
+    label = node["Node Type"]
+    if node.get("Index Name"):
+        label += f" using {node['Index Name']}"
+    if node.get("Relation Name"):
+        label += f" on {node['Relation Name']}"
+    label += f" (rows={node.get('Actual Rows')}"
+    if "Heap Fetches" in node:
+        label += f", heap fetches={node['Heap Fetches']}"
+    return label + ")"
+
+def _problems(nodes) -> list[str]:
+    problems = []
+    for node in nodes:
+        if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in BIG_TABLES:
+            problems.append(f"Seq Scan na {node['Relation Name']}")
+        if node["Node Type"] in ("Sort", "Incremental Sort"):
+            scanned = {n.get("Relation Name") for n in _walk(node, []) if n.get("Relation Name")}
+            if scanned & BIG_TABLES:
+                problems.append(f"Sort nad {', '.join(sorted(scanned & BIG_TABLES))} (indeks nie daje kolejności)")
+    return problems
+
+def audit(conn, user_id: int) -> int:
+    task_id = conn.execute(text("SELECT id FROM tasks WHERE owner_id = :u LIMIT 1"), {"u": user_id}).scalar()
+    captured = []
+    explaining = False
+
+    def capture(conn_, cursor, statement, parameters, context, executemany):
+        if not explaining and statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            captured.append((statement, parameters))
+
+    event.listen(conn, "before_cursor_execute", capture)
+    total_problems = 0
+    try:
+        for name, run in _cases(user_id, task_id):
+            captured.clear()
+            db = Session(bind=conn, autoflush=False, join_transaction_mode="create_savepoint")
+            run(db)
+            db.close()
+
+            if not captured:
+                print(f"\n▶ {name}: brak SELECT-ów (same zapisy)")
+                continue
+            for statement, parameters in list(captured):
+                explaining = True
+                try:
+                    plan = conn.exec_driver_sql(
+                        "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + statement, parameters
+                    ).scalar()
+                finally:
+                    explaining = False
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                root = plan[0]["Plan"]
+                nodes = _walk(root, [])
+                problems = _problems(nodes)
+                total_problems += len(problems)
+
+                print(f"\n▶ {name}  {plan[0]['Execution Time']:.2f} ms  "
+                      f"bufory: hit={root.get('Shared Hit Blocks', 0)} read={root.get('Shared Read Blocks', 0)}")
+                for node in nodes:
+                    print(f"   {_describe(node)}")
+                print(f"   SQL: {' '.join(statement.split())[:160]}")
+                for problem in problems:
+                    print(f"   ⚠️ {problem}")
+    finally:
+        event.remove(conn, "before_cursor_execute", capture)
+    return total_problems
+
+def main():
+    users = _int_arg("--users", 1000)
+    tasks = _int_arg("--tasks", 1_000_000)
+    keep = "--keep" in sys.argv
+
+    with engine.connect() as conn:
+        trans = conn.begin()
+        try:
+            user_ids = seed(conn, users, tasks)
+            if keep:
+                trans.commit()
+                # VACUUM ustawia visibility map - bez tego index-only scan i tak zagląda do tabeli
+                with engine.connect() as maintenance:
+                    maintenance = maintenance.execution_options(isolation_level="AUTOCOMMIT")
+                    for table in sorted(BIG_TABLES):
+                        maintenance.execute(text(f"VACUUM ANALYZE {table}"))
+                trans = conn.begin()
+            else:
+                for table in sorted(BIG_TABLES):
+                    conn.execute(text(f"ANALYZE {table}"))
+
+            problems = audit(conn, user_ids[0])
+        finally:
+            # Zapisy z audytu (create_user_task, create_tasks_bulk), a bez --keep także cały seed, znikają
+            trans.rollback()
+
+    if problems:
+        print(f"\n❌ Znaleziono {problems} problemów w planach.")
+        sys.exit(1)
+    print("\n✅ Wszystkie zapytania idą po indeksach.")
+
+if __name__ == "__main__":
+    main()
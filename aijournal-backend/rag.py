@@ -1,62 +1,521 @@
 import chromadb
 from chromadb.utils import embedding_functions
+import hashlib
+import json
 import os
+import threading
+import time
+import requests
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+import rag_lexical
 
-# 1. Konfiguracja ChromaDB
-chroma_client = chromadb.PersistentClient(path="./chroma_db")
+# --- KONFIGURACJA (z .env) ---
+RAG_CHROMA_PATH = os.getenv("RAG_CHROMA_PATH", "./chroma_db")
+RAG_MODEL_NAME = os.getenv("RAG_MODEL_NAME", "all-MiniLM-L6-v2")
+# Jeśli ustawione (np. http://localhost:8090), embeddingi liczy jeden wspólny proces
+# (embedder_server.py) zamiast osobnej kopii modelu w każdym workerze uvicorna.
+RAG_EMBEDDER_URL = os.getenv("RAG_EMBEDDER_URL")
 
-# 2. Model Embeddings
-sentence_transformer_ef = embedding_functions.SentenceTransformerEmbeddingFunction(model_name="all-MiniLM-L6-v2")
+# Partycjonowanie indeksu (routing siedzi w add_documents/search_documents):
+#   none - jedna kolekcja "knowledge_base" dla wszystkich (filtr po user_id w metadanych)
+#   user - osobna kolekcja (osobny graf HNSW) na każdego użytkownika
+#   hash - RAG_SHARDS kolekcji, user trafia do shardu user_id % RAG_SHARDS
+# Zmiana na działającej bazie: najpierw python migrate_rag_partitions.py
+RAG_PARTITIONING = os.getenv("RAG_PARTITIONING", "none")
+RAG_SHARDS = int(os.getenv("RAG_SHARDS", 16))
+BASE_COLLECTION = "knowledge_base"
 
-# 3. Kolekcja
-collection = chroma_client.get_or_create_collection(
-    name="knowledge_base",
-    embedding_function=sentence_transformer_ef
-)
+# Kubełki czasowe: RAG_TIME_BUCKETS=month dzieli każdą partycję na kolekcje miesięczne
+# (knowledge_base_user_7_m202405, ...), wpisy bez daty (inbox) idą do "<partycja>_undated".
+# Zapytanie o "ostatnie 30 dni" dotyka wtedy 1-2 małych kolekcji zamiast całej historii.
+# Położenie dokumentu (user + data) pamięta katalog w rag_lexical - stąd wiemy, skąd usuwać.
+# Zmiana na działającej bazie: najpierw python migrate_rag_partitions.py
+RAG_TIME_BUCKETS = os.getenv("RAG_TIME_BUCKETS", "none")
+# Domyślne okno dla promptów, które patrzą tylko na ostatnie tygodnie (roast)
+RAG_RECENT_DAYS = int(os.getenv("RAG_RECENT_DAYS", 30))
 
-def add_document(doc_id: str, text: str, metadata: dict, user_id: int):
+# Tryb wyszukiwania (domyślny dla search_documents):
+#   vector  - tylko Chroma (embeddingi MiniLM)
+#   lexical - tylko BM25 z rag_lexical (bez modelu)
+#   hybrid  - oba, połączone przez Reciprocal Rank Fusion; dokładne trafienie
+#             leksykalne (wszystkie słowa zapytania) pomija zapytanie wektorowe
+RAG_SEARCH_MODE = os.getenv("RAG_SEARCH_MODE", "hybrid")
+RAG_RRF_K = int(os.getenv("RAG_RRF_K", 60))
+RAG_CANDIDATES = int(os.getenv("RAG_CANDIDATES", 10)) # Ilu kandydatów bierzemy z każdej listy przed fuzją
+
+# Cache embeddingów zapytań (LRU po znormalizowanym tekście) - powtórzone pytanie nie odpala modelu
+RAG_QUERY_CACHE_SIZE = int(os.getenv("RAG_QUERY_CACHE_SIZE", 512))
+# Stałe zapytania z kodu - ich embeddingi liczymy raz, zaraz po załadowaniu modelu
+CANNED_QUERIES = {
+    "roast": "wymówki lenistwo problemy",
+}
+
+class RemoteEmbeddingFunction(chromadb.EmbeddingFunction):
+    """Embeddingi liczone przez wspólny proces embedder_server.py (HTTP, keep-alive)."""
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.session = requests.Session()
+
+    def __call__(self, input):
+        res = self.session.post(f"{self.url}/embed", json={"texts": list(input)}, timeout=60)
+        res.raise_for_status()
+        return res.json()["embeddings"]
+
+# --- LENIWA INICJALIZACJA ---
+# Model i klient Chroma ładują się przy pierwszym użyciu (albo w warm_up()),
+# a nie przy imporcie modułu - import rag jest teraz darmowy.
+_client = None
+_embedder = None
+_collections = {} # nazwa kolekcji -> obiekt Chroma
+_init_lock = threading.Lock()
+_state = {"status": "cold", "error": None, "load_seconds": None}
+_query_cache = OrderedDict() # znormalizowane zapytanie -> embedding
+_query_cache_lock = threading.Lock()
+_query_stats = {"hits": 0, "misses": 0}
+_search_stats = {"vector": 0, "lexical": 0, "hybrid": 0, "short_circuit": 0}
+
+def _make_embedding_function():
+    if RAG_EMBEDDER_URL:
+        return RemoteEmbeddingFunction(RAG_EMBEDDER_URL)
+    return embedding_functions.SentenceTransformerEmbeddingFunction(model_name=RAG_MODEL_NAME)
+
+def _normalize_query(text: str) -> str:
+    return " ".join((text or "").split()).casefold()
+
+def _as_list(vector) -> list[float]:
+    # SentenceTransformer zwraca numpy, embedder_server zwykłe listy
+    return vector.tolist() if hasattr(vector, "tolist") else list(vector)
+
+def embed_query(text: str):
+    """Embedding zapytania z cache LRU. Trafienie = bez forward passa modelu."""
+    key = _normalize_query(text)
+    with _query_cache_lock:
+        vector = _query_cache.get(key)
+        if vector is not None:
+            _query_cache.move_to_end(key)
+            _query_stats["hits"] += 1
+            return vector
+        _query_stats["misses"] += 1
+
+    _init()
+    vector = _as_list(_embedder([text])[0])
+    with _query_cache_lock:
+        _query_cache[key] = vector
+        _query_cache.move_to_end(key)
+        while len(_query_cache) > RAG_QUERY_CACHE_SIZE:
+            _query_cache.popitem(last=False)
+    return vector
+
+def precompute_queries(queries=None):
+    """Wylicza z góry embeddingi stałych zapytań (CANNED_QUERIES). Wołane po załadowaniu modelu."""
+    texts = list(queries if queries is not None else CANNED_QUERIES.values())
+    if not texts:
+        return
+    try:
+        vectors = _embedder(texts)
+    except Exception as e:
+        # Nie blokujemy startu - policzy się przy pierwszym zapytaniu
+        print(f"[RAG] Nie udało się przeliczyć stałych zapytań: {e}")
+        return
+    with _query_cache_lock:
+        for text, vector in zip(texts, vectors):
+            _query_cache[_normalize_query(text)] = _as_list(vector)
+
+def query_cache_stats() -> dict:
+    total = _query_stats["hits"] + _query_stats["misses"]
+    return {
+        **_query_stats,
+        "hit_rate": round(_query_stats["hits"] / total, 3) if total else 0.0,
+        "size": len(_query_cache),
+        "max_size": RAG_QUERY_CACHE_SIZE
+    }
+
+def parse_date(value):
+    """date / datetime / "YYYY-MM-DD" -> date albo None (np. "inbox")."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+def date_ord(value):
+    """Data jako liczba YYYYMMDD - Chroma umie $gte/$lte tylko na liczbach."""
+    day = parse_date(value)
+    return day.year * 10000 + day.month * 100 + day.day if day else None
+
+def collection_name(user_id, day=None) -> str:
+    """Do której kolekcji trafia dokument użytkownika (z datą `day`, jeśli są kubełki czasowe)."""
+    base = partition_name(user_id)
+    if RAG_TIME_BUCKETS != "month":
+        return base
+    day = parse_date(day)
+    return f"{base}_m{day:%Y%m}" if day else f"{base}_undated"
+
+def partition_name(user_id) -> str:
+    """Partycja użytkownika (bez kubełków czasowych)."""
+    if RAG_PARTITIONING == "user":
+        return f"{BASE_COLLECTION}_user_{int(user_id)}"
+    if RAG_PARTITIONING == "hash":
+        return f"{BASE_COLLECTION}_shard_{int(user_id) % RAG_SHARDS:03d}"
+    return BASE_COLLECTION
+
+def _init():
+    global _client, _embedder
+    if _client is not None:
+        return
+
+    with _init_lock:
+        if _client is None:
+            _state["status"] = "loading"
+            started = time.time()
+            try:
+                # 1. Model Embeddings
+                _embedder = _make_embedding_function()
+
+                # 2. Konfiguracja ChromaDB
+                _client = chromadb.PersistentClient(path=RAG_CHROMA_PATH)
+            except Exception as e:
+                _state["status"] = "error"
+                _state["error"] = repr(e)
+                raise
+            _state["status"] = "ready"
+            _state["error"] = None
+            _state["load_seconds"] = round(time.time() - started, 3)
+            precompute_queries()
+            print(f"[RAG] Gotowy w {_state['load_seconds']}s (embedder: {RAG_EMBEDDER_URL or RAG_MODEL_NAME}, partycje: {RAG_PARTITIONING})")
+
+def get_collection(name: str = BASE_COLLECTION, create: bool = True):
     """
-    Dodaje wpis z przypisanym ID użytkownika (user_id).
+    3. Kolekcja (z cache). create=True (zapis) zakłada ją przy pierwszym użyciu;
+    create=False (odczyt) zwraca None, gdy jej nie ma - wyszukiwanie nie tworzy pustych kolekcji na dysku.
     """
-    if not text:
-        return
+    collection = _collections.get(name)
+    if collection is not None:
+        return collection
 
-    # Dodajemy user_id do metadanych (jako string, bo Chroma tak woli)
-    full_metadata = metadata.copy()
-    full_metadata["user_id"] = str(user_id) 
+    _init()
+    with _init_lock:
+        if name not in _collections:
+            if create:
+                _collections[name] = _client.get_or_create_collection(
+                    name=name,
+                    embedding_function=_embedder
+                )
+            else:
+                try:
+                    _collections[name] = _client.get_collection(name=name, embedding_function=_embedder)
+                except Exception: # Chroma < 0.6: ValueError, nowsza: NotFoundError
+                    return None
+    return _collections[name]
+
+def drop_collection(name: str):
+    """Usuwa całą kolekcję (np. starą wspólną po migracji na partycje)."""
+    _init()
+    _client.delete_collection(name)
+    _collections.pop(name, None)
 
-    collection.upsert(
-        ids=[doc_id],
-        documents=[text],
-        metadatas=[full_metadata]
-    )
-    print(f"[RAG] Zindeksowano dla User {user_id}: {doc_id}")
+def collection_for_user(user_id):
+    return get_collection(partition_name(user_id))
 
-def search_documents(query: str, user_id: int, n_results=3):
+def _months(low: date, high: date):
+    """(rok, miesiąc) od `low` do `high` włącznie."""
+    year, month = low.year, low.month
+    while (year, month) <= (high.year, high.month):
+        yield year, month
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+def search_collections(user_id, date_from: date = None, date_to: date = None) -> list[str]:
     """
-    Szuka wpisów TYLKO dla konkretnego użytkownika.
+    Kolekcje, które trzeba przeszukać dla usera w danym oknie czasowym (tylko pasujące kubełki).
+    Nazwy są wyliczane z okna (bez listowania klienta Chroma), a kubełki, w których user nic nie ma
+    według katalogu rag_lexical, są pomijane - koszt zależy od długości okna, nie od liczby kolekcji.
     """
+    base = partition_name(user_id)
+    if RAG_TIME_BUCKETS != "month":
+        return [base]
+
+    names = []
+    if date_from is None and date_to is None and rag_lexical.has_docs(user_id, undated=True):
+        # Wpisy bez daty nie należą do żadnego okna
+        names.append(f"{base}_undated")
+
+    low, high = parse_date(date_from), parse_date(date_to)
+    if low is None or high is None:
+        # Okno otwarte z którejś strony - domykamy je datami z katalogu
+        first, last = rag_lexical.date_bounds(user_id)
+        low = low or parse_date(first)
+        high = high or parse_date(last)
+    if low is None or high is None or low > high:
+        return names
+
+    for year, month in _months(low, high):
+        month_start = max(low, date(year, month, 1))
+        month_end = min(high, date(year + (month == 12), month % 12 + 1, 1) - timedelta(days=1))
+        if rag_lexical.has_docs(user_id, month_start.isoformat(), month_end.isoformat()):
+            names.append(f"{base}_m{year:04d}{month:02d}")
+    return names
+
+def _locate(doc_ids: list[str]) -> dict:
+    """{kolekcja: [doc_id, ...]} wg katalogu rag_lexical. Dokumenty spoza katalogu są pomijane."""
+    by_collection = {}
+    for doc_id, (user_id, day) in rag_lexical.locate(doc_ids).items():
+        by_collection.setdefault(collection_name(user_id, day), []).append(doc_id)
+    return by_collection
+
+def list_collections() -> list[str]:
+    """Wszystkie kolekcje bazy wiedzy (każda partycja + ewentualnie stara wspólna)."""
+    _init()
+    # Chroma < 0.6 zwraca obiekty, nowsza same nazwy
+    names = [c if isinstance(c, str) else c.name for c in _client.list_collections()]
+    return [n for n in names if n == BASE_COLLECTION or n.startswith(f"{BASE_COLLECTION}_")]
+
+def warm_up():
+    """Opcjonalne rozgrzanie przy starcie (lifespan): ładuje klienta, model i robi jeden embedding."""
     try:
+        _init()
+        _embedder(["warm-up"])
+    except Exception as e:
+        print(f"[RAG] Warm-up nieudany: {e}")
+
+def status() -> dict:
+    """Stan modelu dla endpointu gotowości."""
+    return {
+        **_state,
+        "embedder": "remote" if RAG_EMBEDDER_URL else "local",
+        "model": RAG_EMBEDDER_URL or RAG_MODEL_NAME,
+        "partitioning": RAG_PARTITIONING,
+        "time_buckets": RAG_TIME_BUCKETS,
+        "query_cache": query_cache_stats(),
+        "search_mode": RAG_SEARCH_MODE,
+        "searches": dict(_search_stats)
+    }
+
+# Ile dokumentów naraz idzie przez model embeddingów i do jednego upserta w Chroma
+RAG_BATCH_SIZE = int(os.getenv("RAG_BATCH_SIZE", 64))
+
+def content_hash(doc: dict) -> str:
+    """Odcisk treści dokumentu (tekst + metadane). Ten sam hash = nie trzeba liczyć embeddingu od nowa."""
+    raw = json.dumps([doc.get("text"), doc.get("metadata") or {}], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+def _full_metadata(doc: dict) -> dict:
+    # Dodajemy user_id do metadanych (jako string, bo Chroma tak woli)
+    full_metadata = (doc.get("metadata") or {}).copy()
+    full_metadata["user_id"] = str(doc["user_id"])
+    full_metadata["content_hash"] = content_hash(doc)
+    ordinal = date_ord(full_metadata.get("date"))
+    if ordinal is not None:
+        full_metadata["date_ord"] = ordinal
+    return full_metadata
+
+def get_hashes(doc_ids: list[str], user_id: int) -> dict:
+    """Zwraca {doc_id: content_hash} dla dokumentów usera, które już są w indeksie."""
+    if not doc_ids:
+        return {}
+    if RAG_TIME_BUCKETS == "month":
+        by_collection = _locate(doc_ids)
+    else:
+        by_collection = {partition_name(user_id): doc_ids}
+
+    hashes = {}
+    for name, ids in by_collection.items():
+        collection = get_collection(name, create=False)
+        if collection is None:
+            continue
+        existing = collection.get(ids=ids, include=["metadatas"])
+        for doc_id, meta in zip(existing["ids"], existing["metadatas"]):
+            hashes[doc_id] = (meta or {}).get("content_hash")
+    return hashes
+
+def add_documents(batch: list[dict], batch_size: int = RAG_BATCH_SIZE) -> int:
+    """
+    Hurtowe dodawanie wpisów. Każdy element: {"doc_id", "text", "metadata", "user_id"}.
+    Embeddingi liczone są paczkami po `batch_size` (jeden forward pass modelu na paczkę),
+    a każda paczka to jeden upsert w Chroma. Zwraca liczbę zindeksowanych dokumentów.
+    """
+    # Puste teksty pomijamy, a przy powtórzonym ID wygrywa ostatnia wersja
+    # (Chroma nie przyjmie duplikatów ID w jednym upsercie).
+    unique = {}
+    for doc in batch:
+        if doc.get("text"):
+            unique[doc["doc_id"]] = doc
+    docs = list(unique.values())
+
+    # Routing: każda partycja dostaje swoje paczki
+    by_collection = {}
+    for doc in docs:
+        name = collection_name(doc["user_id"], (doc.get("metadata") or {}).get("date"))
+        by_collection.setdefault(name, []).append(doc)
+
+    if RAG_TIME_BUCKETS == "month" and docs:
+        # Zmiana daty (np. zadanie przesunięte na inny miesiąc) = przeprowadzka do innego kubełka
+        target = {doc["doc_id"]: name for name, part in by_collection.items() for doc in part}
+        for name, ids in _locate(list(target)).items():
+            moved = [doc_id for doc_id in ids if target[doc_id] != name]
+            source = get_collection(name, create=False) if moved else None
+            if source is not None:
+                source.delete(ids=moved)
+
+    for name, part in by_collection.items():
+        collection = get_collection(name)
+        for i in range(0, len(part), batch_size):
+            chunk = part[i:i + batch_size]
+            collection.upsert(
+                ids=[d["doc_id"] for d in chunk],
+                documents=[d["text"] for d in chunk],
+                metadatas=[_full_metadata(d) for d in chunk]
+            )
+
+    # Indeks leksykalny idzie w parze z Chroma (ten sam zestaw dokumentów)
+    rag_lexical.upsert_documents(docs)
+
+    if docs:
+        print(f"[RAG] Zindeksowano {len(docs)} dokumentów (paczki po {batch_size})")
+    return len(docs)
+
+def delete_documents(doc_ids: list[str], user_id: int = None, collection: str = None) -> int:
+    """
+    Usuwa wpisy z indeksu (np. po skasowaniu zadania/treningu w SQL).
+    Partycję wskazuje user_id albo wprost nazwa kolekcji (GC).
+    """
+    doc_ids = list(dict.fromkeys(doc_ids))
+    if not doc_ids:
+        return 0
+    if collection:
+        by_collection = {collection: doc_ids}
+    elif RAG_TIME_BUCKETS == "month":
+        by_collection = _locate(doc_ids)
+    else:
+        by_collection = {partition_name(user_id): doc_ids}
+    for name, ids in by_collection.items():
+        collection = get_collection(name, create=False)
+        if collection is not None:
+            collection.delete(ids=ids)
+    rag_lexical.delete_documents(doc_ids)
+    print(f"[RAG] Usunięto {len(doc_ids)} dokumentów z indeksu")
+    return len(doc_ids)
+
+def iter_ids(page_size: int = 1000):
+    """Przechodzi po wszystkich ID we wszystkich partycjach paczkami: (nazwa_kolekcji, [ids])."""
+    for name in list_collections():
+        collection = get_collection(name)
+        offset = 0
+        while True:
+            page = collection.get(limit=page_size, offset=offset, include=[])
+            if not page["ids"]:
+                break
+            yield name, page["ids"]
+            offset += len(page["ids"])
+
+def add_document(doc_id: str, text: str, metadata: dict, user_id: int):
+    """
+    Dodaje wpis z przypisanym ID użytkownika (user_id).
+    """
+    add_documents([{"doc_id": doc_id, "text": text, "metadata": metadata, "user_id": user_id}])
+
+def _vector_search(query: str, user_id: int, n_results: int, doc_types: list[str] = None,
+                   date_from: date = None, date_to: date = None) -> list[dict]:
+    # FILTR BEZPIECZEŃSTWA - To sprawia, że Piotr nie widzi danych Janka
+    filters = [{"user_id": str(user_id)}]
+    if doc_types:
+        filters.append({"type": {"$in": list(doc_types)}})
+    if date_from:
+        filters.append({"date_ord": {"$gte": date_ord(date_from)}})
+    if date_to:
+        filters.append({"date_ord": {"$lte": date_ord(date_to)}})
+    where = filters[0] if len(filters) == 1 else {"$and": filters}
+
+    embedding = embed_query(query)
+    hits = []
+    # Bez kubełków to jedna kolekcja; z kubełkami tylko miesiące z okna, wyniki łączymy po dystansie
+    for name in search_collections(user_id, date_from, date_to):
+        collection = get_collection(name, create=False)
+        if collection is None: # User jeszcze nic nie zapisał w tej partycji
+            continue
         results = collection.query(
-            query_texts=[query],
+            query_embeddings=[embedding],
             n_results=n_results,
-            # FILTR BEZPIECZEŃSTWA - To sprawia, że Piotr nie widzi danych Janka
-            where={"user_id": str(user_id)} 
+            where=where,
+            include=["documents", "metadatas", "distances"]
         )
-        
+        if not results["ids"]:
+            continue
+        for doc_id, doc, meta, distance in zip(results["ids"][0], results["documents"][0], results["metadatas"][0], results["distances"][0]):
+            hits.append({"doc_id": doc_id, "text": doc, "type": meta.get("type"), "date": meta.get("date"), "distance": distance})
+    hits.sort(key=lambda hit: hit["distance"])
+    return hits[:n_results]
+
+def _rrf(rankings: list[list[dict]], k: int = RAG_RRF_K) -> list[dict]:
+    """Reciprocal Rank Fusion: score = suma 1 / (k + pozycja) po wszystkich listach."""
+    scores = {}
+    hits = {}
+    for ranking in rankings:
+        for rank, hit in enumerate(ranking, start=1):
+            scores[hit["doc_id"]] = scores.get(hit["doc_id"], 0.0) + 1.0 / (k + rank)
+            hits.setdefault(hit["doc_id"], hit)
+    return [hits[doc_id] for doc_id in sorted(scores, key=scores.get, reverse=True)]
+
+def retrieve(query: str, user_id: int, n_results: int = 3, mode: str = None, doc_types: list[str] = None,
+             date_from=None, date_to=None) -> list[dict]:
+    """
+    Surowe wyniki wyszukiwania: [{"doc_id", "text", "type", "date"}, ...], najlepsze pierwsze.
+    doc_types zawęża wyszukiwanie do typów dokumentów ("task", "health", "workout"),
+    date_from / date_to (date albo "YYYY-MM-DD", włącznie) do okna czasowego - wpisy bez daty odpadają.
+    """
+    mode = mode or RAG_SEARCH_MODE
+    date_from, date_to = parse_date(date_from), parse_date(date_to)
+    lexical_filters = {"doc_types": doc_types, "date_from": date_from, "date_to": date_to}
+    if mode == "vector":
+        _search_stats["vector"] += 1
+        return _vector_search(query, user_id, n_results, doc_types, date_from, date_to)
+    if mode == "lexical":
+        _search_stats["lexical"] += 1
+        return rag_lexical.search(query, user_id, limit=n_results, **lexical_filters)
+
+    _search_stats["hybrid"] += 1
+    # Tanie dokładne trafienie (wszystkie słowa, min. 2) wystarcza - bez modelu i bez Chroma
+    if len(rag_lexical.query_terms(query)) >= 2:
+        exact = rag_lexical.search(query, user_id, limit=n_results, match_all=True, **lexical_filters)
+        if len(exact) >= n_results:
+            _search_stats["short_circuit"] += 1
+            return exact
+
+    candidates = max(RAG_CANDIDATES, n_results)
+    lexical = rag_lexical.search(query, user_id, limit=candidates, **lexical_filters)
+    try:
+        vector = _vector_search(query, user_id, candidates, doc_types, date_from, date_to)
+    except Exception as e:
+        # Model/Chroma niedostępne - zostają same wyniki leksykalne
+        print(f"[RAG Error] Vector search failed, using lexical only: {e}")
+        vector = []
+    return _rrf([vector, lexical])[:n_results]
+
+def search_documents(query: str, user_id: int, n_results=3, mode: str = None, doc_types: list[str] = None,
+                     date_from=None, date_to=None):
+    """
+    Szuka wpisów TYLKO dla konkretnego użytkownika.
+    Zwraca gotowy kontekst do promptu. mode: vector | lexical | hybrid (domyślnie RAG_SEARCH_MODE),
+    filtry jak w retrieve().
+    """
+    try:
+        hits = retrieve(query, user_id, n_results=n_results, mode=mode, doc_types=doc_types,
+                        date_from=date_from, date_to=date_to)
+
         context_str = ""
-        if results['documents']:
-            documents = results['documents'][0]
-            metadatas = results['metadatas'][0]
-            
-            for i, doc in enumerate(documents):
-                meta = metadatas[i]
-                date = meta.get('date', 'N/A')
-                type_ = meta.get('type', 'info')
-                context_str += f"- [{date}] ({type_}): {doc}\n"
-                
+        for hit in hits:
+            date = hit.get('date') or 'N/A'
+            type_ = hit.get('type') or 'info'
+            context_str += f"- [{date}] ({type_}): {hit['text']}\n"
+
         return context_str if context_str else "Brak powiązanych informacji w bazie."
-        
+
     except Exception as e:
         print(f"[RAG Error] Search failed: {e}")
-        return ""
\ No newline at end of file
+        return ""
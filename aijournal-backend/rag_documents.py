@@ -0,0 +1,36 @@
+# G:\MotivAItor\aijournal-backend\rag_documents.py
+# Jedno miejsce, które zamienia wiersze z bazy na dokumenty RAG.
+# Używają go endpointy zapisujące (przez rag_queue) i reindeks - dzięki temu
+# ten sam wiersz zawsze daje ten sam tekst i ten sam content_hash.
+import models
+
+def task_document(task: models.Task) -> dict:
+    return {
+        "doc_id": f"task_{task.id}",
+        "text": task.content,
+        "metadata": {
+            "type": "task",
+            "date": str(task.task_date) if task.task_date else "inbox",
+            "project_id": str(task.project_id or "none")
+        },
+        "user_id": task.owner_id
+    }
+
+def health_document(health: models.DailyHealth) -> dict:
+    # AI musi pamiętać, że byłeś gruby/smutny danego dnia
+    return {
+        "doc_id": f"health_{health.id}",
+        "text": f"Dnia {health.date}: Waga {health.weight}kg, Sen {health.sleep_hours}h. Notatka: {health.note or ''}",
+        "metadata": {"type": "health", "date": str(health.date)},
+        "user_id": health.user_id
+    }
+
+def workout_document(workout: models.WorkoutSession) -> dict:
+    total_vol = sum([ex.volume_load or 0 for ex in workout.exercises])
+    exercise_summaries = [f"{ex.exercise_name}: {ex.sets}x{ex.reps} @ {ex.weight}kg" for ex in workout.exercises]
+    return {
+        "doc_id": f"workout_{workout.id}",
+        "text": f"Trening '{workout.name}' (Czas: {workout.duration_minutes}min, Objętość: {total_vol}kg). Ćwiczenia: {', '.join(exercise_summaries)}. Notatka: {workout.note or ''}",
+        "metadata": {"type": "workout", "date": str(workout.date)},
+        "user_id": workout.user_id
+    }
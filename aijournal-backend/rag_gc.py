@@ -0,0 +1,21 @@
+# G:\MotivAItor\aijournal-backend\rag_gc.py
+# Sprzątanie indeksu RAG: usuwa z Chroma wektory, których wiersze nie istnieją już w SQL.
+#   python rag_gc.py            -> usuwa sieroty
+#   python rag_gc.py --dry-run  -> tylko liczy
+import sys
+from database import SessionLocal
+import rag_reindex
+
+def run_gc(dry_run: bool):
+    print("🧹 Szukam osieroconych wektorów w RAG...")
+    db = SessionLocal()
+    try:
+        result = rag_reindex.collect_garbage(db, dry_run=dry_run)
+        print(f"✅ Przejrzano {result['scanned']} wektorów, sierot: {result['orphans']}, usunięto: {result['deleted']}")
+    except Exception as e:
+        print(f"❌ Błąd GC: {e}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    run_gc(dry_run="--dry-run" in sys.argv)
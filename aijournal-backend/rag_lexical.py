@@ -0,0 +1,228 @@
+# G:\MotivAItor\aijournal-backend\rag_lexical.py
+# Leksykalny indeks RAG (BM25) trzymany obok Chroma.
+# MiniLM słabo łapie dokładne frazy ("Bench Press", daty, nazwy projektów) - tu
+# robi to zwykły indeks odwrócony SQLite FTS5, bez modelu i w milisekundach.
+#
+# Indeks utrzymuje rag.add_documents / rag.delete_documents, więc jest zawsze
+# zgodny z Chroma (kolejka, reindeks i GC przechodzą przez te same funkcje).
+# Plik SQLite jest wspólny dla wszystkich workerów (WAL).
+import os
+import re
+import sqlite3
+import threading
+
+RAG_LEXICAL_PATH = os.getenv("RAG_LEXICAL_PATH", "./rag_lexical.sqlite3")
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+# Brak stemmera dla polskiego - zamiast tego dłuższe słowa tracą końcówkę i idą jako prefiks:
+# "treningu" -> "trenin"* łapie "trening", "treningi", "treningów"
+MIN_PREFIX_LEN = 4
+SUFFIX_TRIM = 2
+
+class LexicalIndex:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS docs (
+                id INTEGER PRIMARY KEY,
+                doc_id TEXT NOT NULL UNIQUE,
+                user_id INTEGER NOT NULL,
+                type TEXT,
+                date TEXT,
+                text TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS ix_docs_user_date ON docs (user_id, date);
+
+            -- FTS5 z zewnętrzną treścią: tekst trzymamy raz (w docs), FTS ma tylko indeks
+            CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(
+                text, content='docs', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+            );
+            CREATE TRIGGER IF NOT EXISTS docs_ai AFTER INSERT ON docs BEGIN
+                INSERT INTO docs_fts (rowid, text) VALUES (new.id, new.text);
+            END;
+            CREATE TRIGGER IF NOT EXISTS docs_ad AFTER DELETE ON docs BEGIN
+                INSERT INTO docs_fts (docs_fts, rowid, text) VALUES ('delete', old.id, old.text);
+            END;
+            CREATE TRIGGER IF NOT EXISTS docs_au AFTER UPDATE ON docs BEGIN
+                INSERT INTO docs_fts (docs_fts, rowid, text) VALUES ('delete', old.id, old.text);
+                INSERT INTO docs_fts (rowid, text) VALUES (new.id, new.text);
+            END;
+        """)
+
+    def upsert(self, docs: list[dict]) -> int:
+        """Każdy element jak w rag.add_documents: {"doc_id", "text", "metadata", "user_id"}."""
+        rows = []
+        for d in docs:
+            if not d.get("text"):
+                continue
+            meta = d.get("metadata") or {}
+            rows.append((d["doc_id"], int(d["user_id"]), meta.get("type"), meta.get("date"), d["text"]))
+        if not rows:
+            return 0
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany("""
+                    INSERT INTO docs (doc_id, user_id, type, date, text) VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(doc_id) DO UPDATE SET
+                        user_id = excluded.user_id,
+                        type = excluded.type,
+                        date = excluded.date,
+                        text = excluded.text
+                    WHERE docs.text IS NOT excluded.text
+                       OR docs.type IS NOT excluded.type
+                       OR docs.date IS NOT excluded.date
+                       OR docs.user_id IS NOT excluded.user_id
+                """, rows)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def delete(self, doc_ids: list[str]) -> int:
+        if not doc_ids:
+            return 0
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany("DELETE FROM docs WHERE doc_id = ?", [(doc_id,) for doc_id in doc_ids])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(doc_ids)
+
+    def locate(self, doc_ids: list[str]) -> dict:
+        """{doc_id: (user_id, date)} - gdzie dokument leży (routing kubełków czasowych w rag.py)."""
+        found = {}
+        with self._lock:
+            for i in range(0, len(doc_ids), 500):
+                chunk = doc_ids[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT doc_id, user_id, date FROM docs WHERE doc_id IN ({', '.join('?' for _ in chunk)})", chunk
+                ).fetchall()
+                found.update({r[0]: (r[1], r[2]) for r in rows})
+        return found
+
+    def date_bounds(self, user_id: int):
+        """(najwcześniejsza, najpóźniejsza) data ISO usera albo (None, None). Dwa skoki po ix_docs_user_date."""
+        # '0' <= data < ':' to zakres samych dat ISO - "inbox" i NULL odpadają, a indeks dalej działa
+        sql = "SELECT date FROM docs WHERE user_id = ? AND date >= '0' AND date < ':' ORDER BY date {} LIMIT 1"
+        with self._lock:
+            first = self._conn.execute(sql.format("ASC"), (int(user_id),)).fetchone()
+            last = self._conn.execute(sql.format("DESC"), (int(user_id),)).fetchone()
+        return (first[0] if first else None, last[0] if last else None)
+
+    def has_docs(self, user_id: int, date_from: str = None, date_to: str = None, undated: bool = False) -> bool:
+        """Czy user ma cokolwiek w przedziale dat (ISO, włącznie), a przy undated=True - bez daty."""
+        if undated:
+            sql = "SELECT 1 FROM docs WHERE user_id = ? AND (date IS NULL OR date < '0' OR date >= ':') LIMIT 1"
+            params = (int(user_id),)
+        else:
+            sql = "SELECT 1 FROM docs WHERE user_id = ? AND date >= ? AND date <= ? LIMIT 1"
+            params = (int(user_id), date_from, date_to)
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone() is not None
+
+    def search(self, query: str, user_id: int, limit: int = 10, doc_types: list[str] = None,
+               date_from=None, date_to=None, match_all: bool = False) -> list[dict]:
+        """
+        Dokumenty usera posortowane po BM25 (najlepsze pierwsze).
+        match_all=True wymaga wszystkich słów zapytania (AND), domyślnie wystarczy dowolne (OR).
+        date_from / date_to (włącznie) pomijają wpisy bez daty (inbox).
+        """
+        match = build_match(query, match_all)
+        if not match:
+            return []
+
+        sql = """
+            SELECT d.doc_id, d.type, d.date, d.text, bm25(docs_fts) AS score
+            FROM docs_fts JOIN docs d ON d.id = docs_fts.rowid
+            WHERE docs_fts MATCH ? AND d.user_id = ?
+        """
+        params = [match, int(user_id)]
+        if doc_types:
+            sql += f" AND d.type IN ({', '.join('?' for _ in doc_types)})"
+            params.extend(doc_types)
+        if date_from or date_to:
+            # Daty są w ISO (YYYY-MM-DD), więc porównanie tekstowe działa; "inbox" odpada na GLOB
+            sql += " AND d.date GLOB '[0-9][0-9][0-9][0-9]-*'"
+        if date_from:
+            sql += " AND d.date >= ?"
+            params.append(str(date_from))
+        if date_to:
+            sql += " AND d.date <= ?"
+            params.append(str(date_to))
+        sql += " ORDER BY score LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        # bm25() w SQLite jest ujemne (mniej = lepiej) - odwracamy znak dla czytelności
+        return [
+            {"doc_id": r[0], "type": r[1], "date": r[2], "text": r[3], "score": -r[4]}
+            for r in rows
+        ]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+def query_terms(query: str) -> list[str]:
+    """Unikalne słowa zapytania (bez jednoznakowych)."""
+    terms = []
+    for token in _TOKEN_RE.findall((query or "").casefold()):
+        if len(token) < 2 or token in terms:
+            continue
+        terms.append(token)
+    return terms
+
+def build_match(query: str, match_all: bool = False) -> str:
+    """Zapytanie użytkownika -> bezpieczne wyrażenie FTS5 (każde słowo w cudzysłowie, więc bez składni FTS)."""
+    parts = []
+    for t in query_terms(query):
+        if len(t) >= MIN_PREFIX_LEN + SUFFIX_TRIM:
+            parts.append(f'"{t[:-SUFFIX_TRIM]}"*')
+        elif len(t) >= MIN_PREFIX_LEN:
+            parts.append(f'"{t}"*')
+        else:
+            parts.append(f'"{t}"')
+    return (" AND " if match_all else " OR ").join(parts)
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_index() -> LexicalIndex:
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = LexicalIndex(RAG_LEXICAL_PATH)
+    return _index
+
+def upsert_documents(docs: list[dict]) -> int:
+    return get_index().upsert(docs)
+
+def delete_documents(doc_ids: list[str]) -> int:
+    return get_index().delete(doc_ids)
+
+def locate(doc_ids: list[str]) -> dict:
+    return get_index().locate(list(doc_ids))
+
+def date_bounds(user_id: int):
+    return get_index().date_bounds(user_id)
+
+def has_docs(user_id: int, date_from: str = None, date_to: str = None, undated: bool = False) -> bool:
+    return get_index().has_docs(user_id, date_from=date_from, date_to=date_to, undated=undated)
+
+def search(query: str, user_id: int, limit: int = 10, doc_types: list[str] = None,
+           date_from=None, date_to=None, match_all: bool = False) -> list[dict]:
+    return get_index().search(query, user_id, limit=limit, doc_types=doc_types,
+                              date_from=date_from, date_to=date_to, match_all=match_all)
+
+def count() -> int:
+    return get_index().count()
@@ -0,0 +1,303 @@
+# G:\MotivAItor\aijournal-backend\rag_queue.py
+# Kolejka indeksowania RAG w tle.
+# Endpointy zapisujące (zadania, zdrowie, treningi) tylko wrzucają dokument do kolejki
+# i od razu oddają odpowiedź - embedding i upsert do Chroma robi wątek w tle.
+#
+# Kolejka jest trwała (plik SQLite), więc restart serwera niczego nie gubi.
+# Ten sam doc_id wrzucony kilka razy przed przetworzeniem = jedna operacja (wygrywa najnowsza wersja).
+# Operacje: "upsert" (dodanie/zmiana treści) i "delete" (wiersz zniknął z SQL).
+#
+# Kilka procesów (np. uvicorn --workers N) może dzielić jeden plik kolejki: paczka jest zajmowana
+# (claimed_by + claimed_until) w transakcji BEGIN IMMEDIATE, więc dany dokument obsługuje naraz
+# tylko jeden worker. Gdy proces padnie w trakcie, dzierżawa wygasa po RAG_QUEUE_LEASE sekundach.
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import rag
+
+RAG_QUEUE_PATH = os.getenv("RAG_QUEUE_PATH", "./rag_queue.sqlite3")
+RAG_QUEUE_BATCH = int(os.getenv("RAG_QUEUE_BATCH", 64))     # Ile dokumentów na jedną paczkę
+RAG_QUEUE_POLL = float(os.getenv("RAG_QUEUE_POLL", 1.0))    # Co ile sekund worker sprawdza kolejkę
+RAG_QUEUE_MAX_ATTEMPTS = int(os.getenv("RAG_QUEUE_MAX_ATTEMPTS", 5))
+RAG_QUEUE_LEASE = float(os.getenv("RAG_QUEUE_LEASE", 300))  # Po ilu sekundach zajęta paczka wraca do puli (padnięty worker)
+
+class IndexQueue:
+    def __init__(self, path: str):
+        self.path = path
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS pending (
+                doc_id TEXT PRIMARY KEY,
+                op TEXT NOT NULL DEFAULT 'upsert',
+                user_id INTEGER NOT NULL,
+                text TEXT,
+                metadata TEXT,
+                seq INTEGER NOT NULL,
+                enqueued_at REAL NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                last_error TEXT,
+                claimed_by TEXT,
+                claimed_until REAL NOT NULL DEFAULT 0
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_pending_next ON pending (next_attempt_at)")
+        # Pliki kolejki sprzed operacji "delete" nie mają kolumny op, a sprzed dzierżaw - claimed_*
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(pending)")]
+        if "op" not in columns:
+            self._conn.execute("ALTER TABLE pending ADD COLUMN op TEXT NOT NULL DEFAULT 'upsert'")
+        if "claimed_by" not in columns:
+            self._conn.execute("ALTER TABLE pending ADD COLUMN claimed_by TEXT")
+        if "claimed_until" not in columns:
+            self._conn.execute("ALTER TABLE pending ADD COLUMN claimed_until REAL NOT NULL DEFAULT 0")
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.processed = 0
+        self.failures = 0
+
+    # --- PRODUCENCI (endpointy) ---
+
+    def enqueue_many(self, docs: list[dict], op: str = "upsert"):
+        """Każdy element: {"doc_id", "text", "metadata", "user_id"} - jak w rag.add_documents."""
+        if not docs:
+            return
+        now = time.time()
+        rows = [
+            (d["doc_id"], op, d["user_id"], d.get("text"), json.dumps(d.get("metadata") or {}, ensure_ascii=False), time.time_ns(), now, now)
+            for d in docs
+        ]
+        with self._lock:
+            # Koalescencja: nowsza operacja nadpisuje poprzednią (np. delete po upsercie),
+            # ale zachowuje czas pierwszego wrzucenia (lag). Dzierżawy nie ruszamy - nowsza wersja
+            # poczeka, aż worker skończy starą, inaczej drugi proces mógłby ją wyprzedzić.
+            self._conn.executemany("""
+                INSERT INTO pending (doc_id, op, user_id, text, metadata, seq, enqueued_at, next_attempt_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(doc_id) DO UPDATE SET
+                    op = excluded.op,
+                    user_id = excluded.user_id,
+                    text = excluded.text,
+                    metadata = excluded.metadata,
+                    seq = excluded.seq,
+                    attempts = 0,
+                    next_attempt_at = excluded.next_attempt_at,
+                    last_error = NULL
+            """, rows)
+        self._wake.set()
+
+    # --- WORKER ---
+
+    def _claim_batch(self):
+        """Zajmuje paczkę gotowych operacji na RAG_QUEUE_LEASE sekund (SELECT + UPDATE w jednej transakcji zapisu)."""
+        now = time.time()
+        with self._lock:
+            # BEGIN IMMEDIATE bierze blokadę zapisu od razu - inny proces czeka (timeout), zamiast
+            # przeczytać te same wiersze przed naszym UPDATE
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute("""
+                    SELECT doc_id, user_id, text, metadata, seq, attempts, op FROM pending
+                    WHERE next_attempt_at <= ? AND attempts < ? AND claimed_until <= ?
+                    ORDER BY enqueued_at LIMIT ?
+                """, (now, RAG_QUEUE_MAX_ATTEMPTS, now, RAG_QUEUE_BATCH)).fetchall()
+                self._conn.executemany(
+                    "UPDATE pending SET claimed_by = ?, claimed_until = ? WHERE doc_id = ?",
+                    [(self.worker_id, now + RAG_QUEUE_LEASE, r[0]) for r in rows]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return rows
+
+    def _release(self, rows):
+        # Zwalnia dzierżawę tylko, jeśli wciąż jest nasza (po wygaśnięciu mógł ją przejąć inny worker)
+        self._conn.executemany(
+            "UPDATE pending SET claimed_by = NULL, claimed_until = 0 WHERE doc_id = ? AND claimed_by = ?",
+            [(r[0], self.worker_id) for r in rows]
+        )
+
+    def _done(self, rows):
+        with self._lock:
+            # Usuwamy tylko wersję, którą faktycznie zindeksowaliśmy (seq) -
+            # jeśli w międzyczasie przyszła nowsza, zostaje w kolejce (już bez dzierżawy).
+            self._conn.executemany(
+                "DELETE FROM pending WHERE doc_id = ? AND seq = ?",
+                [(r[0], r[4]) for r in rows]
+            )
+            self._release(rows)
+        self.processed += len(rows)
+
+    def _failed(self, row, error: Exception):
+        attempts = row[5] + 1
+        backoff = min(300, 2 ** attempts) # 2s, 4s, 8s ... max 5 min
+        with self._lock:
+            self._conn.execute(
+                "UPDATE pending SET attempts = ?, next_attempt_at = ?, last_error = ? WHERE doc_id = ? AND seq = ?",
+                (attempts, time.time() + backoff, repr(error)[:500], row[0], row[4])
+            )
+            self._release([row])
+        self.failures += 1
+        print(f"[RAG QUEUE] Błąd indeksowania {row[0]} (próba {attempts}/{RAG_QUEUE_MAX_ATTEMPTS}): {error}")
+
+    @staticmethod
+    def _to_doc(row) -> dict:
+        return {"doc_id": row[0], "user_id": row[1], "text": row[2], "metadata": json.loads(row[3] or "{}")}
+
+    def _apply(self, rows):
+        upserts = [self._to_doc(r) for r in rows if r[6] != "delete"]
+        if upserts:
+            rag.add_documents(upserts)
+        # Usunięcia grupujemy po userze - każdy może siedzieć w innej partycji indeksu
+        deletes = {}
+        for r in rows:
+            if r[6] == "delete":
+                deletes.setdefault(r[1], []).append(r[0])
+        for user_id, doc_ids in deletes.items():
+            rag.delete_documents(doc_ids, user_id=user_id)
+
+    def process_batch(self) -> int:
+        """Przetwarza jedną paczkę gotowych operacji. Zwraca ile wzięto z kolejki."""
+        rows = self._claim_batch()
+        if not rows:
+            return 0
+        try:
+            self._apply(rows)
+            self._done(rows)
+        except Exception:
+            # Paczka padła - próbujemy pojedynczo, żeby jeden zły dokument nie blokował reszty
+            for r in rows:
+                try:
+                    self._apply([r])
+                    self._done([r])
+                except Exception as e:
+                    self._failed(r, e)
+        return len(rows)
+
+    def _run(self):
+        print("[RAG QUEUE] Worker wystartował.")
+        while not self._stop.is_set():
+            try:
+                processed = self.process_batch()
+            except Exception as e:
+                print(f"[RAG QUEUE] Worker error: {e}")
+                processed = 0
+            if processed == 0:
+                self._wake.wait(RAG_QUEUE_POLL)
+                self._wake.clear()
+        print("[RAG QUEUE] Worker zatrzymany.")
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="rag-index-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        """
+        Czeka, aż wszystko gotowe do przetworzenia zostanie zindeksowane (np. w testach).
+        Bez działającego workera przetwarza kolejkę w bieżącym wątku. Zwraca True, jeśli kolejka pusta;
+        False od razu, gdy zostały tylko dokumenty w backoffie, którego nie doczekamy przed timeoutem.
+        """
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.ready() == 0:
+                return True
+            next_at = self.next_attempt_at()
+            if next_at is not None and next_at > time.time():
+                # Wszystko, co zostało, czeka na backoff - nie kręcimy pętli do deadline'u
+                if next_at >= deadline:
+                    return False
+                time.sleep(next_at - time.time())
+                continue
+            if self._thread and self._thread.is_alive():
+                self._wake.set()
+                time.sleep(0.05)
+            else:
+                self.process_batch()
+        return self.ready() == 0
+
+    # --- METRYKI ---
+
+    def ready(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM pending WHERE attempts < ?", (RAG_QUEUE_MAX_ATTEMPTS,)
+            ).fetchone()[0]
+
+    def next_attempt_at(self):
+        """Najwcześniejszy moment, w którym coś z kolejki będzie gotowe (timestamp), albo None."""
+        with self._lock:
+            # Wiersz zajęty przez inny proces jest gotowy dopiero po wygaśnięciu dzierżawy
+            # (nasze własne dzierżawy właśnie przetwarza wątek workera)
+            return self._conn.execute("""
+                SELECT MIN(MAX(next_attempt_at, CASE WHEN claimed_by = ? THEN 0 ELSE claimed_until END))
+                FROM pending WHERE attempts < ?
+            """, (self.worker_id, RAG_QUEUE_MAX_ATTEMPTS)).fetchone()[0]
+
+    def stats(self) -> dict:
+        with self._lock:
+            depth, dead, oldest = self._conn.execute("""
+                SELECT COUNT(*),
+                       COALESCE(SUM(CASE WHEN attempts >= ? THEN 1 ELSE 0 END), 0),
+                       MIN(CASE WHEN attempts < ? THEN enqueued_at END)
+                FROM pending
+            """, (RAG_QUEUE_MAX_ATTEMPTS, RAG_QUEUE_MAX_ATTEMPTS)).fetchone()
+        return {
+            "depth": depth,
+            "dead": dead, # Przekroczyły limit prób - do ręcznego sprawdzenia
+            "lag_seconds": round(time.time() - oldest, 3) if oldest else 0.0,
+            "processed": self.processed,
+            "failures": self.failures,
+            "worker_alive": bool(self._thread and self._thread.is_alive())
+        }
+
+_queue = None
+_queue_lock = threading.Lock()
+
+def get_queue() -> IndexQueue:
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = IndexQueue(RAG_QUEUE_PATH)
+    return _queue
+
+def enqueue(doc_id: str, text: str, metadata: dict, user_id: int):
+    """Odpowiednik rag.add_document, ale bez czekania na embedding."""
+    get_queue().enqueue_many([{"doc_id": doc_id, "text": text, "metadata": metadata, "user_id": user_id}])
+
+def enqueue_many(docs: list[dict]):
+    get_queue().enqueue_many(docs)
+
+def enqueue_delete(doc_ids: list[str], user_id: int):
+    """Usunięcie z indeksu w tle (wiersz skasowany w SQL)."""
+    get_queue().enqueue_many([{"doc_id": doc_id, "user_id": user_id} for doc_id in doc_ids], op="delete")
+
+def start_worker():
+    get_queue().start()
+
+def stop_worker():
+    get_queue().stop()
+
+def flush(timeout: float = 30.0) -> bool:
+    return get_queue().flush(timeout)
+
+def stats() -> dict:
+    return get_queue().stats()
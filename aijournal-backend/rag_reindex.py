@@ -0,0 +1,226 @@
+# G:\MotivAItor\aijournal-backend\rag_reindex.py
+# Przyrostowa, wznawialna reindeksacja RAG (zadania, zdrowie, treningi).
+#
+# - Wiersze czytane paczkami po ID (keyset), nigdy .all() na całej historii.
+# - Dokumenty z niezmienionym content_hash są pomijane (bez liczenia embeddingu).
+# - Po każdej paczce postęp ląduje w tabeli rag_reindex_jobs, więc po awarii
+#   job rusza od ostatniego checkpointu zamiast od zera.
+# - Job chodzi w wątku w tle; status: GET /api/admin/reindex-rag/{job_id}.
+#
+# Tu jest też garbage collector indeksu (collect_garbage / rag_gc.py): usuwa wektory,
+# których wiersze zniknęły z SQL (np. sprzed propagacji usunięć).
+import os
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import or_
+from sqlalchemy.orm import Session, selectinload
+from database import SessionLocal
+import models
+import rag
+import rag_documents
+import rag_lexical
+
+RAG_REINDEX_CHUNK = int(os.getenv("RAG_REINDEX_CHUNK", 500))
+# Job bez heartbeatu przez tyle sekund uznajemy za osierocony (proces padł) i można go przejąć
+RAG_REINDEX_STALE_SECONDS = int(os.getenv("RAG_REINDEX_STALE_SECONDS", 120))
+
+SOURCES = ["tasks", "health", "workouts"]
+
+def _fetch_chunk(db: Session, source: str, user_id: int, after_id: int):
+    if source == "tasks":
+        return db.query(models.Task).filter(
+            models.Task.owner_id == user_id,
+            models.Task.id > after_id
+        ).order_by(models.Task.id.asc()).limit(RAG_REINDEX_CHUNK).all()
+    if source == "health":
+        return db.query(models.DailyHealth).filter(
+            models.DailyHealth.user_id == user_id,
+            models.DailyHealth.id > after_id
+        ).order_by(models.DailyHealth.id.asc()).limit(RAG_REINDEX_CHUNK).all()
+    return db.query(models.WorkoutSession).options(
+        selectinload(models.WorkoutSession.exercises) # Jedno dodatkowe zapytanie na paczkę, nie na trening
+    ).filter(
+        models.WorkoutSession.user_id == user_id,
+        models.WorkoutSession.id > after_id
+    ).order_by(models.WorkoutSession.id.asc()).limit(RAG_REINDEX_CHUNK).all()
+
+def _build_document(source: str, row) -> dict:
+    if source == "tasks":
+        return rag_documents.task_document(row)
+    if source == "health":
+        return rag_documents.health_document(row)
+    return rag_documents.workout_document(row)
+
+def _claim(db: Session, job_id: int) -> bool:
+    """Przejmuje job (pending albo osierocony running). Chroni przed dwoma workerami na jednym jobie."""
+    stale_before = datetime.now() - timedelta(seconds=RAG_REINDEX_STALE_SECONDS)
+    claimed = db.query(models.RagReindexJob).filter(
+        models.RagReindexJob.id == job_id,
+        or_(
+            models.RagReindexJob.status == "pending",
+            (models.RagReindexJob.status == "running") & (models.RagReindexJob.heartbeat_at < stale_before)
+        )
+    ).update({"status": "running", "heartbeat_at": datetime.now()}, synchronize_session=False)
+    db.commit()
+    return claimed == 1
+
+def _retry_when_stale(db: Session, job_id: int):
+    """
+    Job jest "running" ze świeżym heartbeatem: albo żyje w innym workerze, albo proces padł przed chwilą
+    (typowy restart kontenera < RAG_REINDEX_STALE_SECONDS). Próbujemy ponownie, gdy heartbeat się przeterminuje -
+    żywy job w międzyczasie go odświeży (i zaplanujemy kolejną próbę), osierocony zostanie przejęty.
+    """
+    job = db.query(models.RagReindexJob).filter(models.RagReindexJob.id == job_id).first()
+    if job is None or job.status != "running":
+        return
+    age = (datetime.now() - job.heartbeat_at).total_seconds() if job.heartbeat_at else 0
+    delay = max(1.0, RAG_REINDEX_STALE_SECONDS - age + 1)
+    timer = threading.Timer(delay, _spawn, args=(job_id, True))
+    timer.daemon = True
+    timer.start()
+
+def run_job(job_id: int, retry_stale: bool = False):
+    db = SessionLocal()
+    try:
+        if not _claim(db, job_id):
+            if retry_stale:
+                _retry_when_stale(db, job_id)
+            return
+        job = db.query(models.RagReindexJob).filter(models.RagReindexJob.id == job_id).first()
+        print(f"[REINDEX] Job {job.id} (User {job.user_id}) startuje od {job.source}#{job.last_id}")
+
+        for source in SOURCES[SOURCES.index(job.source):]:
+            if job.source != source:
+                job.source = source
+                job.last_id = 0
+
+            while True:
+                rows = _fetch_chunk(db, source, job.user_id, job.last_id)
+                if not rows:
+                    break
+
+                docs = [_build_document(source, r) for r in rows]
+                known = rag.get_hashes([d["doc_id"] for d in docs], user_id=job.user_id)
+                changed = [d for d in docs if known.get(d["doc_id"]) != rag.content_hash(d)]
+                rag.add_documents(changed)
+                # Niezmienione wektory zostają, ale indeks leksykalny może ich jeszcze nie mieć (sprzed BM25)
+                changed_ids = {d["doc_id"] for d in changed}
+                rag_lexical.upsert_documents([d for d in docs if d["doc_id"] not in changed_ids])
+
+                # CHECKPOINT
+                job.last_id = rows[-1].id
+                job.scanned += len(docs)
+                job.indexed += len(changed)
+                job.skipped += len(docs) - len(changed)
+                job.heartbeat_at = datetime.now()
+                db.commit()
+                # Zwalniamy zmapowane obiekty z paczki - pamięć stała niezależnie od rozmiaru historii
+                db.expunge_all()
+                job = db.query(models.RagReindexJob).filter(models.RagReindexJob.id == job_id).first()
+
+        job.status = "done"
+        job.finished_at = datetime.now()
+        db.commit()
+        print(f"[REINDEX] Job {job.id} gotowy: {job.indexed} zindeksowanych, {job.skipped} bez zmian")
+    except Exception as e:
+        db.rollback()
+        print(f"[REINDEX] Job {job_id} padł: {e}")
+        db.query(models.RagReindexJob).filter(models.RagReindexJob.id == job_id).update(
+            {"status": "failed", "error": repr(e)[:2000]}, synchronize_session=False
+        )
+        db.commit()
+    finally:
+        db.close()
+
+def _spawn(job_id: int, retry_stale: bool = False):
+    threading.Thread(target=run_job, args=(job_id, retry_stale), name=f"rag-reindex-{job_id}", daemon=True).start()
+
+def start_job(db: Session, user_id: int) -> models.RagReindexJob:
+    """
+    Startuje reindeks dla usera. Jeśli jest niedokończony job (także po awarii),
+    wznawiamy go od checkpointu zamiast zaczynać od nowa.
+    """
+    job = db.query(models.RagReindexJob).filter(
+        models.RagReindexJob.user_id == user_id,
+        models.RagReindexJob.status.in_(["pending", "running", "failed"])
+    ).order_by(models.RagReindexJob.id.desc()).first()
+
+    if job and job.status == "failed":
+        job.status = "pending" # Ponowienie od ostatniego checkpointu
+        job.error = None
+    elif job is None:
+        job = models.RagReindexJob(user_id=user_id, status="pending", source=SOURCES[0], last_id=0)
+        db.add(job)
+    db.commit()
+    db.refresh(job)
+
+    _spawn(job.id)
+    return job
+
+def resume_unfinished():
+    """Wywoływane przy starcie aplikacji: wznawia joby, które przerwał restart/awaria."""
+    db = SessionLocal()
+    try:
+        job_ids = [j.id for j in db.query(models.RagReindexJob.id).filter(
+            models.RagReindexJob.status.in_(["pending", "running"])
+        ).all()]
+    finally:
+        db.close()
+    for job_id in job_ids:
+        # _claim odrzuci job ze świeżym heartbeatem (inny worker albo padnięty przed chwilą proces) -
+        # wtedy ponawiamy, aż heartbeat się przeterminuje, zamiast zostawiać go w "running" na zawsze
+        _spawn(job_id, retry_stale=True)
+
+def job_status(job: models.RagReindexJob) -> dict:
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "source": job.source,
+        "checkpoint": job.last_id,
+        "scanned": job.scanned,
+        "indexed": job.indexed,
+        "skipped": job.skipped,
+        "error": job.error,
+        "created_at": job.created_at,
+        "heartbeat_at": job.heartbeat_at,
+        "finished_at": job.finished_at
+    }
+
+# --- GARBAGE COLLECTION ---
+
+# Prefiks doc_id -> model SQL, z którego pochodzi dokument
+DOC_SOURCES = {
+    "task": models.Task,
+    "health": models.DailyHealth,
+    "workout": models.WorkoutSession,
+}
+
+def collect_garbage(db: Session, page_size: int = 1000, dry_run: bool = False) -> dict:
+    """
+    Porównuje ID w Chroma z SQL i usuwa osierocone wektory.
+    Najpierw zbieramy sieroty (usuwanie w trakcie przesuwałoby offsety stron), potem kasujemy paczkami.
+    """
+    scanned = 0
+    orphans = [] # (kolekcja, doc_id)
+    for name, page in rag.iter_ids(page_size):
+        scanned += len(page)
+        by_source = {}
+        for doc_id in page:
+            prefix, _, raw_id = doc_id.rpartition("_")
+            if prefix in DOC_SOURCES and raw_id.isdigit():
+                by_source.setdefault(prefix, {})[int(raw_id)] = doc_id
+
+        for prefix, ids in by_source.items():
+            model = DOC_SOURCES[prefix]
+            alive = {row[0] for row in db.query(model.id).filter(model.id.in_(list(ids))).all()}
+            orphans.extend((name, doc_id) for row_id, doc_id in ids.items() if row_id not in alive)
+
+    if not dry_run:
+        by_collection = {}
+        for name, doc_id in orphans:
+            by_collection.setdefault(name, []).append(doc_id)
+        for name, doc_ids in by_collection.items():
+            for i in range(0, len(doc_ids), page_size):
+                rag.delete_documents(doc_ids[i:i + page_size], collection=name)
+
+    return {"scanned": scanned, "orphans": len(orphans), "deleted": 0 if dry_run else len(orphans)}
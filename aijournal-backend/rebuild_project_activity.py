@@ -0,0 +1,18 @@
+# G:\MotivAItor\aijournal-backend\rebuild_project_activity.py
+from database import SessionLocal
+import crud
+
+def rebuild():
+    print("🔄 Przeliczam rollup 'project_activity' od zera...")
+    db = SessionLocal()
+    try:
+        count = crud.rebuild_project_activity(db)
+        print(f"✅ Gotowe! Przeliczono aktywność dla {count} projektów.")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Błąd podczas przeliczania: {e}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    rebuild()
@@ -0,0 +1,18 @@
+# G:\MotivAItor\aijournal-backend\rebuild_workout_volume.py
+from database import SessionLocal
+import crud
+
+def rebuild():
+    print("🔄 Przeliczam rollup 'workout_volume_daily' od zera...")
+    db = SessionLocal()
+    try:
+        count = crud.rebuild_workout_volume(db)
+        print(f"✅ Gotowe! Przeliczono objętość dla {count} dni treningowych.")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Błąd podczas przeliczania: {e}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    rebuild()
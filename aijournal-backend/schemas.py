@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from datetime import date, datetime
 
 # --- PROJEKTY (NOWE) ---
@@ -43,6 +43,11 @@ class TaskReorder(BaseModel):
     id: int
     order: int
 
+class TaskMove(BaseModel):
+    task_date: date | None          # Lista docelowa (None = inbox)
+    after_id: int | None = None     # Zadanie, które ma być bezpośrednio NAD przeniesionym
+    before_id: int | None = None    # Zadanie, które ma być bezpośrednio POD przeniesionym
+
 class Task(TaskBase):
     id: int          
     owner_id: int    
@@ -51,6 +56,12 @@ class Task(TaskBase):
     task_date: date | None = None 
     completed_at: datetime | None = None # Data ukończenia
 
+    # Stare wiersze mogą mieć NULL (backfill migracji 0003 idzie paczkami) - oddajemy domyślny priorytet
+    @field_validator("priority", mode="before")
+    @classmethod
+    def default_priority(cls, value):
+        return "medium" if value is None else value
+
     class Config:
         from_attributes = True
 
@@ -120,6 +131,7 @@ class AIChatRequest(BaseModel):
     message: str 
     context_task_id: int | None = None
     context_project_id: int | None = None # Dodamy możliwość czatu o projekcie
+    stream: bool = False # True = odpowiedź jako Server-Sent Events (kawałek po kawałku)
 
 
 # --- SEKCJA SIŁOWNI (GYM)---
@@ -136,6 +148,7 @@ class ExerciseLogCreate(ExerciseLogBase):
 class ExerciseLog(ExerciseLogBase):
     id: int
     session_id: int
+    set_reps: list[int] | None = None # Powtórzenia w każdej serii, np. [12, 10, 8]
     volume_load: float
     class Config:
         from_attributes = True
@@ -0,0 +1,90 @@
+# Async odczyty (crud.*_async) muszą zwracać dokładnie to samo co ich synchroniczne odpowiedniki.
+# SQLite (aiosqlite) zawsze, Postgres (asyncpg vs psycopg2) gdy jest TEST_DATABASE_URL.
+import asyncio
+from datetime import date, datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+import crud
+import database
+import models
+from conftest import TEST_DATABASE_URL, create_tables
+
+DAY = date(2025, 3, 14)
+
+def _seed(db) -> int:
+    user = models.User(email="async@test.local", hashed_password="x")
+    other = models.User(email="other@test.local", hashed_password="x")
+    db.add_all([user, other])
+    db.flush()
+    project = models.Project(name="Projekt", owner_id=user.id)
+    db.add(project)
+    db.flush()
+    db.add(models.ProjectActivity(project_id=project.id, task_count=3, completed_count=1,
+                                  last_task_completed_at=datetime(2025, 3, 1, 12, 0), pomodoro_count=1,
+                                  pomodoro_minutes=25, last_pomodoro_date=DAY - timedelta(days=1)))
+    db.add(models.Project(name="Bez aktywności", owner_id=user.id))
+    # Kolejność wstawiania != kolejność "order", żeby sortowanie miało znaczenie
+    for i, order in enumerate([2048, 0, 1024]):
+        db.add(models.Task(content=f"Dzień {i}", task_date=DAY, order=order, owner_id=user.id, project_id=project.id))
+        db.add(models.Task(content=f"Inbox {i}", task_date=None, order=order, owner_id=user.id))
+    db.add(models.Task(content="Jutro", task_date=DAY + timedelta(days=1), order=0, owner_id=user.id))
+    db.add(models.Task(content="Cudze", task_date=DAY, order=0, owner_id=other.id))
+    db.add(models.Task(content="Cudzy inbox", task_date=None, order=0, owner_id=other.id))
+    db.commit()
+    return user.id
+
+def _tasks(rows):
+    return [(t.id, t.content, t.task_date, t.order, t.priority, t.project_id) for t in rows]
+
+def _projects(rows):
+    return sorted((p.id, p.name, p.stats["progress"], p.stats["total_pomodoros"], p.stats["last_activity"]) for p in rows)
+
+def _compare(sync_factory, async_factory):
+    with sync_factory() as db:
+        user_id = _seed(db)
+        expected = (
+            _tasks(crud.get_tasks_by_date(db, user_id, DAY)),
+            _tasks(crud.get_inbox_tasks(db, user_id)),
+            _projects(crud.get_projects_with_stats(db, user_id)),
+        )
+
+    async def read_async():
+        async with async_factory() as db:
+            return (
+                _tasks(await crud.get_tasks_by_date_async(db, user_id, DAY)),
+                _tasks(await crud.get_inbox_tasks_async(db, user_id)),
+                _projects(await crud.get_projects_with_stats_async(db, user_id)),
+            )
+
+    actual = asyncio.run(read_async())
+    assert [t[1] for t in expected[0]] == ["Dzień 1", "Dzień 2", "Dzień 0"]
+    assert [t[1] for t in expected[1]] == ["Inbox 1", "Inbox 2", "Inbox 0"]
+    assert len(expected[2]) == 2
+    assert actual == expected
+
+TABLES = (models.User, models.Project, models.ProjectActivity, models.Task)
+
+def _async_factory(url: str):
+    engine = create_async_engine(url, poolclass=NullPool)
+    return engine, async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+def test_async_reads_match_sync_sqlite(tmp_path):
+    # Plik, nie pamięć - silnik sync i aiosqlite muszą widzieć tę samą bazę
+    path = tmp_path / "reads.sqlite3"
+    sync_engine = create_engine(f"sqlite:///{path}")
+    create_tables(sync_engine, *TABLES)
+    async_engine, async_factory = _async_factory(f"sqlite+aiosqlite:///{path}")
+    try:
+        _compare(sessionmaker(bind=sync_engine, autoflush=False), async_factory)
+    finally:
+        asyncio.run(async_engine.dispose())
+        sync_engine.dispose()
+
+def test_async_reads_match_sync_postgres(pg_session):
+    async_engine, async_factory = _async_factory(database._async_url(TEST_DATABASE_URL))
+    try:
+        _compare(pg_session, async_factory)
+    finally:
+        asyncio.run(async_engine.dispose())
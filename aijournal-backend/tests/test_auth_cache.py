@@ -0,0 +1,79 @@
+# Cache token -> użytkownik (auth.py): trafienie w cache nie może pytać bazy.
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+import auth
+import database
+import models
+from conftest import count_statements, create_tables
+
+EMAIL = "cache@test.local"
+
+def _users_selects(statements):
+    return [s for s in statements if s.lstrip().upper().startswith("SELECT") and "FROM users" in s]
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    auth._user_cache.clear()
+    yield
+    auth._user_cache.clear()
+
+def test_sync_dependency_hits_db_once_per_token(sqlite_engine, make_session):
+    create_tables(sqlite_engine, models.User)
+    with make_session() as db:
+        db.add(models.User(email=EMAIL, hashed_password="x"))
+        db.commit()
+
+    app = FastAPI()
+
+    @app.get("/me")
+    def me(user: models.User = Depends(auth.get_current_active_user)):
+        return {"email": user.email}
+
+    def get_test_db():
+        db = make_session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[database.get_db] = get_test_db
+    headers = {"Authorization": f"Bearer {auth.create_access_token({'sub': EMAIL})}"}
+
+    with TestClient(app) as client, count_statements(sqlite_engine) as statements:
+        assert client.get("/me", headers=headers).json() == {"email": EMAIL}
+        assert client.get("/me", headers=headers).json() == {"email": EMAIL}
+
+    assert len(_users_selects(statements)) == 1
+
+def test_async_dependency_hits_db_once_per_token():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    factory = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def setup():
+        async with engine.begin() as conn:
+            await conn.run_sync(lambda sync_conn: create_tables(sync_conn, models.User))
+        async with factory() as db:
+            db.add(models.User(email=EMAIL, hashed_password="x"))
+            await db.commit()
+
+    app = FastAPI(on_startup=[setup])
+
+    @app.get("/me")
+    async def me(user: models.User = Depends(auth.get_current_active_user_async)):
+        return {"email": user.email}
+
+    async def get_test_async_db():
+        async with factory() as db:
+            yield db
+
+    app.dependency_overrides[database.get_async_db] = get_test_async_db
+    headers = {"Authorization": f"Bearer {auth.create_access_token({'sub': EMAIL})}"}
+
+    with TestClient(app) as client, count_statements(engine.sync_engine) as statements:
+        assert client.get("/me", headers=headers).json() == {"email": EMAIL}
+        assert client.get("/me", headers=headers).json() == {"email": EMAIL}
+
+    assert len(_users_selects(statements)) == 1
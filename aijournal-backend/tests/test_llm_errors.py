@@ -0,0 +1,95 @@
+# Błędy llm_client.chat_completion: każdy rodzaj awarii to osobny typ (LLMError), a nie wspólne None.
+# Model udaje httpx.MockTransport - bez sieci i bez fake_llm_server.py.
+import asyncio
+import httpx
+import pytest
+import gym_app
+import llm_client
+import main
+import schemas
+
+def _ok(content):
+    return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Podmienia klienta llm_client na MockTransport; zwraca funkcję ustawiającą handler modelu."""
+    state = {"handler": lambda request: _ok("ok")}
+    monkeypatch.setattr(llm_client, "_client", httpx.AsyncClient(transport=httpx.MockTransport(lambda r: state["handler"](r))))
+    monkeypatch.setattr(llm_client, "_semaphore", None)
+
+    def set_handler(handler):
+        state["handler"] = handler
+    return set_handler
+
+def _call(route="chat"):
+    return asyncio.run(llm_client.chat_completion("sys", "hi", route=route))
+
+def _raise(exc):
+    def handler(request):
+        raise exc
+    return handler
+
+def test_success_returns_content(upstream):
+    upstream(lambda request: _ok("Cześć"))
+    assert _call() == "Cześć"
+
+def test_timeout_is_llm_timeout(upstream):
+    upstream(_raise(httpx.ReadTimeout("slow model")))
+    with pytest.raises(llm_client.LLMTimeout) as info:
+        _call(route="calories")
+    assert info.value.route == "calories"
+
+def test_connection_error_is_not_a_timeout(upstream):
+    upstream(_raise(httpx.ConnectError("refused")))
+    with pytest.raises(llm_client.LLMConnectionError):
+        _call()
+
+def test_non_200_carries_status_code(upstream):
+    upstream(lambda request: httpx.Response(503, text="model loading"))
+    with pytest.raises(llm_client.LLMHTTPError) as info:
+        _call()
+    assert info.value.status_code == 503
+
+@pytest.mark.parametrize("response", [
+    httpx.Response(200, text="<html>not json</html>"),
+    httpx.Response(200, json={"choices": []}),
+    httpx.Response(200, json={"choices": [{"message": {"content": None}}]}),
+])
+def test_unparseable_200_is_bad_response(upstream, response):
+    upstream(lambda request: response)
+    with pytest.raises(llm_client.LLMBadResponse):
+        _call()
+
+def test_all_errors_share_a_base_class():
+    for cls in (llm_client.LLMTimeout, llm_client.LLMConnectionError, llm_client.LLMHTTPError, llm_client.LLMBadResponse):
+        assert issubclass(cls, llm_client.LLMError)
+
+# --- Wywołujący ---
+
+def test_call_ai_api_propagates_typed_errors(upstream):
+    upstream(_raise(httpx.ReadTimeout("slow model")))
+    with pytest.raises(llm_client.LLMTimeout):
+        asyncio.run(main.call_ai_api("hi"))
+    upstream(lambda request: httpx.Response(500, text="boom"))
+    with pytest.raises(llm_client.LLMHTTPError):
+        asyncio.run(main.call_ai_api("hi"))
+
+def test_endpoint_fallbacks_still_apply(upstream):
+    upstream(lambda request: httpx.Response(500, text="boom"))
+    assert asyncio.run(main.call_lm_studio("hi")) == "[]"
+    assert asyncio.run(main.estimate_calories(schemas.CalorieRequest(text="jabłko"))) == {"calories": 0}
+
+def test_gym_plan_maps_timeout_and_other_errors(upstream):
+    from fastapi import HTTPException
+    request = gym_app.PlanRequest(description="Push day")
+
+    upstream(_raise(httpx.ReadTimeout("slow model")))
+    with pytest.raises(HTTPException) as info:
+        asyncio.run(gym_app.generate_ai_plan(request, current_user=None))
+    assert info.value.status_code == 504
+
+    upstream(lambda request: httpx.Response(200, text="garbage"))
+    with pytest.raises(HTTPException) as info:
+        asyncio.run(gym_app.generate_ai_plan(request, current_user=None))
+    assert info.value.status_code == 502
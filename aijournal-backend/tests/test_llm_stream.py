@@ -0,0 +1,116 @@
+# Strumieniowanie odpowiedzi LLM (llm_client.stream_chat_completion + sse_events).
+# Model udaje httpx.MockTransport - bez sieci i bez fake_llm_server.py.
+import asyncio
+import json
+import httpx
+import pytest
+import llm_client
+
+def _sse_line(delta: str) -> bytes:
+    return f"data: {json.dumps({'choices': [{'delta': {'content': delta}}]})}\n\n".encode()
+
+class UpstreamStream(httpx.AsyncByteStream):
+    """Strumień "modelu": kolejne kawałki, opcjonalnie potem wisi (jak długa generacja)."""
+    def __init__(self, chunks, hang: bool = False):
+        self.chunks = chunks
+        self.hang = hang
+        self.closed = False
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            yield chunk
+        if self.hang:
+            await asyncio.Event().wait()
+
+    async def aclose(self):
+        self.closed = True
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Podmienia klienta llm_client na MockTransport; zwraca funkcję ustawiającą odpowiedź modelu."""
+    state = {}
+
+    def handler(request):
+        assert json.loads(request.content)["stream"] is True
+        return httpx.Response(state.get("status", 200), stream=state["stream"])
+
+    def set_response(stream, status=200):
+        state["stream"] = stream
+        state["status"] = status
+        return stream
+
+    monkeypatch.setattr(llm_client, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(llm_client, "_semaphore", None)
+    return set_response
+
+def _semaphore_free():
+    return llm_client._semaphore._value == llm_client.AI_MAX_CONCURRENCY
+
+def test_chunks_arrive_in_order(upstream):
+    upstream(UpstreamStream([_sse_line("Hel"), _sse_line("lo"), b": keep-alive\n\n", _sse_line(" world"), b"data: [DONE]\n\n"]))
+
+    async def collect():
+        return [d async for d in llm_client.stream_chat_completion("sys", "hi", route="chat")]
+
+    assert asyncio.run(collect()) == ["Hel", "lo", " world"]
+    assert _semaphore_free()
+
+def test_sse_events_frames_and_done(upstream):
+    upstream(UpstreamStream([_sse_line("a"), _sse_line("b"), b"data: [DONE]\n\n"]))
+
+    async def collect():
+        deltas = llm_client.stream_chat_completion("sys", "hi", route="chat")
+        return [f async for f in llm_client.sse_events(deltas, fallback="[]")]
+
+    assert asyncio.run(collect()) == [
+        'data: {"delta": "a"}\n\n',
+        'data: {"delta": "b"}\n\n',
+        "data: [DONE]\n\n",
+    ]
+
+def test_sse_events_fallback_when_model_fails(upstream):
+    upstream(UpstreamStream([b"boom"]), status=500)
+
+    async def collect():
+        deltas = llm_client.stream_chat_completion("sys", "hi", route="chat")
+        return [f async for f in llm_client.sse_events(deltas, fallback="[]")]
+
+    assert asyncio.run(collect()) == ['data: {"delta": "[]"}\n\n', "data: [DONE]\n\n"]
+    assert _semaphore_free()
+
+def test_client_disconnect_closes_upstream_and_releases_semaphore(upstream):
+    stream = upstream(UpstreamStream([_sse_line("first")], hang=True))
+
+    async def disconnect_after_first_frame():
+        frames = llm_client.sse_events(llm_client.stream_chat_completion("sys", "hi", route="chat"), fallback="[]")
+        first = await frames.__anext__()
+        assert llm_client._semaphore._value == llm_client.AI_MAX_CONCURRENCY - 1
+        await frames.aclose() # Tak StreamingResponse sprząta generator po rozłączeniu klienta
+        return first
+
+    assert asyncio.run(disconnect_after_first_frame()) == 'data: {"delta": "first"}\n\n'
+    assert stream.closed
+    assert _semaphore_free()
+
+def test_cancelled_request_closes_upstream_and_releases_semaphore(upstream):
+    stream = upstream(UpstreamStream([_sse_line("first")], hang=True))
+
+    async def cancel_while_waiting_for_model():
+        received = []
+
+        async def consume():
+            deltas = llm_client.stream_chat_completion("sys", "hi", route="chat")
+            async for frame in llm_client.sse_events(deltas, fallback="[]"):
+                received.append(frame)
+
+        task = asyncio.create_task(consume())
+        while not received:
+            await asyncio.sleep(0.01)
+        task.cancel() # Model dalej "generuje" - anulowanie requestu musi przerwać czekanie
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return received
+
+    assert asyncio.run(cancel_while_waiting_for_model()) == ['data: {"delta": "first"}\n\n']
+    assert stream.closed
+    assert _semaphore_free()
@@ -0,0 +1,113 @@
+# Lawina logowań (auth._run_in_hash_pool): bcrypt liczy się poza event loopem,
+# więc inne endpointy nie czekają na hashe, a ponad AUTH_HASH_WORKERS + AUTH_HASH_QUEUE jest 429.
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+import pytest
+import auth
+import database
+import main
+import models
+from conftest import create_tables
+
+EMAIL = "storm@test.local"
+PASSWORD = "haslo123"
+WORKERS = 2
+QUEUE = 2
+
+@pytest.fixture
+def client_factory(sqlite_engine, make_session, monkeypatch):
+    create_tables(sqlite_engine, models.User)
+    with make_session() as db:
+        db.add(models.User(email=EMAIL, hashed_password=auth.get_password_hash(PASSWORD)))
+        db.commit()
+
+    def get_test_db():
+        db = make_session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    # Mała pula, żeby test był szybki - logika ta sama co przy domyślnych 2 + 16
+    pool = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="bcrypt-test")
+    monkeypatch.setattr(auth, "AUTH_HASH_WORKERS", WORKERS)
+    monkeypatch.setattr(auth, "AUTH_HASH_QUEUE", QUEUE)
+    monkeypatch.setattr(auth, "_hash_pool", pool)
+    monkeypatch.setattr(auth, "_hash_slots", threading.BoundedSemaphore(WORKERS + QUEUE))
+    main.app.dependency_overrides[database.get_db] = get_test_db
+    # ASGITransport nie odpala lifespan (kolejka RAG, czekanie na Postgresa) - tu niepotrzebne
+    yield lambda: httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test")
+    main.app.dependency_overrides.clear()
+    pool.shutdown(wait=True)
+
+async def _login(client):
+    return await client.post("/api/login", data={"username": EMAIL, "password": PASSWORD})
+
+def _p99(latencies):
+    ordered = sorted(latencies)
+    return ordered[int(0.99 * (len(ordered) - 1))]
+
+def test_login_storm_keeps_other_endpoints_fast(client_factory):
+    started = time.perf_counter()
+    auth.verify_password(PASSWORD, auth.get_password_hash(PASSWORD))
+    bcrypt_seconds = (time.perf_counter() - started) / 2
+
+    async def run():
+        async with client_factory() as client:
+            async def probe_while(condition, limit=200):
+                latencies = []
+                while condition() and len(latencies) < limit:
+                    t = time.perf_counter()
+                    assert (await client.get("/healthz")).status_code == 200
+                    latencies.append(time.perf_counter() - t)
+                    await asyncio.sleep(0.005)
+                return latencies
+
+            baseline = await probe_while(lambda: True, limit=30)
+            storm = [asyncio.create_task(_login(client)) for _ in range(WORKERS + QUEUE)]
+            during = await probe_while(lambda: not all(t.done() for t in storm))
+            responses = await asyncio.gather(*storm)
+            return baseline, during, responses
+
+    baseline, during, responses = asyncio.run(run())
+
+    assert [r.status_code for r in responses] == [200] * (WORKERS + QUEUE)
+    # bcrypt na event loopie = próbki czekałyby na cały hash; tu p99 zostaje przy baseline
+    assert _p99(during) < bcrypt_seconds / 2
+    assert _p99(during) < max(_p99(baseline) * 5, 0.02)
+    assert len(during) >= 5 # Burza trwała co najmniej dwa hashe - było kiedy mierzyć
+
+def test_login_storm_beyond_capacity_gets_429(client_factory, monkeypatch):
+    release = threading.Event()
+    real_verify = auth.verify_password
+
+    def held_verify(plain, hashed):
+        # Trzymamy hashe w puli, aż nadmiarowe requesty dostaną odpowiedź - wynik deterministyczny
+        release.wait(10)
+        return real_verify(plain, hashed)
+
+    monkeypatch.setattr(auth, "verify_password", held_verify)
+    extra = 3
+
+    async def run():
+        async with client_factory() as client:
+            tasks = [asyncio.create_task(_login(client)) for _ in range(WORKERS + QUEUE + extra)]
+            deadline = time.perf_counter() + 10
+            while sum(t.done() for t in tasks) < extra and time.perf_counter() < deadline:
+                await asyncio.sleep(0.01)
+            rejected = [t.result() for t in tasks if t.done()]
+            release.set()
+            responses = await asyncio.gather(*tasks)
+            after = await _login(client) # Wszystkie miejsca wróciły do puli
+            return rejected, responses, after
+
+    rejected, responses, after = asyncio.run(run())
+
+    assert len(rejected) == extra
+    assert all(r.status_code == 429 and r.headers["Retry-After"] == "1" for r in rejected)
+    assert sorted(r.status_code for r in responses) == [200] * (WORKERS + QUEUE) + [429] * extra
+    assert after.status_code == 200
+    assert auth._hash_slots._value == WORKERS + QUEUE
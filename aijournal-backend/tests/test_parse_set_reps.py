@@ -0,0 +1,40 @@
+# crud.parse_set_reps / exercise_volume - volume treningu liczony z każdej serii.
+import pytest
+from crud import MAX_SETS_PER_EXERCISE, exercise_volume, parse_set_reps
+
+@pytest.mark.parametrize("reps, sets, expected", [
+    ("12,10,8", 3, [12, 10, 8]),
+    ("12/10/8", 3, [12, 10, 8]),
+    ("12 10 8", 3, [12, 10, 8]),
+    ("12-10-8", 3, [12, 10, 8]),
+    ("5x5x5", 3, [5, 5, 5]),
+    ("3x10", 3, [10, 10, 10]),
+    ("3 x 10", None, [10, 10, 10]),
+    ("3*10", 1, [10, 10, 10]),
+    ("4x8-10", 4, [8, 8, 8, 8]),
+    ("4 x 10-8", 4, [8, 8, 8, 8]),
+    ("3x10, 2x8", 5, [10, 10, 10, 8, 8]),
+    ("10", 3, [10, 10, 10]),
+    ("6-8", 2, [6, 6]),
+    ("10+3", 1, [13]),
+    ("AMRAP", 3, []),
+    ("3xAMRAP", 3, []),
+    ("", 3, []),
+    (None, 3, []),
+])
+def test_parse_set_reps(reps, sets, expected):
+    assert parse_set_reps(reps, sets) == expected
+
+def test_spelled_out_sets_are_not_padded_by_sets_field():
+    assert parse_set_reps("3x10", 5) == [10, 10, 10]
+    assert parse_set_reps("12,10", 3) == [12, 10]
+    assert parse_set_reps("12-10-8", 5) == [12, 10, 8]
+
+def test_set_count_is_capped():
+    assert len(parse_set_reps("1000x10", 1)) == MAX_SETS_PER_EXERCISE
+    assert len(parse_set_reps("10", 10**9)) == MAX_SETS_PER_EXERCISE
+
+def test_exercise_volume_sums_every_set():
+    assert exercise_volume([12, 10, 8], 50.0) == 1500.0
+    assert exercise_volume([10, 10], None) == 0.0
+    assert exercise_volume([], 100.0) == 0.0
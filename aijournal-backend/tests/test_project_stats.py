@@ -0,0 +1,68 @@
+# GET /api/projects (crud.get_projects_with_stats): liczba zapytań nie może rosnąć z liczbą projektów.
+import asyncio
+from datetime import date, datetime, timedelta
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+import crud
+import models
+from conftest import count_statements, create_tables
+
+TABLES = (models.User, models.Project, models.ProjectActivity)
+
+def _seed(db, n: int) -> int:
+    """Usera z n projektami; co drugi ma wiersz rollupu, reszta jeszcze nie (przed rebuildem)."""
+    user = models.User(email=f"projects{n}@test.local", hashed_password="x")
+    db.add(user)
+    db.flush()
+    for i in range(n):
+        project = models.Project(name=f"Projekt {i}", owner_id=user.id)
+        db.add(project)
+        db.flush()
+        if i % 2 == 0:
+            db.add(models.ProjectActivity(
+                project_id=project.id, task_count=4, completed_count=1,
+                last_task_completed_at=datetime.now() - timedelta(days=10),
+                pomodoro_count=2, pomodoro_minutes=50, last_pomodoro_date=date.today()
+            ))
+    db.commit()
+    return user.id
+
+@pytest.mark.parametrize("n", [1, 25])
+def test_statement_count_does_not_grow_with_projects(sqlite_engine, make_session, n):
+    create_tables(sqlite_engine, *TABLES)
+    with make_session() as db:
+        user_id = _seed(db, n)
+
+    with make_session() as db, count_statements(sqlite_engine) as statements:
+        projects = crud.get_projects_with_stats(db, user_id)
+        # Dostęp do stats nie może dociągać niczego leniwie
+        stats = [p.stats for p in projects]
+
+    assert len(projects) == n
+    assert len(statements) == 1
+    with_activity = [s for p, s in zip(projects, stats) if p.name in {f"Projekt {i}" for i in range(0, n, 2)}]
+    assert all(s["progress"] == 25 and s["total_pomodoros"] == 2 and not s["is_rusting"] for s in with_activity)
+    assert all(s == crud._momentum_stats(0, 0, None, None, 0, datetime.now()) for s in stats if s not in with_activity)
+
+def test_async_statement_count_does_not_grow_with_projects():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    factory = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def statements_for(n: int) -> int:
+        async with factory() as db:
+            user_id = await db.run_sync(lambda sync_db: _seed(sync_db, n))
+        with count_statements(engine.sync_engine) as statements:
+            async with factory() as db:
+                projects = await crud.get_projects_with_stats_async(db, user_id)
+        assert len(projects) == n
+        return len(statements)
+
+    async def run():
+        async with engine.begin() as conn:
+            await conn.run_sync(lambda sync_conn: create_tables(sync_conn, *TABLES))
+        counts = [await statements_for(n) for n in (1, 25)]
+        await engine.dispose()
+        return counts
+
+    assert asyncio.run(run()) == [1, 1]
@@ -0,0 +1,42 @@
+# rag.add_documents: puste teksty odpadają, przy powtórzonym ID wygrywa ostatnia wersja,
+# embedding i upsert idą paczkami po RAG_BATCH_SIZE.
+import rag
+import rag_lexical
+
+def _doc(i, text=None, user_id=1, **metadata):
+    return {"doc_id": f"task_{i}", "text": f"Zadanie numer {i}" if text is None else text,
+            "metadata": {"type": "task", "date": "2025-03-14", **metadata}, "user_id": user_id}
+
+def test_empty_texts_are_dropped(rag_env):
+    added = rag.add_documents([_doc(1), _doc(2, text=""), {**_doc(3), "text": None}, _doc(4)])
+
+    assert added == 2
+    collection = rag.get_collection(rag.partition_name(1), create=False)
+    assert sorted(collection.get()["ids"]) == ["task_1", "task_4"]
+    assert sorted(rag_lexical.locate(["task_1", "task_2", "task_3", "task_4"])) == ["task_1", "task_4"]
+    assert sum(rag_env.calls) == 2 # Puste nie idą przez model
+
+def test_last_version_of_repeated_id_wins(rag_env):
+    added = rag.add_documents([_doc(1, text="pierwsza wersja"), _doc(2), _doc(1, text="druga wersja", priority="high")])
+
+    assert added == 2
+    got = rag.get_collection(rag.partition_name(1), create=False).get(ids=["task_1"], include=["documents", "metadatas"])
+    assert got["documents"] == ["druga wersja"]
+    assert got["metadatas"][0]["priority"] == "high"
+    assert got["metadatas"][0]["content_hash"] == rag.content_hash(_doc(1, text="druga wersja", priority="high"))
+    assert rag_lexical.search("wersja", 1)[0]["text"] == "druga wersja"
+
+def test_upserts_are_chunked_by_batch_size(rag_env):
+    total = rag.RAG_BATCH_SIZE * 2 + 5
+    assert rag.add_documents([_doc(i) for i in range(total)]) == total
+
+    # Jeden forward pass modelu na paczkę (upsert liczy embeddingi całej paczki naraz)
+    assert rag_env.calls == [rag.RAG_BATCH_SIZE, rag.RAG_BATCH_SIZE, 5]
+    assert rag.get_collection(rag.partition_name(1), create=False).count() == total
+
+def test_explicit_batch_size_and_single_document(rag_env):
+    rag.add_documents([_doc(i) for i in range(10)], batch_size=4)
+    rag.add_document("task_99", "Pojedynczy wpis", {"type": "task", "date": "2025-03-14"}, 1)
+
+    assert rag_env.calls == [4, 4, 2, 1]
+    assert rag.get_hashes(["task_0", "task_99", "task_404"], user_id=1).keys() == {"task_0", "task_99"}
@@ -0,0 +1,75 @@
+# Routing partycji RAG (none / user / hash, kubełki miesięczne) i migracja wektorów między układami.
+import rag
+import migrate_rag_partitions
+
+def _doc(i, user_id, day="2025-03-14"):
+    return {"doc_id": f"task_{i}", "text": f"trening bench press numer {i}",
+            "metadata": {"type": "task", "date": day}, "user_id": user_id}
+
+def _names():
+    return set(rag.list_collections())
+
+def test_partition_name_routing(monkeypatch):
+    monkeypatch.setattr(rag, "RAG_PARTITIONING", "none")
+    assert {rag.partition_name(u) for u in (1, 2, 999)} == {"knowledge_base"}
+
+    monkeypatch.setattr(rag, "RAG_PARTITIONING", "user")
+    assert rag.partition_name(7) == rag.partition_name("7") == "knowledge_base_user_7"
+    assert rag.partition_name(8) != rag.partition_name(7)
+
+    monkeypatch.setattr(rag, "RAG_PARTITIONING", "hash")
+    monkeypatch.setattr(rag, "RAG_SHARDS", 16)
+    for user_id in (0, 1, 15, 16, 17, 12345):
+        assert rag.partition_name(user_id) == f"knowledge_base_shard_{user_id % 16:03d}"
+
+def test_collection_name_month_buckets(monkeypatch):
+    monkeypatch.setattr(rag, "RAG_PARTITIONING", "user")
+    monkeypatch.setattr(rag, "RAG_TIME_BUCKETS", "month")
+    assert rag.collection_name(7, "2025-03-14") == "knowledge_base_user_7_m202503"
+    assert rag.collection_name(7, "inbox") == rag.collection_name(7, None) == "knowledge_base_user_7_undated"
+
+def test_documents_land_in_user_partitions_and_stay_isolated(rag_env, monkeypatch):
+    monkeypatch.setattr(rag, "RAG_PARTITIONING", "user")
+    rag.add_documents([_doc(1, 1), _doc(2, 2), _doc(3, 1)])
+
+    assert _names() == {"knowledge_base_user_1", "knowledge_base_user_2"}
+    assert sorted(rag.get_collection("knowledge_base_user_1").get()["ids"]) == ["task_1", "task_3"]
+    assert {h["doc_id"] for h in rag.retrieve("trening bench", 2, n_results=5, mode="vector")} == {"task_2"}
+
+def test_migration_copies_vectors_into_hash_shards(rag_env, monkeypatch):
+    monkeypatch.setattr(rag, "RAG_PARTITIONING", "none")
+    docs = [_doc(i, user_id=1 + i % 5) for i in range(20)]
+    rag.add_documents(docs)
+    before = rag.get_collection("knowledge_base").get(include=["embeddings"])
+    embeddings = {doc_id: list(e) for doc_id, e in zip(before["ids"], before["embeddings"])}
+    calls = list(rag_env.calls)
+
+    monkeypatch.setattr(rag, "RAG_PARTITIONING", "hash")
+    monkeypatch.setattr(rag, "RAG_SHARDS", 2)
+    migrate_rag_partitions.migrate(delete_source=True)
+
+    assert _names() == {"knowledge_base_shard_000", "knowledge_base_shard_001"}
+    for shard in (0, 1):
+        got = rag.get_collection(f"knowledge_base_shard_{shard:03d}").get(include=["metadatas", "embeddings"])
+        assert {int(m["user_id"]) % 2 for m in got["metadatas"]} == {shard}
+        # Embeddingi skopiowane 1:1, model nie był wołany
+        assert all(list(e) == embeddings[doc_id] for doc_id, e in zip(got["ids"], got["embeddings"]))
+    assert rag_env.calls == calls
+    assert sum(rag.get_collection(n).count() for n in _names()) == 20
+
+    # Drugie uruchomienie nic nie psuje (upsert)
+    migrate_rag_partitions.migrate(delete_source=True)
+    assert sum(rag.get_collection(n).count() for n in _names()) == 20
+    assert {h["doc_id"] for h in rag.retrieve("trening", 3, n_results=10, mode="vector")} == {"task_2", "task_7", "task_12", "task_17"}
+
+def test_migration_into_month_buckets_adds_date_ord(rag_env, monkeypatch):
+    monkeypatch.setattr(rag, "RAG_PARTITIONING", "user")
+    rag.add_documents([_doc(1, 1, "2025-03-14"), _doc(2, 1, "2025-04-01"), _doc(3, 1, "inbox")])
+
+    monkeypatch.setattr(rag, "RAG_TIME_BUCKETS", "month")
+    migrate_rag_partitions.migrate(delete_source=True)
+
+    assert _names() == {"knowledge_base_user_1_m202503", "knowledge_base_user_1_m202504", "knowledge_base_user_1_undated"}
+    march = rag.get_collection("knowledge_base_user_1_m202503").get(include=["metadatas"])
+    assert march["ids"] == ["task_1"] and march["metadatas"][0]["date_ord"] == 20250314
+    assert [h["doc_id"] for h in rag.retrieve("trening", 1, mode="vector", date_from="2025-04-01", date_to="2025-04-30")] == ["task_2"]
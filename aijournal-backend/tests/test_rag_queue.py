@@ -0,0 +1,96 @@
+# flush() kolejki RAG: gdy zostały tylko dokumenty w backoffie, nie czekamy do timeoutu.
+import time
+import rag
+import rag_queue
+
+def _failing_queue(tmp_path, monkeypatch):
+    def boom(docs, **kwargs):
+        raise RuntimeError("chroma down")
+
+    monkeypatch.setattr(rag, "add_documents", boom)
+    queue = rag_queue.IndexQueue(str(tmp_path / "queue.sqlite3"))
+    queue.enqueue_many([{"doc_id": "task_1", "user_id": 1, "text": "Bench Press", "metadata": {}}])
+    return queue
+
+def test_flush_returns_early_when_backoff_outlasts_timeout(tmp_path, monkeypatch):
+    queue = _failing_queue(tmp_path, monkeypatch)
+
+    started = time.time()
+    assert queue.flush(timeout=1.0) is False
+    # Pierwsza próba pada, kolejna dopiero za 2 s (backoff) - po timeout=1 s i tak nie zdążymy
+    assert time.time() - started < 0.5
+    assert queue.stats()["failures"] == 1
+    assert queue.next_attempt_at() > time.time()
+
+def test_flush_empties_queue(tmp_path, monkeypatch):
+    indexed = []
+    monkeypatch.setattr(rag, "add_documents", lambda docs, **kwargs: indexed.extend(d["doc_id"] for d in docs))
+    queue = rag_queue.IndexQueue(str(tmp_path / "queue.sqlite3"))
+    queue.enqueue_many([{"doc_id": f"task_{i}", "user_id": 1, "text": "x", "metadata": {}} for i in range(3)])
+
+    assert queue.flush(timeout=5.0) is True
+    assert indexed == ["task_0", "task_1", "task_2"]
+    assert queue.next_attempt_at() is None
+
+# --- Dzierżawy: kilka procesów (uvicorn --workers N) na jednym pliku kolejki ---
+
+def _docs(n):
+    return [{"doc_id": f"task_{i}", "user_id": 1, "text": "x", "metadata": {}} for i in range(n)]
+
+def test_two_workers_never_claim_the_same_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr(rag_queue, "RAG_QUEUE_BATCH", 4)
+    path = str(tmp_path / "queue.sqlite3")
+    first, second = rag_queue.IndexQueue(path), rag_queue.IndexQueue(path)
+    first.enqueue_many(_docs(10))
+
+    claimed = [r[0] for r in first._claim_batch()] + [r[0] for r in second._claim_batch()]
+    claimed += [r[0] for r in first._claim_batch()] + [r[0] for r in second._claim_batch()]
+    assert sorted(claimed) == sorted(f"task_{i}" for i in range(10))
+    assert len(claimed) == len(set(claimed))
+
+def test_newer_version_waits_for_the_lease_holder(tmp_path, monkeypatch):
+    """Delete wrzucony w trakcie indeksowania upserta nie może trafić do drugiego workera przed upsertem."""
+    applied = []
+    monkeypatch.setattr(rag, "add_documents", lambda docs, **kwargs: applied.extend(("upsert", d["doc_id"]) for d in docs))
+    monkeypatch.setattr(rag, "delete_documents", lambda ids, **kwargs: applied.extend(("delete", i) for i in ids))
+    path = str(tmp_path / "queue.sqlite3")
+    first, second = rag_queue.IndexQueue(path), rag_queue.IndexQueue(path)
+    first.enqueue_many(_docs(1))
+
+    rows = first._claim_batch()
+    second.enqueue_many([{"doc_id": "task_0", "user_id": 1}], op="delete")
+    assert second._claim_batch() == [] # Wciąż zajęty przez pierwszego
+
+    first._apply(rows)
+    first._done(rows) # Stara wersja (seq) nie jest kasowana, ale dzierżawa wraca do puli
+    assert second.process_batch() == 1
+    assert applied == [("upsert", "task_0"), ("delete", "task_0")]
+    assert second.ready() == 0
+
+def test_expired_lease_is_taken_over(tmp_path, monkeypatch):
+    monkeypatch.setattr(rag_queue, "RAG_QUEUE_LEASE", 0.05)
+    path = str(tmp_path / "queue.sqlite3")
+    crashed, survivor = rag_queue.IndexQueue(path), rag_queue.IndexQueue(path)
+    crashed.enqueue_many(_docs(2))
+
+    assert len(crashed._claim_batch()) == 2 # ...i proces pada bez _done
+    assert survivor._claim_batch() == []
+    assert survivor.next_attempt_at() > time.time() # flush innego procesu nie kręci się w kółko
+    time.sleep(0.1)
+    assert len(survivor._claim_batch()) == 2
+
+def test_old_queue_file_gets_lease_columns(tmp_path):
+    import sqlite3
+    path = str(tmp_path / "queue.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE pending (doc_id TEXT PRIMARY KEY, op TEXT NOT NULL DEFAULT 'upsert', user_id INTEGER NOT NULL,
+            text TEXT, metadata TEXT, seq INTEGER NOT NULL, enqueued_at REAL NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0, next_attempt_at REAL NOT NULL, last_error TEXT)
+    """)
+    conn.execute("INSERT INTO pending (doc_id, user_id, text, metadata, seq, enqueued_at, next_attempt_at) VALUES ('task_1', 1, 'x', '{}', 1, 0, 0)")
+    conn.commit()
+    conn.close()
+
+    queue = rag_queue.IndexQueue(path)
+    assert [r[0] for r in queue._claim_batch()] == ["task_1"]
@@ -0,0 +1,66 @@
+# Wyszukiwanie hybrydowe: wyrażenie FTS5 (build_match), fuzja RRF, skrót leksykalny
+# i powrót do samych wyników BM25, gdy wyszukiwanie wektorowe padnie.
+import rag
+import rag_lexical
+
+def _doc(i, text, day="2025-03-14", user_id=1):
+    return {"doc_id": f"task_{i}", "text": text, "metadata": {"type": "task", "date": day}, "user_id": user_id}
+
+def test_build_match_trims_long_words_to_prefixes():
+    # >= 6 znaków: końcówka (2) odcięta, prefiks; 4-5: cały wyraz jako prefiks; krótsze dokładnie
+    assert rag_lexical.build_match("Treningu bench na") == '"trenin"* OR "bench"* OR "na"'
+    assert rag_lexical.build_match("Treningu bench", match_all=True) == '"trenin"* AND "bench"*'
+
+def test_build_match_drops_fts_syntax_and_duplicates():
+    assert rag_lexical.build_match('bench" OR NEAR(x) bench * a') == '"bench"* OR "or" OR "near"*'
+    assert rag_lexical.build_match("!!! ?") == ""
+    assert rag_lexical.query_terms("Bench BENCH bench press") == ["bench", "press"]
+
+def test_prefix_matches_polish_inflection(rag_env):
+    rag.add_documents([_doc(1, "Ciężki trening nóg"), _doc(2, "Spotkanie z klientem")])
+    assert [h["doc_id"] for h in rag_lexical.search("treningu", 1)] == ["task_1"]
+    assert [h["doc_id"] for h in rag_lexical.search("treningów", 1)] == ["task_1"]
+
+def test_rrf_rewards_documents_on_both_lists():
+    vector = [{"doc_id": "a"}, {"doc_id": "b"}, {"doc_id": "c"}]
+    lexical = [{"doc_id": "c"}, {"doc_id": "d"}]
+    # c: 1/63 + 1/61 > a: 1/61 > b = d: 1/62 (remis - kolejność pierwszego pojawienia się)
+    assert [h["doc_id"] for h in rag._rrf([vector, lexical], k=60)] == ["c", "a", "b", "d"]
+    assert rag._rrf([[], []]) == []
+
+def test_exact_lexical_hit_short_circuits_vector_search(rag_env, monkeypatch):
+    rag.add_documents([_doc(i, f"Bench press rekord {i}") for i in range(3)] + [_doc(9, "Bieganie w parku")])
+    calls = list(rag_env.calls)
+
+    def no_vector(*args, **kwargs):
+        raise AssertionError("wyszukiwanie wektorowe nie powinno być wołane")
+
+    monkeypatch.setattr(rag, "_vector_search", no_vector)
+    before = rag._search_stats["short_circuit"]
+    hits = rag.retrieve("bench press", 1, n_results=3, mode="hybrid")
+
+    assert sorted(h["doc_id"] for h in hits) == ["task_0", "task_1", "task_2"]
+    assert rag._search_stats["short_circuit"] == before + 1
+    assert rag_env.calls == calls # Model nie liczył embeddingu zapytania
+
+def test_too_few_exact_hits_fall_through_to_fusion(rag_env):
+    rag.add_documents([_doc(1, "Bench press rekord"), _doc(2, "Bench na ławce skośnej"), _doc(3, "Bieganie w parku")])
+    before = rag._search_stats["short_circuit"]
+    hits = rag.retrieve("bench press", 1, n_results=2, mode="hybrid")
+
+    assert rag._search_stats["short_circuit"] == before
+    assert hits[0]["doc_id"] == "task_1" # Na obu listach - pierwszy po fuzji
+    assert len(hits) == 2
+
+def test_vector_failure_falls_back_to_lexical(rag_env, monkeypatch):
+    rag.add_documents([_doc(1, "Przysiad ze sztangą"), _doc(2, "Martwy ciąg"), _doc(3, "Przysiad bułgarski", day="2024-01-10")])
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("Chroma padła")
+
+    monkeypatch.setattr(rag, "_vector_search", broken)
+    hits = rag.retrieve("przysiad", 1, n_results=3, mode="hybrid")
+    assert sorted(h["doc_id"] for h in hits) == ["task_1", "task_3"]
+    # Filtry dat działają też w trybie awaryjnym
+    assert [h["doc_id"] for h in rag.retrieve("przysiad", 1, mode="hybrid", date_from="2025-01-01")] == ["task_1"]
+    assert "Przysiad ze sztangą" in rag.search_documents("przysiad", 1, date_from="2025-01-01")
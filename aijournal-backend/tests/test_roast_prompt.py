@@ -0,0 +1,28 @@
+# Prompt roasta (/api/ai/roast): fakty z RAG z ostatnich dni muszą trafić do promptu.
+from datetime import date, timedelta
+import main
+import rag
+
+def test_recent_rag_context_lands_in_roast_prompt(monkeypatch):
+    calls = []
+
+    def fake_search(query, user_id, n_results, date_from=None, **kwargs):
+        calls.append((query, user_id, date_from))
+        return "[2025-03-14] Zadanie: Trening nóg (nieukończone)"
+
+    monkeypatch.setattr(main, "calculate_performance_score", lambda db, user_id: (25, 0, 1))
+    monkeypatch.setattr(main.crud, "get_projects_with_stats", lambda db, user_id: [])
+    monkeypatch.setattr(rag, "search_documents", fake_search)
+
+    score, prompt = main._build_roast_prompt(db=None, user_id=7)
+    assert score == 25
+    assert "Trening nóg (nieukończone)" in prompt
+    assert calls == [(rag.CANNED_QUERIES["roast"], 7, date.today() - timedelta(days=rag.RAG_RECENT_DAYS))]
+
+def test_roast_prompt_without_rag_hits(monkeypatch):
+    monkeypatch.setattr(main, "calculate_performance_score", lambda db, user_id: (80, 3, 0))
+    monkeypatch.setattr(main.crud, "get_projects_with_stats", lambda db, user_id: [])
+    monkeypatch.setattr(rag, "search_documents", lambda *args, **kwargs: "")
+
+    _, prompt = main._build_roast_prompt(db=None, user_id=7)
+    assert "Brak powiązanych informacji w bazie." in prompt
@@ -0,0 +1,98 @@
+# Kolejność zadań z dziurami (ORDER_GAP): _order_between i crud.move_task.
+from datetime import date
+import pytest
+import crud
+import models
+import schemas
+from crud import ORDER_GAP, _order_between
+
+DAY = date(2025, 3, 14)
+
+def test_order_between_both_neighbours_takes_midpoint():
+    assert _order_between(0, ORDER_GAP) == ORDER_GAP // 2
+    assert _order_between(10, 13) == 11
+
+def test_order_between_one_side_only():
+    assert _order_between(2048, None) == 2048 + ORDER_GAP
+    assert _order_between(None, 0) == -ORDER_GAP
+    assert _order_between(None, None) is None
+
+def test_order_between_no_room_means_rebalance():
+    assert _order_between(5, 6) is None
+    assert _order_between(5, 5) is None
+
+def test_order_between_rejects_inverted_neighbours():
+    # after_id leży pod before_id
+    assert _order_between(2 * ORDER_GAP, ORDER_GAP) is None
+
+# --- move_task na Postgresie (blokada doradcza, rebalance jednym UPDATE) ---
+
+@pytest.fixture
+def task_list(pg_session):
+    """User z listą A, B, C, D na DAY (0, 1024, 2048, 3072). Zwraca (sesja, user_id, {nazwa: id})."""
+    db = pg_session()
+    user = models.User(email="order@test.local", hashed_password="x")
+    db.add(user)
+    db.commit()
+    ids = {name: crud.create_user_task(db, schemas.TaskCreate(content=name, task_date=DAY), user.id).id for name in "ABCD"}
+    yield db, user.id, ids
+    db.close()
+
+def _names(db, user_id):
+    return "".join(t.content for t in crud.get_tasks_by_date(db, user_id, DAY))
+
+def _move(db, user_id, task_id, after=None, before=None, task_date=DAY):
+    return crud.move_task(db, task_id, schemas.TaskMove(task_date=task_date, after_id=after, before_id=before), user_id)
+
+def test_move_between_both_neighbours(task_list):
+    db, user_id, ids = task_list
+    moved = _move(db, user_id, ids["D"], after=ids["A"], before=ids["B"])
+    assert moved.order == ORDER_GAP // 2
+    assert _names(db, user_id) == "ADBC"
+
+def test_move_with_only_after_id_lands_directly_below_it(task_list):
+    db, user_id, ids = task_list
+    moved = _move(db, user_id, ids["D"], after=ids["A"])
+    # Nie 0 + 1024 (duplikat B) - środek między A i B
+    assert moved.order == ORDER_GAP // 2
+    assert _names(db, user_id) == "ADBC"
+
+def test_move_with_only_before_id_lands_directly_above_it(task_list):
+    db, user_id, ids = task_list
+    _move(db, user_id, ids["A"], before=ids["D"])
+    assert _names(db, user_id) == "BCAD"
+    _move(db, user_id, ids["C"], before=ids["B"]) # Na sam początek listy
+    assert _names(db, user_id) == "CBAD"
+
+def test_move_without_room_rebalances_list(task_list):
+    db, user_id, ids = task_list
+    for name, order in zip("ABCD", (0, 1, 2, 3)):
+        db.get(models.Task, ids[name]).order = order
+    db.commit()
+
+    _move(db, user_id, ids["D"], after=ids["A"])
+    assert _names(db, user_id) == "ADBC"
+    orders = [t.order for t in crud.get_tasks_by_date(db, user_id, DAY)]
+    assert len(set(orders)) == 4 and orders == sorted(orders)
+
+def test_move_with_equal_legacy_orders(task_list):
+    db, user_id, ids = task_list
+    for name in "ABCD":
+        db.get(models.Task, ids[name]).order = 0 # Stare wiersze sprzed dziur
+    db.commit()
+
+    _move(db, user_id, ids["D"], after=ids["A"])
+    assert _names(db, user_id) == "ADBC"
+
+def test_move_with_inverted_neighbours_is_rejected(task_list):
+    db, user_id, ids = task_list
+    assert _move(db, user_id, ids["A"], after=ids["D"], before=ids["B"]) is None
+    assert _names(db, user_id) == "ABCD"
+
+def test_move_to_other_list_or_foreign_neighbour_is_rejected(task_list):
+    db, user_id, ids = task_list
+    # Sąsiad z innej listy (inny dzień)
+    assert _move(db, user_id, ids["A"], after=ids["B"], task_date=date(2025, 3, 15)) is None
+    assert _move(db, user_id, ids["A"], after=ids["A"]) is None
+    assert _move(db, user_id, ids["A"], after=10 ** 9) is None
+    assert _names(db, user_id) == "ABCD"
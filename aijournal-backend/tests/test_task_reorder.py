@@ -0,0 +1,93 @@
+# Drag & Drop całej listy: crud.reorder_tasks (jeden UPDATE ... FROM VALUES) i PUT /api/tasks/reorder.
+from datetime import date
+import pytest
+from fastapi.testclient import TestClient
+import auth
+import crud
+import database
+import main
+import models
+import schemas
+
+DAY = date(2025, 3, 14)
+
+@pytest.fixture
+def tasks(pg_session):
+    """Dwóch userów: A, B, C należą do `owner`, X do `other`. Zwraca (sesja, owner, {nazwa: id})."""
+    db = pg_session()
+    owner = models.User(email="owner@test.local", hashed_password="x")
+    other = models.User(email="other@test.local", hashed_password="x")
+    db.add_all([owner, other])
+    db.commit()
+    ids = {name: crud.create_user_task(db, schemas.TaskCreate(content=name, task_date=DAY), owner.id).id for name in "ABC"}
+    ids["X"] = crud.create_user_task(db, schemas.TaskCreate(content="X", task_date=DAY), other.id).id
+    yield db, owner, ids
+    db.close()
+
+def _orders(db):
+    db.expire_all()
+    return {t.content: t.order for t in db.query(models.Task).all()}
+
+def _reorder(pairs):
+    return [schemas.TaskReorder(id=task_id, order=order) for task_id, order in pairs]
+
+def test_reorder_updates_whole_list(tasks):
+    db, owner, ids = tasks
+    result = crud.reorder_tasks(db, _reorder([(ids["C"], 0), (ids["A"], 1), (ids["B"], 2)]), owner.id)
+    assert result == {"status": "success", "updated": 3}
+    assert [t.content for t in crud.get_tasks_by_date(db, owner.id, DAY)] == ["C", "A", "B"]
+
+@pytest.mark.parametrize("intruder", ["foreign", "missing"])
+def test_foreign_or_missing_id_rolls_back_everything(tasks, intruder):
+    db, owner, ids = tasks
+    before = _orders(db)
+    bad_id = ids["X"] if intruder == "foreign" else 999_999
+    # Własne zadania są w paczce przed intruzem - ich UPDATE też musi zostać wycofany
+    result = crud.reorder_tasks(db, _reorder([(ids["A"], 50), (ids["B"], 60), (bad_id, 70)]), owner.id)
+    assert result is None
+    assert _orders(db) == before
+
+def test_duplicate_ids_last_position_wins(tasks):
+    db, owner, ids = tasks
+    result = crud.reorder_tasks(db, _reorder([(ids["A"], 5), (ids["B"], 6), (ids["A"], 9)]), owner.id)
+    assert result == {"status": "success", "updated": 2}
+    assert _orders(db)["A"] == 9
+
+def test_empty_list_is_noop(tasks):
+    db, owner, _ = tasks
+    assert crud.reorder_tasks(db, [], owner.id) == {"status": "success", "updated": 0}
+
+# --- Endpoint ---
+
+@pytest.fixture
+def client(tasks, pg_session):
+    db, owner, ids = tasks
+
+    def get_test_db():
+        session = pg_session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    main.app.dependency_overrides[database.get_db] = get_test_db
+    main.app.dependency_overrides[auth.get_current_active_user] = lambda: owner
+    # Bez `with` - lifespan (kolejka RAG, czekanie na Postgresa) niepotrzebny
+    yield TestClient(main.app), db, ids
+    main.app.dependency_overrides.clear()
+
+def test_reorder_route_is_not_captured_by_task_id(client):
+    http, db, ids = client
+    response = http.put("/api/tasks/reorder", json=[{"id": ids["B"], "order": -1}])
+    # Gdyby trafiło w PUT /api/tasks/{task_id}, "reorder" nie przeszłoby walidacji int (422)
+    assert response.status_code == 200
+    assert response.json() == {"status": "success", "updated": 1}
+    assert _orders(db)["B"] == -1
+
+def test_reorder_route_foreign_id_is_404(client):
+    http, db, ids = client
+    before = _orders(db)
+    response = http.put("/api/tasks/reorder", json=[{"id": ids["A"], "order": 7}, {"id": ids["X"], "order": 8}])
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Task not found or not yours"
+    assert _orders(db) == before
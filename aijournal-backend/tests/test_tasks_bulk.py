@@ -0,0 +1,63 @@
+# crud.create_tasks_bulk (Brain Dump): pozycje z dziurami ORDER_GAP doklejone na koniec każdej listy,
+# wiersze w kolejności wejścia, jeden commit i jedna paczka do kolejki RAG. Wymaga Postgresa.
+from datetime import date
+from sqlalchemy import event
+import crud
+import main
+import models
+import rag_queue
+import schemas
+
+DAY = date(2025, 3, 14)
+
+def _user(db) -> tuple[int, int]:
+    user = models.User(email="bulk@test.local", hashed_password="x")
+    db.add(user)
+    db.flush()
+    project = models.Project(name="Projekt", owner_id=user.id)
+    db.add(project)
+    db.commit()
+    return user.id, project.id
+
+def test_bulk_appends_gap_spaced_orders_in_input_order(pg_session):
+    with pg_session() as db:
+        user_id, project_id = _user(db)
+        crud.create_user_task(db, schemas.TaskCreate(content="Istniejące", task_date=DAY), user_id)
+
+        dates = [DAY, None, DAY, None, DAY]
+        tasks = [
+            schemas.TaskCreate(content=f"Zadanie {i}", task_date=d, project_id=project_id if i % 2 else None,
+                               is_completed=(i == 3))
+            for i, d in enumerate(dates)
+        ]
+        created = crud.create_tasks_bulk(db, tasks, user_id)
+
+        assert [t.content for t in created] == [f"Zadanie {i}" for i in range(5)]
+        # Lista dnia miała już 0 -> dalej 1024, 2048, 3072; inbox był pusty -> 0, 1024
+        assert [t.order for t in created] == [1024, 0, 2048, 1024, 3072]
+        assert [t.order for t in crud.get_tasks_by_date(db, user_id, DAY)] == [0, 1024, 2048, 3072]
+        assert [t.order for t in crud.get_inbox_tasks(db, user_id)] == [0, 1024]
+
+        activity = db.get(models.ProjectActivity, project_id)
+        assert (activity.task_count, activity.completed_count) == (2, 1)
+
+def test_bulk_empty_list_is_noop(pg_session):
+    with pg_session() as db:
+        user_id, _ = _user(db)
+        assert crud.create_tasks_bulk(db, [], user_id) == []
+
+def test_braindump_uses_one_commit_and_one_enqueue(pg_session, monkeypatch):
+    enqueued = []
+    monkeypatch.setattr(rag_queue, "enqueue_many", lambda docs: enqueued.append(docs))
+
+    with pg_session() as db:
+        user_id, _ = _user(db)
+        commits = []
+        event.listen(db, "after_commit", lambda session: commits.append(1))
+
+        created = main._create_braindump_tasks(db, ["Kup mleko", "Zadzwoń do mamy", "Napisz raport"], DAY, user_id)
+
+    assert len(commits) == 1
+    assert len(enqueued) == 1
+    assert [d["doc_id"] for d in enqueued[0]] == [f"task_{t.id}" for t in created]
+    assert [t.content for t in created] == ["Kup mleko", "Zadzwoń do mamy", "Napisz raport"]
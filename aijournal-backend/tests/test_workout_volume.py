@@ -0,0 +1,91 @@
+# Dzienny rollup objętości (workout_volume_daily): +/- przy zapisie i usuwaniu treningu,
+# szeregi day / week / month, pomijanie pustych dni i kontrakt /api/gym/analytics/volume. Wymaga Postgresa.
+from datetime import date
+import pytest
+import crud
+import gym_app
+import models
+import schemas
+
+def _workout(day, *exercises, name="Trening"):
+    return schemas.WorkoutSessionCreate(
+        date=day, name=name, duration_minutes=60, note=None,
+        exercises=[schemas.ExerciseLogCreate(exercise_name=n, sets=s, reps=r, weight=w) for n, s, r, w in exercises]
+    )
+
+@pytest.fixture
+def gym(pg_session):
+    """Dwóch userów; pierwszy ma 5 treningów w marcu i kwietniu 2025. Zwraca (sesja, user, other_id, {nazwa: id})."""
+    db = pg_session()
+    user = models.User(email="gym@test.local", hashed_password="x")
+    other = models.User(email="other@test.local", hashed_password="x")
+    db.add_all([user, other])
+    db.commit()
+    workouts = {
+        "W1": _workout(date(2025, 3, 10), ("Bench", 3, "10", 100), ("Squat", 2, "5", 140)), # 3000 + 1400
+        "W2": _workout(date(2025, 3, 10), ("Deadlift", 1, "5", 200)),                      # 1000
+        "W3": _workout(date(2025, 3, 12), ("Bench", 3, "12,10,8", 80)),                    # 2400
+        "W4": _workout(date(2025, 3, 17), ("OHP", 3, "8", 50)),                            # 1200
+        "W5": _workout(date(2025, 4, 2), ("Pull-up", 2, "10", 0)),                         # 0 (z masą ciała)
+    }
+    ids = {name: crud.create_workout(db, w, user.id)[0].id for name, w in workouts.items()}
+    yield db, user, other.id, ids
+    db.close()
+
+def _series(db, user_id, bucket):
+    return [(p, v, s) for p, v, s in crud.get_volume_series(db, user_id, date(2025, 3, 1), date(2025, 4, 30), bucket)]
+
+def test_series_per_bucket(gym):
+    db, user, _, _ = gym
+    assert _series(db, user.id, "day") == [
+        (date(2025, 3, 10), 5400.0, 2), (date(2025, 3, 12), 2400.0, 1),
+        (date(2025, 3, 17), 1200.0, 1), (date(2025, 4, 2), 0.0, 1),
+    ]
+    # Tydzień od poniedziałku, miesiąc od pierwszego dnia
+    assert _series(db, user.id, "week") == [
+        (date(2025, 3, 10), 7800.0, 3), (date(2025, 3, 17), 1200.0, 1), (date(2025, 3, 31), 0.0, 1),
+    ]
+    assert _series(db, user.id, "month") == [(date(2025, 3, 1), 9000.0, 4), (date(2025, 4, 1), 0.0, 1)]
+    with pytest.raises(ValueError):
+        crud.get_volume_series(db, user.id, date(2025, 3, 1), date(2025, 4, 30), "year")
+
+def test_delete_subtracts_and_empty_days_disappear(gym):
+    db, user, _, ids = gym
+    assert crud.delete_workout(db, ids["W3"], user.id) is True
+    assert crud.delete_workout(db, ids["W2"], user.id) is True
+
+    # Wiersz 12.03 zostaje z zerami, ale having(sessions > 0) go nie pokazuje
+    row = db.get(models.WorkoutVolumeDaily, (user.id, date(2025, 3, 12)))
+    assert (row.volume, row.sessions) == (0.0, 0)
+    assert _series(db, user.id, "day") == [
+        (date(2025, 3, 10), 4400.0, 1), (date(2025, 3, 17), 1200.0, 1), (date(2025, 4, 2), 0.0, 1),
+    ]
+    assert _series(db, user.id, "week")[0] == (date(2025, 3, 10), 4400.0, 1)
+    assert crud.get_volume_totals(db, user.id, date(2025, 3, 11)) == (1200.0, 2)
+
+def test_delete_foreign_or_missing_workout_changes_nothing(gym):
+    db, user, other_id, ids = gym
+    before = _series(db, user.id, "day")
+    assert crud.delete_workout(db, ids["W1"], other_id) is False
+    assert crud.delete_workout(db, 10 ** 9, user.id) is False
+    assert _series(db, user.id, "day") == before
+    assert db.get(models.WorkoutSession, ids["W1"]) is not None
+
+def test_rebuild_matches_incremental_rollup(gym):
+    db, user, _, ids = gym
+    crud.delete_workout(db, ids["W3"], user.id)
+    # Stary trening bez właściciela nie może wywrócić rebuildu (user_id jest w PK rollupu)
+    db.add(models.WorkoutSession(user_id=None, date=date(2025, 3, 10), name="Sierota",
+                                 exercises=[models.ExerciseLog(exercise_name="Bench", volume_load=500.0)]))
+    db.commit()
+    incremental = {b: _series(db, user.id, b) for b in crud.VOLUME_BUCKETS}
+
+    assert crud.rebuild_workout_volume(db) == 3 # 10.03, 17.03, 02.04 - bez pustego 12.03 i bez sieroty
+    assert {b: _series(db, user.id, b) for b in crud.VOLUME_BUCKETS} == incremental
+
+def test_endpoint_points_have_date_volume_sessions(gym):
+    db, user, _, _ = gym
+    points = gym_app.get_volume_analytics(days=30, bucket="week", date_from=date(2025, 3, 1),
+                                          date_to=date(2025, 4, 30), db=db, current_user=user)
+    assert points[0] == {"date": "2025-03-10", "volume": 7800.0, "sessions": 3}
+    assert [p["date"] for p in points] == ["2025-03-10", "2025-03-17", "2025-03-31"]
@@ -204,7 +204,8 @@ const PhysicsTracker = ({ onBack }) => {
           return (
               <div className="chart-tooltip">
                   <h4>🗓️ {label}</h4>
-                  <p>🏋️ <strong style={{color:'#fff'}}>{payload[0].payload.name}</strong></p>
+                  {/* Rollup dzienny nie zna nazw treningów - pokazujemy ich liczbę w okresie */}
+                  <p>🏋️ <strong style={{color:'#fff'}}>Treningi: {payload[0].payload.sessions}</strong></p>
                   <p>🔥 <strong style={{color:'#12d3b9', fontSize:'16px'}}>{payload[0].value.toLocaleString()} kg</strong></p>
               </div>
           );
@@ -111,11 +111,11 @@ const TodoPage = ({ onNavigate }) => {
 
     const taskId = parseInt(draggableId);
 
-    // B. Reordering na tej samej liście (Visual only for now)
+    // B. Reordering na tej samej liście
     if (source.droppableId === destination.droppableId) {
-        // Tutaj można dodać logikę sortowania (order), jeśli backend to obsługuje.
-        // Na razie tylko aktualizujemy stan lokalny, żeby UI nie skakało.
-        
+        // Najpierw stan lokalny (UI nie skacze), potem zapis pozycji w backendzie (PUT /api/tasks/{id}/move).
+        // Jeśli zapis się nie uda, przeładowujemy listę z serwera, żeby UI nie pokazywało kolejności, której nie ma w bazie.
+
         // Musimy wiedzieć, którą tablicę modyfikujemy
         let listKey = 'general'; // Domyślnie general, bo tam są szuflady
         let filteredList = [];
@@ -135,6 +135,17 @@ const TodoPage = ({ onNavigate }) => {
             const [removed] = filteredList.splice(source.index, 1);
             filteredList.splice(destination.index, 0, removed);
             setTasks(prev => ({ ...prev, today: filteredList }));
+            // Zapis kolejności: sąsiedzi nad i pod upuszczonym zadaniem
+            try {
+                await api.moveTask(taskId, {
+                    task_date: currentDate.toISOString().split('T')[0],
+                    after_id: filteredList[destination.index - 1]?.id ?? null,
+                    before_id: filteredList[destination.index + 1]?.id ?? null
+                });
+            } catch (error) {
+                console.error("Błąd zapisu kolejności:", error);
+                loadData();
+            }
         }
         return;
     }
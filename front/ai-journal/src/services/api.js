@@ -77,6 +77,12 @@ export const api = {
         body: JSON.stringify(updates) 
     }),
 
+    // Drag & Drop jednego zadania: { task_date, after_id, before_id } - backend zmienia tylko ten jeden wiersz
+    moveTask: (taskId, move) => request(`/tasks/${taskId}/move`, {
+        method: 'PUT',
+        body: JSON.stringify(move)
+    }),
+
     toggleTask: (taskId) => request(`/tasks/${taskId}/toggle`, { method: 'PUT' }),
 
     deleteTask: (taskId) => request(`/tasks/${taskId}`, { method: 'DELETE' }),